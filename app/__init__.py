@@ -1,27 +1,35 @@
 import os
-import logging
-import sys
-import traceback
 from flask import Flask
+from werkzeug.exceptions import HTTPException
 from dotenv import load_dotenv
-from app.extensions import db, bcrypt, jwt, migrate, mail
+from app.extensions import db, bcrypt, jwt, migrate, mail, memory_profiler, password_hasher, mail_dispatcher, compressor, pool_metrics, request_metrics, query_inspector
+from app.utils.logging_setup import configure_logging
+from app.utils.json_provider import FastJSONProvider
+from app.utils.pool_metrics import PoolMetrics
 
 # 載入 .env
 load_dotenv()
 
 def create_app(config_name="default"):
     app = Flask(__name__)
+    # 以 orjson 序列化回應（datetime / date 直接轉為 API 字串格式）
+    app.json = FastJSONProvider(app)
 
-
-
-    # 在 Flask 應用配置中添加
-    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_size': 5,
-    'pool_recycle': 300,
-    'pool_pre_ping': True,
-    'max_overflow': 0,
-    'pool_timeout': 30
-}
+    # 依環境載入設定（development / testing / production）
+    from app.config import get_config
+    app.config.from_object(get_config(config_name))
+    
+    # 日誌設定（正式環境預設不輸出 DEBUG）
+    app.config['LOG_LEVEL'] = os.getenv('LOG_LEVEL', 'WARNING')
+    app.config['LOG_FILE'] = os.getenv('LOG_FILE', 'error.log')
+    if os.getenv('APP_LOG_LEVEL'):
+        app.config['LOG_LEVELS'] = {'app': os.getenv('APP_LOG_LEVEL')}
+    configure_logging(app)
+    
+    # 密碼雜湊設定（成本與執行緒池大小）
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    app.config['PASSWORD_HASH_MAX_QUEUE'] = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', 64))
     
     # JWT 設定
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
@@ -30,9 +38,34 @@ def create_app(config_name="default"):
     app.config['JWT_HEADER_TYPE'] = 'Bearer'
     app.config['JWT_ERROR_MESSAGE_KEY'] = 'message'
     
+    # 使用者解析快取存活秒數（0 表示停用行程內快取）
+    app.config['USER_CACHE_TTL'] = float(os.getenv('USER_CACHE_TTL', 60))
+    # 最新消息頁面快取存活秒數（0 表示停用）
+    app.config['NEWS_CACHE_TTL'] = float(os.getenv('NEWS_CACHE_TTL', 60))
+    # 好友關係圖快取存活秒數（0 表示停用）
+    app.config['FRIEND_GRAPH_TTL'] = float(os.getenv('FRIEND_GRAPH_TTL', 60))
+    # 邀請碼 -> 使用者 id 快取存活秒數（邀請碼不會變更；0 表示停用）
+    app.config['INVITE_CODE_CACHE_TTL'] = float(os.getenv('INVITE_CODE_CACHE_TTL', 3600))
+    
+    # 回應壓縮設定（小於 COMPRESS_MIN_SIZE bytes 的回應不壓縮）
+    app.config['COMPRESS_ENABLED'] = os.getenv('COMPRESS_ENABLED', 'True').lower() == 'true'
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+    app.config['COMPRESS_STREAM_THRESHOLD'] = int(os.getenv('COMPRESS_STREAM_THRESHOLD', 1024 * 1024))
+    
     # 資料庫設定
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('SQLALCHEMY_DATABASE_URI')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # 唯讀副本（設定後 @read_only 的查詢改走副本）
+    if os.getenv('SQLALCHEMY_REPLICA_URI'):
+        app.config['SQLALCHEMY_BINDS'] = {'replica': os.getenv('SQLALCHEMY_REPLICA_URI')}
+    # 連線池大小依設定檔（可由 DB_POOL_* 環境變數覆寫；gunicorn.conf.py 依 worker 類型設定）
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = PoolMetrics.engine_options(app, {
+        'pool_size': app.config['DB_POOL_SIZE'],
+        'max_overflow': app.config['DB_MAX_OVERFLOW'],
+        'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+        'pool_recycle': app.config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': app.config['DB_POOL_PRE_PING'],
+    })
     
     # 郵件設定
     app.config.update(
@@ -41,37 +74,49 @@ def create_app(config_name="default"):
         MAIL_USE_TLS=os.getenv('MAIL_USE_TLS', 'True').lower() == 'true',
         MAIL_USERNAME=os.getenv('MAIL_USERNAME'),
         MAIL_PASSWORD=os.getenv('MAIL_PASSWORD'),
-        MAIL_DEFAULT_SENDER=os.getenv('MAIL_USERNAME')
+        MAIL_DEFAULT_SENDER=os.getenv('MAIL_USERNAME'),
+        # 背景寄送設定（MAIL_BACKEND=file 時寫入 MAIL_FILE_SINK_DIR，供測試使用）
+        MAIL_BACKEND=os.getenv('MAIL_BACKEND', 'smtp'),
+        MAIL_QUEUE_WORKERS=int(os.getenv('MAIL_QUEUE_WORKERS', 1)),
+        MAIL_QUEUE_MAX_RETRIES=int(os.getenv('MAIL_QUEUE_MAX_RETRIES', 3)),
     )
+    if os.getenv('MAIL_FILE_SINK_DIR'):
+        app.config['MAIL_FILE_SINK_DIR'] = os.getenv('MAIL_FILE_SINK_DIR')
     
     # 初始化所有 extensions
     db.init_app(app)
+    pool_metrics.init_app(app)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
     mail.init_app(app)
+    mail_dispatcher.init_app(app)
+    # 最先註冊的 after_request 最後執行：壓縮在其他處理之後，請求統計再包含壓縮時間
+    request_metrics.init_app(app)
+    compressor.init_app(app)
+    query_inspector.init_app(app)
+    memory_profiler.init_app(app)
+    
+    # CLI 指令（flask create-db 等）
+    from app.cli import register_commands
+    register_commands(app)
     
     # 註冊藍圖
     from app.routes.auth_routes import auth_bp
     app.register_blueprint(auth_bp, url_prefix="/api")
+    from app.routes.internal_routes import internal_bp
+    app.register_blueprint(internal_bp, url_prefix="/internal")
 
-    # 配置詳細的錯誤日誌
-    if not app.debug:
-        logging.basicConfig(
-            level=logging.ERROR,
-            format='%(asctime)s %(levelname)s %(name)s %(message)s',
-            handlers=[
-                logging.FileHandler('error.log'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-    
     # 全域錯誤處理器
     @app.errorhandler(Exception)
     def handle_exception(e):
+        # 404 / 405 等 HTTP 錯誤維持原本的狀態碼
+        if isinstance(e, HTTPException):
+            return e
+        
         # 記錄完整的錯誤堆疊
-        app.logger.error(f"Unhandled exception: {str(e)}")
-        app.logger.error(traceback.format_exc())
+        app.logger.exception("Unhandled exception: %s", e)
         
         return {
             "status": "1",
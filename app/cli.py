@@ -0,0 +1,44 @@
+"""
+Flask CLI 指令
+建表等一次性工作改由指令執行，不在每次啟動（import wsgi）時進行
+"""
+
+import click
+from sqlalchemy import inspect
+from app.extensions import db
+
+
+def register_commands(app):
+    @app.cli.command("create-db")
+    def create_db():
+        """
+        在空資料庫建立所有資料表，並標記為最新的 migration（flask db stamp head）
+
+        migration 只包含基本資料表之後的變更，無法從空資料庫建立；
+        已有資料表的資料庫請改用 flask db upgrade
+        """
+        from flask_migrate import stamp
+
+        if inspect(db.engine).get_table_names():
+            raise click.ClickException("Database already has tables, run `flask db upgrade` instead")
+        db.create_all()
+        stamp()
+        click.echo("All tables created successfully!")
+
+    @app.cli.command("rebuild-share-inbox")
+    def rebuild_share_inbox():
+        """依好友關係重建所有分享收件匣（切換 SHARE_FEED_MODE=fanout 前執行）"""
+        from app.services import share_inbox
+
+        count = share_inbox.rebuild()
+        db.session.commit()
+        click.echo(f"Share inbox rebuilt: {count} entries")
+
+    @app.cli.command("backfill-invite-codes")
+    @click.option("--batch-size", default=1000, show_default=True, help="每批補發筆數")
+    def backfill_invite_codes(batch_size):
+        """為尚無邀請碼的既有使用者補發邀請碼"""
+        from app.services import invite_codes
+
+        count = invite_codes.backfill(batch_size)
+        click.echo(f"Invite codes issued: {count}")
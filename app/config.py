@@ -0,0 +1,93 @@
+"""
+設定檔（依環境選擇）
+create_app(config_name) 依名稱載入對應類別；各值皆可由同名環境變數覆寫
+"""
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() == "true"
+
+
+class Config:
+    """共用設定"""
+
+    # 連線池（每個行程）
+    DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+    DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 0)
+    DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+    DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 300)
+    DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+    # 連線池事件統計（取得連線等待時間、溢出、回收）
+    DB_POOL_METRICS = _env_bool("DB_POOL_METRICS", True)
+
+    # 記憶體取樣（預設關閉，不影響請求效能；見 app/utils/memory_profiler.py）
+    MEMORY_PROFILE_SAMPLE_RATE = _env_float("MEMORY_PROFILE_SAMPLE_RATE", 0.0)
+    MEMORY_PROFILE_INTERVAL = _env_float("MEMORY_PROFILE_INTERVAL", 0)
+    MEMORY_PROFILE_TRACEMALLOC = _env_bool("MEMORY_PROFILE_TRACEMALLOC", False)
+
+    # 各路由延遲 / DB 查詢統計（/internal/metrics）
+    REQUEST_METRICS_ENABLED = _env_bool("REQUEST_METRICS_ENABLED", True)
+
+    # 每個請求的 SQL 查詢數與 N+1 偵測（見 app/utils/query_inspector.py）
+    QUERY_INSPECTOR_ENABLED = _env_bool("QUERY_INSPECTOR_ENABLED", False)
+    QUERY_BUDGET = int(os.getenv("QUERY_BUDGET")) if os.getenv("QUERY_BUDGET") else None
+    QUERY_BUDGET_STRICT = _env_bool("QUERY_BUDGET_STRICT", False)
+
+    # 讀寫分離：使用者寫入後多久內的讀取仍走主庫（秒）
+    REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", 5))
+
+    # 分享動態："pull" 讀取時計算，"fanout" 分享時寫入好友收件匣（見 app/services/share_inbox.py）
+    SHARE_FEED_MODE = os.getenv("SHARE_FEED_MODE", "pull")
+
+    # /internal 端點（監控用），INTERNAL_TOKEN 有設定時需帶 X-Internal-Token
+    INTERNAL_ENDPOINTS_ENABLED = _env_bool("INTERNAL_ENDPOINTS_ENABLED", False)
+    INTERNAL_TOKEN = os.getenv("INTERNAL_TOKEN")
+
+
+class DevelopmentConfig(Config):
+    INTERNAL_ENDPOINTS_ENABLED = _env_bool("INTERNAL_ENDPOINTS_ENABLED", True)
+    QUERY_INSPECTOR_ENABLED = _env_bool("QUERY_INSPECTOR_ENABLED", True)
+
+
+class TestingConfig(Config):
+    TESTING = True
+    DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 2)
+    DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 5)
+    INTERNAL_ENDPOINTS_ENABLED = _env_bool("INTERNAL_ENDPOINTS_ENABLED", True)
+    QUERY_INSPECTOR_ENABLED = _env_bool("QUERY_INSPECTOR_ENABLED", True)
+
+
+class ProductionConfig(Config):
+    # 尖峰時允許少量溢出，並且快速失敗，不讓請求排隊 30 秒等待連線
+    DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 10)
+    DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+    DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 5)
+
+
+config_by_name = {
+    "development": DevelopmentConfig,
+    "testing": TestingConfig,
+    "production": ProductionConfig,
+}
+
+
+def get_config(config_name: str = "default"):
+    """
+    依名稱取得設定類別；"default" 依 APP_ENV 環境變數決定（預設 production）
+
+    Raises:
+        KeyError: 未知的設定名稱
+    """
+    if config_name in (None, "default"):
+        config_name = os.getenv("APP_ENV", "production")
+    return config_by_name[config_name]
@@ -1,56 +1,56 @@
 import re
-import traceback
 import string  
 from datetime import datetime, timedelta, timezone
-from flask_mail import Message
 from app.models.user import User
 from app.models.user_default import UserDefault
 from app.models.user_setting import UserSetting
-from app.models.user_vip import UserVip
 from app.models.user_medical import medical_records
 from app.models.a1c import A1cRecord
-from app.extensions import db, bcrypt, mail
+from app.extensions import db, mail_dispatcher, password_hasher
+from app.utils.password_hasher import PasswordHasherBusy
 from flask_jwt_extended import create_access_token
 import random
 from app.models.share import ShareRecord
-from app.models.news import News
+from app.models.share_inbox import ShareInbox
 from app.models.friend import Friend
 from app.models.diary import Diary
 from app.models.friendresult import FriendResult
+from app.models.friendship import Friendship
+from app.services.profile_loader import load_profile, build_profile
+from app.services.user_cache import current_user_id, invalidate_user, resolve_user, user_claims
+from app.services import friend_graph, invite_codes, news_feed, share_inbox, unread_counters
+from app.services.vitals import latest_vitals
+from app.services.readings import (
+    ReadingError, validate_blood_sugar, validate_blood_pressure, validate_weight,
+    validate_reading, insert_readings,
+)
+from app.utils import conditional, pagination
+from app.utils.db_routing import read_only
 import json
 from time import perf_counter
 from uuid import uuid4
 from flask import current_app
-import logging  # 添加這行
-from sqlalchemy.exc import SQLAlchemyError
+import logging
 from sqlalchemy.orm import joinedload
 import hashlib
 import time
-# 在 import 區域添加
-import gc
-import psutil
-import os
 
 
+logger = logging.getLogger(__name__)
+
 TZ_TAIWAN = timezone(timedelta(hours=8))
-def log_memory_usage(label=""):
-    try:
-        import psutil
-        import os
-        process = psutil.Process(os.getpid())
-        memory_info = process.memory_info()
-        print(f"{label} Memory: {memory_info.rss / 1024 / 1024:.2f} MB")
-    except:
-        pass
 
 
+# 批次匯入單次最多筆數
+MAX_BATCH_RECORDS = 1000
+
 EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
 class AuthController:
     
     @staticmethod
     def register(email: str, password: str, account: str = None):
-        print("Registering user...")
+        logger.debug("Registering user...")
         try:
             # 正規化
             email = (email or "").strip().lower()
@@ -97,7 +97,7 @@ class AuthController:
                             }, 409
                 
                     # 更新密碼和帳號
-                    pw_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+                    pw_hash = password_hasher.hash(password)
                     existing_user.password_hash = pw_hash
                     if account:
                         existing_user.account = account
@@ -110,15 +110,11 @@ class AuthController:
                     db.session.commit()
                     
                     # 發送驗證郵件
-                    try:
-                        msg = Message(
-                            subject="帳號驗證",
-                            recipients=[email],
-                            body=f"您的驗證碼是: {verification_code}，15分鐘內有效。"
-                        )
-                        mail.send(msg)
-                    except Exception as mail_error:
-                        pass
+                    mail_dispatcher.enqueue(
+                        subject="帳號驗證",
+                        recipients=[email],
+                        body=f"您的驗證碼是: {verification_code}，15分鐘內有效。"
+                    )
                 
                 return {
                     "status": "0",
@@ -137,7 +133,7 @@ class AuthController:
 
             # 建立新使用者
             if not existing_user:  # 只有新使用者才建立
-                pw_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+                pw_hash = password_hasher.hash(password)
                 verification_code = str(random.randint(100000, 999999))
                 
                 user = User(
@@ -151,6 +147,8 @@ class AuthController:
                 )
                 db.session.add(user)
                 db.session.flush()  # 先 flush 以取得 user.id
+                invite_codes.issue(user)
+                unread_counters.create_rows(user.id)
                 
                 # 為新使用者建立預設好友
                 default_friends = [
@@ -172,15 +170,11 @@ class AuthController:
                 db.session.commit()
 
                 # 發送驗證郵件
-                try:
-                    msg = Message(
-                        subject="帳號驗證",
-                        recipients=[email],
-                        body=f"您的驗證碼是: {verification_code}，15分鐘內有效。"
-                    )
-                    mail.send(msg)
-                except Exception as mail_error:
-                    pass
+                mail_dispatcher.enqueue(
+                    subject="帳號驗證",
+                    recipients=[email],
+                    body=f"您的驗證碼是: {verification_code}，15分鐘內有效。"
+                )
 
                 return {
                     "status": "0",
@@ -189,6 +183,13 @@ class AuthController:
                     "needs_verification": True
                 }, 201
         
+        except PasswordHasherBusy:
+            db.session.rollback()
+            return {
+                "status": "1",
+                "message": "Server busy, please try again later",
+                "message_code": "SERVER_BUSY"
+            }, 503
         except Exception as e:
             db.session.rollback()
             return {
@@ -199,7 +200,7 @@ class AuthController:
 
     @staticmethod
     def check_email(email: str):
-        print("Checking email...")
+        logger.debug("Checking email...")
         try:
         # 正規化 email
             email = (email or "").strip().lower()
@@ -239,15 +240,11 @@ class AuthController:
                     db.session.commit()
                     
                     # 發送驗證郵件
-                    try:
-                        msg = Message(
-                            subject="帳號驗證",
-                            recipients=[email],
-                            body=f"您的驗證碼是: {verification_code}，15分鐘內有效。"
-                        )
-                        mail.send(msg)
-                    except Exception as mail_error:
-                        pass
+                    mail_dispatcher.enqueue(
+                        subject="帳號驗證",
+                        recipients=[email],
+                        body=f"您的驗證碼是: {verification_code}，15分鐘內有效。"
+                    )
             
                 return {
                     "status": "0",
@@ -273,7 +270,7 @@ class AuthController:
 
     @staticmethod
     def login(email: str, password: str):
-        print("Logging in user...")
+        logger.debug("Logging in user...")
         try:
             # 正規化 email
             email = (email or "").strip().lower()
@@ -298,15 +295,19 @@ class AuthController:
             user = User.query.filter_by(email=email).first()
             
             # 驗證使用者存在且密碼正確
-            if not user or not bcrypt.check_password_hash(user.password_hash, password):
+            if not user or not password_hasher.check(user.password_hash, password):
                 return {
                     "status": "1",
                     "message": "Incorrect username or password",
                     "message_code": "INVALID_CREDENTIALS"
                 }, 401
 
-            # 建立 JWT，使用 email 作為 identity
-            token = create_access_token(identity=email)
+            # 雜湊成本與目前設定不同時，以新成本重新雜湊
+            if password_hasher.rehash_if_needed(user, password):
+                db.session.commit()
+
+            # 建立 JWT，使用 email 作為 identity，並附上 uid 讓後續請求免查詢使用者
+            token = create_access_token(identity=email, additional_claims=user_claims(user))
             
             return {
                 "status": "0",
@@ -315,6 +316,13 @@ class AuthController:
                 "token": token
             }, 200
     
+        except PasswordHasherBusy:
+            db.session.rollback()
+            return {
+                "status": "1",
+                "message": "Server busy, please try again later",
+                "message_code": "SERVER_BUSY"
+            }, 503
         except Exception as e:
             return {
                 "status": "1",
@@ -324,7 +332,7 @@ class AuthController:
 
     @staticmethod
     def send_verification(email: str):
-        print("Sending verification code...")
+        logger.debug("Sending verification code...")
         try:
             # 正規化 email
             email = (email or "").strip().lower()
@@ -346,15 +354,11 @@ class AuthController:
             db.session.commit()
             
             # 發送驗證郵件
-            try:
-                msg = Message(
-                    subject="帳號驗證",
-                    recipients=[email],
-                    body=f"您的驗證碼是: {verification_code}，15分鐘內有效。"
-                )
-                mail.send(msg)
-            except Exception as mail_error:
-                pass 
+            mail_dispatcher.enqueue(
+                subject="帳號驗證",
+                recipients=[email],
+                body=f"您的驗證碼是: {verification_code}，15分鐘內有效。"
+            )
             
             return {
                 "status": "0",
@@ -371,7 +375,7 @@ class AuthController:
 
     @staticmethod
     def verify_code(email: str, code: str):
-        print("Verifying code...")
+        logger.debug("Verifying code...")
         try:
             # 正規化
             email = (email or "").strip().lower()
@@ -407,8 +411,8 @@ class AuthController:
                     # 轉換到台灣時區
                     expires_time = expires_time.astimezone(TZ_TAIWAN)
             
-                print(f"Current time: {current_time}")
-                print(f"Expires time: {expires_time}")
+                logger.debug("Current time: %s", current_time)
+                logger.debug("Expires time: %s", expires_time)
                 
                 if expires_time < current_time:
                     return {
@@ -431,8 +435,7 @@ class AuthController:
             }, 200
         
         except Exception as e:
-            print(f"verify_code error: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("verify_code error: %s", e)
             db.session.rollback()
             return {
                 "status": "1",
@@ -442,7 +445,7 @@ class AuthController:
 
     @staticmethod
     def forgot_password(email: str):
-        print("Processing forgot password...")
+        logger.debug("Processing forgot password...")
         try:
             # 正規化 email
             email = (email or "").strip().lower()
@@ -471,23 +474,20 @@ class AuthController:
             ))
             
             # 更新使用者密碼
-            user.password_hash = bcrypt.generate_password_hash(new_password).decode("utf-8")
+            user.password_hash = password_hasher.hash(new_password)
             user.must_change_password = 1  # 設置必須重設密碼標記
             user.verification_code = None  # 清除驗證碼
             user.verification_code_expires = None
             
             db.session.commit()
+            invalidate_user(email)
             
             # 發送新密碼郵件
-            try:
-                msg = Message(
-                    subject="忘記密碼 - 新密碼",
-                    recipients=[email],
-                    body=f"您的新密碼是: {new_password}\n\n請登入後立即修改密碼。"
-                )
-                mail.send(msg)
-            except Exception as mail_error:
-                pass  # 移除 print
+            mail_dispatcher.enqueue(
+                subject="忘記密碼 - 新密碼",
+                recipients=[email],
+                body=f"您的新密碼是: {new_password}\n\n請登入後立即修改密碼。"
+            )
             
             return {
                 "status": "0",
@@ -496,6 +496,13 @@ class AuthController:
                 "temp_password": new_password  # 僅供測試，正式環境應移除
             }, 200
             
+        except PasswordHasherBusy:
+            db.session.rollback()
+            return {
+                "status": "1",
+                "message": "Server busy, please try again later",
+                "message_code": "SERVER_BUSY"
+            }, 503
         except Exception as e:
             db.session.rollback()
             return {
@@ -506,7 +513,7 @@ class AuthController:
 
     @staticmethod
     def reset_password(email: str, new_password: str):
-        print("Resetting password...")
+        logger.debug("Resetting password...")
         """
         重設密碼 - 使用者登入後主動修改密碼
         """
@@ -533,10 +540,11 @@ class AuthController:
                 }, 404
             
             # 更新密碼
-            user.password_hash = bcrypt.generate_password_hash(new_password).decode("utf-8")
+            user.password_hash = password_hasher.hash(new_password)
             user.must_change_password = 0  # 清除必須重設密碼標記
             
             db.session.commit()
+            invalidate_user(email)
             
             return {
                 "status": "0",
@@ -544,6 +552,13 @@ class AuthController:
                 "message_code": "PASSWORD_RESET_SUCCESS"
             }, 200
             
+        except PasswordHasherBusy:
+            db.session.rollback()
+            return {
+                "status": "1",
+                "message": "Server busy, please try again later",
+                "message_code": "SERVER_BUSY"
+            }, 503
         except Exception as e:
             db.session.rollback()
             return {
@@ -554,10 +569,10 @@ class AuthController:
 
 
     @staticmethod
+    @read_only
     def get_user(email: str):
-        """獲取用戶完整資訊，優化記憶體使用和錯誤處理"""
-        print(f"Getting user info for email: {email}")
-        log_memory_usage("Start get_user")
+        """獲取用戶完整資訊，以單一查詢載入並一次組裝回應"""
+        logger.debug("Getting user info for email: %s", email)
         
         # 確保在 Flask Application Context 中執行
         from flask import has_app_context
@@ -568,202 +583,28 @@ class AuthController:
                 with app.app_context():
                     return AuthController.get_user(email)
             except Exception as context_error:
-                print(f"Failed to create app context: {context_error}")
+                logger.error("Failed to create app context: %s", context_error)
                 return {
                     "status": "1",
                     "message": "System error: Unable to create application context",
                     "message_code": "SYSTEM_ERROR"
                 }, 500
 
-        # ---- Helper Functions ----
-        def ss(v, default=""):
-            """安全轉換為字串"""
-            return default if v is None else str(v)
-
-        def si0(v, default=0):
-            """安全轉換為整數"""
-            if v is None or v == "":
-                return default
-            try:
-                return int(v)
-            except (ValueError, TypeError):
-                return default
-
-        def sf0(v, default=0.0):
-            """安全轉換為浮點數，確保回傳數值而非 NaN/Inf"""
-            if v is None or v == "":
-                return default
-            try:
-                result = float(v)
-                # 檢查是否為有效數值
-                if result != result or result == float('inf') or result == float('-inf'):
-                    return default
-                return result
-            except (ValueError, TypeError):
-                return default
-
-        def safe_dt(dt, fmt="%Y-%m-%d %H:%M:%S"):
-            """安全轉換時間格式"""
-            if not dt:
-                return ""
-            try:
-                if isinstance(dt, str):
-                    for f in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%Y/%m/%d", "%Y/%m/%d %H:%M:%S"):
-                        try:
-                            return datetime.strptime(dt, f).strftime(fmt)
-                        except ValueError:
-                            continue
-                    return dt
-                if isinstance(dt, datetime):
-                    return dt.strftime(fmt)
-                if hasattr(dt, "strftime"):
-                    return dt.strftime(fmt)
-            except Exception as e:
-                print(f"Date conversion error: {e}")
-            return ""
-
-        def generate_invite_code(user_id):
-            """生成邀請碼"""
-            try:
-                user_id_int = int(user_id)
-                user_id_str = f"{user_id_int:04d}"
-                suffix = (user_id_int * 7 + 1000) % 9000 + 1000
-                return user_id_str + f"{suffix:04d}"
-            except Exception:
-                return f"{int(user_id):08d}"
-
-        # ---- 主要邏輯 ----
         try:
-            # 1. 查詢主用戶資料
-            user = User.query.filter_by(email=email).first()
-            if not user:
-                print(f"User not found: {email}")
+            # 1. 一次資料庫往返取得 user / default / setting / vip / 最新 A1c
+            profile = load_profile(email)
+            if profile is None:
+                logger.debug("User not found: %s", email)
                 return {
                     "status": "1",
                     "message": "User not found",
                     "message_code": "USER_NOT_FOUND"
                 }, 404
 
-            user_id = user.id
-            print(f"Found user ID: {user_id}")
-
-            # 2. 批量查詢相關資料（減少資料庫往返）
-            user_default = UserDefault.query.filter_by(user_id=user_id).first()
-            user_setting = UserSetting.query.filter_by(user_id=user_id).first()
-            user_vip = UserVip.query.filter_by(user_id=user_id).first()
-            user_a1c = (
-                A1cRecord.query
-                .filter_by(user_id=user_id)
-                .order_by(A1cRecord.created_at.desc())
-                .first()
-            )
-
-            log_memory_usage("After database queries")
-
-            # 3. 處理基本用戶資料
-            gender_value = 1 if getattr(user, "gender", False) else 0
-            invite_code = ss(getattr(user, "invite_code", None)) or generate_invite_code(user_id)
-            vip_level = si0(getattr(user_vip, "level", 0)) if user_vip else 0
-            user_status = "VIP" if vip_level > 0 else "general"
-
-            # 4. 構建回應資料（優先處理核心欄位）
-            user_data = {
-                "id": si0(user_id),
-                "name": ss(getattr(user, "name", "")),
-                "account": ss(getattr(user, "account", "")),
-                "email": ss(getattr(user, "email", "")),
-                "phone": ss(getattr(user, "phone", "")),
-                "fb_id": ss(getattr(user, "fb_id", "")),
-                "status": user_status,
-                "group": ss(getattr(user, "group", "0")),
-                "birthday": safe_dt(getattr(user, "birthday", None), "%Y-%m-%d"),
-                "height": sf0(getattr(user, "height", 0.0)),
-                "weight": sf0(getattr(user, "weight", 0.0)),
-                "gender": gender_value,
-                "address": ss(getattr(user, "address", "")),
-                "unread_records": [0, 0, 0],
-                "verified": 1 if getattr(user, "is_verified", False) else 0,
-                "privacy_policy": 1,
-                "must_change_password": si0(getattr(user, "must_change_password", 0)),
-                "fcm_id": ss(getattr(user, "fcm_id", "")),
-                "login_times": si0(getattr(user, "login_times", 0)),
-                "created_at": safe_dt(getattr(user, "created_at", None)),
-                "updated_at": safe_dt(getattr(user, "created_at", None)),
-                "invite_code": invite_code,
-                "verification_code": ss(getattr(user, "verification_code", "")),
-            }
-            
-            print(f"User data built, size: {len(str(user_data))} chars")
-
-            default_data = {
-                "id": si0(getattr(user_default, "id", 0)) if user_default else 0,
-                "user_id": si0(user_id),
-                "sugar_delta_max": sf0(getattr(user_default, "sugar_delta_max", 0.0)) if user_default else 0.0,
-                "sugar_delta_min": sf0(getattr(user_default, "sugar_delta_min", 0.0)) if user_default else 0.0,
-                "sugar_morning_max": sf0(getattr(user_default, "sugar_morning_max", 0.0)) if user_default else 0.0,
-                "sugar_morning_min": sf0(getattr(user_default, "sugar_morning_min", 0.0)) if user_default else 0.0,
-                "sugar_evening_max": sf0(getattr(user_default, "sugar_evening_max", 0.0)) if user_default else 0.0,
-                "sugar_evening_min": sf0(getattr(user_default, "sugar_evening_min", 0.0)) if user_default else 0.0,
-                "sugar_before_max": sf0(getattr(user_default, "sugar_before_max", 0.0)) if user_default else 0.0,
-                "sugar_before_min": sf0(getattr(user_default, "sugar_before_min", 0.0)) if user_default else 0.0,
-                "sugar_after_max": sf0(getattr(user_default, "sugar_after_max", 0.0)) if user_default else 0.0,
-                "sugar_after_min": sf0(getattr(user_default, "sugar_after_min", 0.0)) if user_default else 0.0,
-                "systolic_max": si0(getattr(user_default, "systolic_max", 0)) if user_default else 0,
-                "systolic_min": si0(getattr(user_default, "systolic_min", 0)) if user_default else 0,
-                "diastolic_max": si0(getattr(user_default, "diastolic_max", 0)) if user_default else 0,
-                "diastolic_min": si0(getattr(user_default, "diastolic_min", 0)) if user_default else 0,
-                "pulse_max": si0(getattr(user_default, "pulse_max", 0)) if user_default else 0,
-                "pulse_min": si0(getattr(user_default, "pulse_min", 0)) if user_default else 0,
-                "weight_max": sf0(getattr(user_default, "weight_max", 0.0)) if user_default else 0.0,
-                "weight_min": sf0(getattr(user_default, "weight_min", 0.0)) if user_default else 0.0,
-                "bmi_max": sf0(getattr(user_default, "bmi_max", 0.0)) if user_default else 0.0,
-                "bmi_min": sf0(getattr(user_default, "bmi_min", 0.0)) if user_default else 0.0,
-                "body_fat_max": sf0(getattr(user_default, "body_fat_max", 0.0)) if user_default else 0.0,
-                "body_fat_min": sf0(getattr(user_default, "body_fat_min", 0.0)) if user_default else 0.0,
-                "created_at": safe_dt(getattr(user_default, "created_at", None)) if user_default else "",
-                "updated_at": safe_dt(getattr(user_default, "updated_at", None)) if user_default else "",
-            }
-            
-            print(f"Default data built, size: {len(str(default_data))} chars")
-
-            setting_data = {
-                "id": si0(getattr(user_setting, "id", 0)) if user_setting else 0,
-                "user_id": si0(user_id),
-                "after_recording": si0(getattr(user_setting, "after_recording", 0)) if user_setting else 0,
-                "no_recording_for_a_day": si0(getattr(user_setting, "no_recording_for_a_day", 0)) if user_setting else 0,
-                "over_max_or_under_min": si0(getattr(user_setting, "over_max_or_under_min", 0)) if user_setting else 0,
-                "after_meal": si0(getattr(user_setting, "after_meal", 0)) if user_setting else 0,
-                "unit_of_sugar": si0(getattr(user_setting, "unit_of_sugar", 0)) if user_setting else 0,
-                "unit_of_weight": si0(getattr(user_setting, "unit_of_weight", 0)) if user_setting else 0,
-                "unit_of_height": si0(getattr(user_setting, "unit_of_height", 0)) if user_setting else 0,
-                "created_at": safe_dt(getattr(user_setting, "created_at", None)) if user_setting else "",
-                "updated_at": safe_dt(getattr(user_setting, "updated_at", None)) if user_setting else "",
-            }
-
-            vip_data = {
-                "id": si0(getattr(user_vip, "id", 0)) if user_vip else 0,
-                "user_id": si0(user_id),
-                "level": vip_level,
-                "remark": sf0(getattr(user_vip, "remark", 0.0)) if user_vip else 0.0,  # 必須是 Double
-                "started_at": safe_dt(getattr(user_vip, "started_at", None)) if user_vip else "",
-                "ended_at": safe_dt(getattr(user_vip, "ended_at", None)) if user_vip else "",
-                "created_at": safe_dt(getattr(user_vip, "created_at", None)) if user_vip else "",
-                "updated_at": safe_dt(getattr(user_vip, "updated_at", None)) if user_vip else "",
-            }
-
-            a1c_data = {
-                "message": ss(getattr(user_a1c, "message", "")) if user_a1c else "",
-                "latest_value": sf0(getattr(user_a1c, "A1c", 0.0)) if user_a1c else 0.0,
-                "latest_date": safe_dt(getattr(user_a1c, "record_date", None)) if user_a1c else "",
-            }
-            
-            print(f"All sub-data built successfully")
-
-            # 5. 組裝最終回應（將 default, setting, vip, a1c 放入 user 內部）
-            user_data["default"] = default_data
-            user_data["setting"] = setting_data
-            user_data["vip"] = vip_data
-            user_data["a1c"] = a1c_data
+            # 2. 組裝回應資料（只建構一次，序列化交由路由的 jsonify）
+            user_data = build_profile(*profile)
+            # 各團別未讀分享數
+            user_data["unread_records"] = unread_counters.counts(user_data["id"])["unread_shares"]
             
             response = {
                 "status": "0",
@@ -772,39 +613,11 @@ class AuthController:
                 "user": user_data,
             }
 
-            # 驗證 JSON 可序列化性
-            try:
-                import json
-                json_str = json.dumps(response, ensure_ascii=False)
-                print(f"Response size: {len(json_str)} bytes ({len(json_str)/1024:.2f} KB)")
-                
-                # 驗證可以重新解析
-                json.loads(json_str)
-                print("JSON validation: OK")
-            except Exception as json_error:
-                print(f"JSON serialization error: {json_error}")
-                # 如果序列化失敗，回傳錯誤
-                return {
-                    "status": "1",
-                    "message": "Data serialization error",
-                    "message_code": "SERIALIZATION_ERROR"
-                }, 500
-            
-            log_memory_usage("Before return")
-            print(f"Successfully retrieved user data for ID: {user_id}")
-            
-            # 立即清理查詢物件
-            del user, user_default, user_setting, user_vip, user_a1c
-            import gc
-            gc.collect()
-            
+            logger.debug("Successfully retrieved user data for ID: %s", user_data['id'])
             return response, 200
 
         except Exception as e:
-            print(f"Error in get_user: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-            log_memory_usage("Error occurred")
+            logger.exception("Error in get_user: %s", e)
             return {
                 "status": "1",
                 "message": "Failed to get user information",
@@ -815,21 +628,14 @@ class AuthController:
             # 清理資源
             try:
                 db.session.remove()  # 使用 remove() 而非 close()
-                print("Database session cleaned up")
+                logger.debug("Database session cleaned up")
             except Exception as e:
-                print(f"Session cleanup warning: {e}")
-
-            try:
-                import gc
-                gc.collect()
-                log_memory_usage("After cleanup")
-            except Exception as e:
-                print(f"GC warning: {e}")
+                logger.warning("Session cleanup warning: %s", e)
 
 
     @staticmethod
     def update_user(email: str, user_data: dict):
-        print("Updating user...")
+        logger.debug("Updating user...")
         try:
             # 查詢使用者
             user = User.query.filter_by(email=email).first()
@@ -842,6 +648,7 @@ class AuthController:
 
             # 記錄更新前的狀態
             original_email = user.email
+            original_ref = (user.email, user.account, user.name, user.group)
 
             # 更新使用者資料
             if 'name' in user_data and user_data.get('name'):  # 只有非空值才更新
@@ -926,6 +733,10 @@ class AuthController:
             # 儲存到資料庫
             db.session.commit()
 
+            # 快取中的欄位變更時清除使用者快取
+            if (user.email, user.account, user.name, user.group) != original_ref:
+                invalidate_user(original_email, user.email)
+
             return {
                 "status": "0",
                 "message": "Success",
@@ -942,11 +753,11 @@ class AuthController:
 
     @staticmethod
     def update_user_setting(email: str, setting_data: dict):
-        print("Updating user setting...")
+        logger.debug("Updating user setting...")
         try:  
             # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -954,10 +765,10 @@ class AuthController:
                 }, 404
 
             # 查詢或建立使用者設定
-            user_setting = UserSetting.query.filter_by(user_id=user.id).first()
+            user_setting = UserSetting.query.filter_by(user_id=user_id).first()
             if not user_setting:
                 # 如果沒有設定記錄，建立新的
-                user_setting = UserSetting(user_id=user.id)
+                user_setting = UserSetting(user_id=user_id)
                 db.session.add(user_setting)
 
             # 更新設定值
@@ -1013,12 +824,13 @@ class AuthController:
 
 
     @staticmethod
+    @read_only
     def get_medical_records(email: str):
-        print("Getting medical records...")
+        logger.debug("Getting medical records...")
         try:
             # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -1026,7 +838,7 @@ class AuthController:
                 }, 404
             
             # 查詢使用者的病歷記錄
-            user_medical = medical_records.query.filter_by(user_id=user.id).first()
+            user_medical = medical_records.query.filter_by(user_id=user_id).first()
 
             # 安全的屬性取得函數
             def safe_getattr(obj, attr, default=""):
@@ -1035,14 +847,6 @@ class AuthController:
                 except:
                     return default
 
-            def safe_strftime(dt, format_str="%Y-%m-%d %H:%M:%S", default=""):
-                if not dt:
-                    return default
-                try:
-                    return dt.strftime(format_str)
-                except:
-                    return default
-            
             # 建構病歷資料
             if user_medical:
                 # 將糖尿病類型字串轉回數字
@@ -1058,19 +862,19 @@ class AuthController:
                 
                 medical_info = {
                     "id": safe_getattr(user_medical, 'id', 0),
-                    "user_id": safe_getattr(user_medical, 'user_id', user.id),
+                    "user_id": safe_getattr(user_medical, 'user_id', user_id),
                     "diabetes_type": diabetes_type_int,
                     "oad": int(safe_getattr(user_medical, 'oad', 0)),
                     "insulin": int(safe_getattr(user_medical, 'insulin', 0)),
                     "anti_hypertensives": int(safe_getattr(user_medical, 'anti_hypertensives', 0)),
-                    "created_at": safe_strftime(safe_getattr(user_medical, 'created_at')),
-                    "updated_at": safe_strftime(safe_getattr(user_medical, 'updated_at'))
+                    "created_at": safe_getattr(user_medical, 'created_at'),
+                    "updated_at": safe_getattr(user_medical, 'updated_at')
                 }
             else:
                 # 如果沒有病歷記錄，回傳預設值
                 medical_info = {
                     "id": 0,
-                    "user_id": user.id,
+                    "user_id": user_id,
                     "diabetes_type": 0,
                     "oad": 0,
                     "insulin": 0,
@@ -1095,11 +899,11 @@ class AuthController:
 
     @staticmethod
     def update_medical_records(email: str, medical_data: dict):
-        print("Updating medical records...")
+        logger.debug("Updating medical records...")
         try:
             # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -1107,11 +911,11 @@ class AuthController:
                 }, 404
 
             # 查詢或建立使用者病歷記錄
-            user_medical = medical_records.query.filter_by(user_id=user.id).first()
+            user_medical = medical_records.query.filter_by(user_id=user_id).first()
             if not user_medical:
                 # 如果沒有病歷記錄，建立新的並設定預設值
                 user_medical = medical_records(
-                    user_id=user.id,
+                    user_id=user_id,
                     diabetes_type="無",  # 設定預設值
                     oad=0.0,            # 設定預設值
                     insulin=0.0,        # 設定預設值
@@ -1169,11 +973,11 @@ class AuthController:
         
     @staticmethod
     def add_a1c(email: str, a1c_value: float, record_date: str):
-        print("Adding A1c record...")
+        logger.debug("Adding A1c record...")
         try:
             # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -1200,7 +1004,7 @@ class AuthController:
             
             # 檢查是否已有相同日期的記錄
             existing_record = A1cRecord.query.filter_by(
-                user_id=user.id,
+                user_id=user_id,
                 record_date=record_date_parsed
             ).first()
             
@@ -1211,7 +1015,7 @@ class AuthController:
             else:
                 # 新增 HbA1c 記錄
                 new_a1c = A1cRecord(
-                    user_id=user.id,
+                    user_id=user_id,
                     A1c=a1c_value,
                     record_date=record_date_parsed
                 )
@@ -1234,12 +1038,13 @@ class AuthController:
             }, 500
         
     @staticmethod
+    @read_only
     def get_a1c_records(email: str):
-        print("Getting A1c records...")
+        logger.debug("Getting A1c records...")
         try:
             # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -1247,7 +1052,7 @@ class AuthController:
                 }, 404
             
             # 查詢 HbA1c 記錄
-            a1c_records = A1cRecord.query.filter_by(user_id=user.id).order_by(A1cRecord.record_date.desc()).all()
+            a1c_records = A1cRecord.query.filter_by(user_id=user_id).order_by(A1cRecord.record_date.desc()).all()
 
             # 格式化回應資料
             records_list = []
@@ -1256,9 +1061,9 @@ class AuthController:
                     "id": record.id,
                     "user_id": record.user_id,
                     "a1cs": str(record.a1cs),  
-                    "record_date": record.record_date.strftime("%Y-%m-%d"),
-                    "created_at": record.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                    "updated_at": record.updated_at.strftime("%Y-%m-%d %H:%M:%S")
+                    "record_date": record.record_date,
+                    "created_at": record.created_at,
+                    "updated_at": record.updated_at
                 })
 
             return {
@@ -1269,7 +1074,7 @@ class AuthController:
             }, 200
             
         except Exception as e:
-            print(traceback.format_exc())
+            logger.exception("Unhandled error")
             return {
                 "status": "1",
                 "message": "Failed to get HbA1c records",
@@ -1279,11 +1084,11 @@ class AuthController:
 
     @staticmethod
     def add_care_record(email: str, care_data: str):
-        print("Adding care record...")
+        logger.debug("Adding care record...")
         try:
             # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -1300,7 +1105,7 @@ class AuthController:
 
             # 檢查是否已有相同的照護紀錄
             existing_record = A1cRecord.query.filter_by(
-                user_id=user.id,
+                user_id=user_id,
                 care_data=care_data.strip()
             ).first()
 
@@ -1309,7 +1114,7 @@ class AuthController:
             else:
                 # 新增 Care 記錄
                 new_care = A1cRecord(
-                    user_id=user.id,
+                    user_id=user_id,
                     care_data=care_data.strip()
             )
             db.session.add(new_care)
@@ -1331,12 +1136,13 @@ class AuthController:
         
 
     @staticmethod
+    @read_only
     def get_care_records(email: str):
-        print("Getting care records...")
+        logger.debug("Getting care records...")
         try:
             # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -1344,7 +1150,7 @@ class AuthController:
                 }, 404
             
             # 查詢 Care 記錄
-            care_records = A1cRecord.query.filter_by(user_id=user.id).order_by(A1cRecord.created_at.desc()).all()
+            care_records = A1cRecord.query.filter_by(user_id=user_id).order_by(A1cRecord.created_at.desc()).all()
 
             # 格式化回應資料
             records_list = []
@@ -1353,8 +1159,8 @@ class AuthController:
                     "id": record.id,
                     "user_id": record.user_id,
                     "cares": record.care_data,
-                    "created_at": record.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                    "updated_at": record.updated_at.strftime("%Y-%m-%d %H:%M:%S")
+                    "created_at": record.created_at,
+                    "updated_at": record.updated_at
                 })
 
             return {
@@ -1375,17 +1181,17 @@ class AuthController:
 
     @staticmethod
     def add_share_record(email: str, record_type: int, record_id: int, relation_type: int):
-        print("Adding share record...")
+        logger.debug("Adding share record...")
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
                     "message_code": "USER_NOT_FOUND"
                 }, 404
             
-            print(f"Adding share record for user {user.id}: type={record_type}, id={record_id}, relation_type={relation_type}")
+            logger.debug("Adding share record for user %s: type=%s, id=%s, relation_type=%s", user_id, record_type, record_id, relation_type)
             
             # 驗證輸入參數
             if record_type not in [0, 1, 2, 3]:
@@ -1411,35 +1217,35 @@ class AuthController:
             
             # 查詢使用者是否有對應類型的好友
             friend_count = Friend.query.filter_by(
-                user_id=user.id,
+                user_id=user_id,
                 relation_type=relation_type
             ).count()
             
-            print(f"User {user.id} has {friend_count} friends of type {relation_type}")
+            logger.debug("User %s has %s friends of type %s", user_id, friend_count, relation_type)
 
             # 檢查是否有對應類型的好友
             if friend_count == 0:
                 relation_names = {0: "醫師團", 1: "親友團", 2: "控糖團"}
-                print(f"User {user.id} has no friends of type {relation_type}")
+                logger.debug("User %s has no friends of type %s", user_id, relation_type)
                 return {
                     "status": "1", 
                     "message": f"請先新增{relation_names.get(relation_type, '好友')}"
                 }, 400
             
-            print(f"Friend count check passed, proceeding to check existing share")
+            logger.debug("Friend count check passed, proceeding to check existing share")
             
             # 檢查是否已經分享過相同記錄
             existing_share = ShareRecord.query.filter_by(
-                user_id=user.id,
+                user_id=user_id,
                 record_type=record_type,
                 record_id=record_id,
                 relation_type=relation_type
             ).first()
             
-            print(f"Checking for existing share record...")
+            logger.debug("Checking for existing share record...")
             
             if existing_share:
-                print(f"Share record already exists: {existing_share.id}, updating timestamp")
+                logger.debug("Share record already exists: %s, updating timestamp", existing_share.id)
                 # 修正：允許更新分享時間，而不是返回錯誤
                 existing_share.shared_at = datetime.now(TZ_TAIWAN)
                 existing_share.updated_at = datetime.now(TZ_TAIWAN)
@@ -1451,11 +1257,11 @@ class AuthController:
                     "message_code": "UPDATE_SHARE_SUCCESS"
                 }, 200
             
-            print(f"Creating new share record...")
+            logger.debug("Creating new share record...")
             
             # 建立新的分享記錄
             new_share = ShareRecord(
-                user_id=user.id,
+                user_id=user_id,
                 record_type=record_type,
                 record_id=record_id,
                 relation_type=relation_type,
@@ -1465,9 +1271,14 @@ class AuthController:
             )
             
             db.session.add(new_share)
+            db.session.flush()  # 取得 new_share.id
+            viewer_ids = share_inbox.audience(user_id, relation_type)
+            if share_inbox.enabled():
+                share_inbox.fan_out(new_share, viewer_ids)
+            unread_counters.shares_added(viewer_ids, relation_type)
             db.session.commit()
             
-            print(f"Share record created successfully: {new_share.id}")
+            logger.debug("Share record created successfully: %s", new_share.id)
 
             return {
                 "status": "0",
@@ -1476,8 +1287,7 @@ class AuthController:
             }, 200
             
         except Exception as e:
-            print(f"add_share_record error: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("add_share_record error: %s", e)
             db.session.rollback()
             return {
                 "status": "1",
@@ -1511,19 +1321,26 @@ class AuthController:
             return friend is not None
             
         except Exception as e:
-            print(f"Check friend relation error: {str(e)}")
+            logger.error("Check friend relation error: %s", e)
             return False
 
 
     @staticmethod
-    def get_shared_records(email: str, relation_type):
-        print(f"=== GET SHARED RECORDS START ===")
-        print(f"Email: {email}, relation_type: {relation_type}")
-        log_memory_usage("Start get_shared_records")
+    @read_only
+    def get_shared_records(email: str, relation_type, before: str = None, after: str = None, limit=None):
+        """
+        取得好友分享給指定團別的記錄，依 created_at、id 由新到舊排序
+
+        Args:
+            before: 游標，取比此位置更舊的記錄（往回捲動）
+            after: 游標，取比此位置更新的記錄（檢查新分享）
+            limit: 每頁筆數，預設 50
+        """
+        logger.debug("Email: %s, relation_type: %s", email, relation_type)
         
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {"status": "1", "message": "User not found",
                 "message_code": "USER_NOT_FOUND"}, 404
 
@@ -1537,93 +1354,79 @@ class AuthController:
                 return {"status": "1", "message": "Invalid relation_type parameter format",
                 "message_code": "INVALID_RELATION_TYPE_FORMAT"}, 400
 
-            print(f"User ID: {user.id}, relation_type: {relation_type_int}")
-
-            # 🔧 新增:查詢當前用戶的好友列表(該 relation_type 的好友)
-            # 查詢雙向好友關係:我發出的 + 我收到的
-            my_friends_sent = FriendResult.query.filter_by(
-                user_id=user.id,
-                type=relation_type_int,
-                status=1  # 已接受
-            ).all()
-            
-            my_friends_received = FriendResult.query.filter_by(
-                relation_id=user.id,
-                type=relation_type_int,
-                status=1  # 已接受
-            ).all()
-            
-            # 收集所有好友的 user_id
-            friend_ids = set()
-            for fr in my_friends_sent:
-                friend_ids.add(fr.relation_id)
-            for fr in my_friends_received:
-                friend_ids.add(fr.user_id)
-            
-            print(f"Found {len(friend_ids)} friends with relation_type={relation_type_int}: {friend_ids}")
-
-            if not friend_ids:
-                print("No friends found for this relation_type")
-                return {"status": "0", "message": "Success",
-                "message_code": "SUCCESS", "records": []}, 200
+            logger.debug("User ID: %s, relation_type: %s", user_id, relation_type_int)
+
+            try:
+                page_size = pagination.parse_limit(limit)
+                before_cursor = pagination.decode_cursor(before) if before else None
+                after_cursor = pagination.decode_cursor(after) if after else None
+            except ValueError:
+                return {"status": "1", "message": "Invalid cursor or limit",
+                "message_code": "INVALID_PAGINATION"}, 400
 
-            # 🔧 修改:只查詢好友分享給該 relation_type 的記錄
             # 🚀 性能優化:使用 joinedload 預先載入分享者資訊,避免N+1查詢
-            share_records = (ShareRecord.query
-                .options(joinedload(ShareRecord.user))  # 預先載入分享者資訊
-                .filter(
+            query = ShareRecord.query.options(joinedload(ShareRecord.user), joinedload(ShareRecord.diary))  # 預先載入分享者與日記
+            if share_inbox.enabled():
+                # fan-out 模式：分享時已寫入收件匣，由 share_inbox(viewer_id, relation_type, created_at) 索引支援
+                query = query.join(ShareInbox, ShareInbox.share_id == ShareRecord.id).filter(
+                    ShareInbox.viewer_id == user_id,
+                    ShareInbox.relation_type == relation_type_int,
+                )
+                ts_column, id_column = ShareInbox.created_at, ShareInbox.share_id
+            else:
+                # 已接受的好友 id（行程內好友關係圖快取）
+                friend_ids = friend_graph.friend_ids(user_id, relation_type_int)
+                logger.debug("Found %s friends with relation_type=%s: %s", len(friend_ids), relation_type_int, friend_ids)
+
+                if not friend_ids:
+                    logger.debug("No friends found for this relation_type")
+                    return {"status": "0", "message": "Success",
+                    "message_code": "SUCCESS", "records": [],
+                    "next_cursor": "", "prev_cursor": ""}, 200
+
+                # 🔧 修改:只查詢好友分享給該 relation_type 的記錄
+                # 由 share_records(relation_type, user_id, created_at) 索引支援
+                query = query.filter(
                     ShareRecord.user_id.in_(friend_ids),  # 只查詢我的好友分享的
                     ShareRecord.relation_type == relation_type_int  # 分享給該 relation_type 的
                 )
-                .order_by(ShareRecord.created_at.desc())
-                .limit(50)
-                .all()
-            )
-            
-            print(f"📊 Found {len(share_records)} share records from friends")
-            print(f"📊 Share records details:")
-            for sr in share_records:
-                print(f"  - ShareRecord {sr.id}: user_id={sr.user_id}, record_type={sr.record_type}, record_id={sr.record_id}, relation_type={sr.relation_type}")
-            log_memory_usage("After query in get_shared_records")
+                ts_column, id_column = ShareRecord.created_at, ShareRecord.id
+
+            # 以 (created_at, id) 作為 keyset
+            if before_cursor:
+                query = query.filter(pagination.before(ts_column, id_column, before_cursor))
+            if after_cursor:
+                # 取游標之後最接近的一頁，再反轉為由新到舊
+                query = query.filter(pagination.after(ts_column, id_column, after_cursor))
+                query = query.order_by(ts_column.asc(), id_column.asc())
+            else:
+                query = query.order_by(ts_column.desc(), id_column.desc())
+
+            share_records = query.limit(page_size + 1).all()
+            has_more = len(share_records) > page_size
+            share_records = share_records[:page_size]
+            if after_cursor:
+                share_records.reverse()
+            
+            logger.debug("Found %s share records from friends", len(share_records))
+            if logger.isEnabledFor(logging.DEBUG):
+                for sr in share_records:
+                    logger.debug("  - ShareRecord %s: user_id=%s, record_type=%s, record_id=%s, relation_type=%s", sr.id, sr.user_id, sr.record_type, sr.record_id, sr.relation_type)
+
+            # prev_cursor 用於取得更新的記錄，next_cursor 用於取得更舊的記錄
+            if share_records:
+                newest, oldest = share_records[0], share_records[-1]
+                prev_cursor = pagination.encode_cursor(newest.created_at, newest.id)
+                older_exists = has_more or bool(after_cursor)
+                next_cursor = pagination.encode_cursor(oldest.created_at, oldest.id) if older_exists else ""
+            else:
+                prev_cursor = after or ""
+                next_cursor = ""
 
             if not share_records:
                 return {"status": "0", "message": "Success",
-                "message_code": "SUCCESS", "records": []}, 200
-
-            # 修正的時間格式化函數
-            def safe_datetime_simple(dt):
-                try:
-                    if dt is None:
-                        return ""
-                    
-                    # 檢查是否為日期時間物件
-                    if not hasattr(dt, 'strftime'):
-                        # 如果不是日期時間物件，直接返回空字串
-                        return ""
-                    
-                    # 確保 datetime 物件有時區資訊
-                    if hasattr(dt, 'tzinfo') and dt.tzinfo is None:
-                        # 如果沒有時區資訊，假設是台灣時區
-                        dt = dt.replace(tzinfo=TZ_TAIWAN)
-                    elif hasattr(dt, 'tzinfo') and dt.tzinfo is not None:
-                        # 如果有時區資訊，轉換到台灣時區
-                        dt = dt.astimezone(TZ_TAIWAN)
-                    
-                    # 使用標準格式
-                    return dt.strftime("%Y-%m-%d %H:%M:%S")
-                    
-                except AttributeError as e:
-                    # datetime 物件沒有預期的屬性
-                    print(f"DateTime attribute error: {e}")
-                    return ""
-                except ValueError as e:
-                    # strftime 格式錯誤
-                    print(f"DateTime format error: {e}")
-                    return ""
-                except Exception as e:
-                    # 其他未預期的錯誤
-                    print(f"Unexpected datetime error: {e}")
-                    return ""
+                "message_code": "SUCCESS", "records": [],
+                "next_cursor": next_cursor, "prev_cursor": prev_cursor}, 200
 
             # 安全的數值獲取函數
             def safe_get(obj, attr, default=0):
@@ -1633,7 +1436,7 @@ class AuthController:
                     value = getattr(obj, attr, default)
                     return value if value is not None else default
                 except Exception as e:
-                    print(f"Error getting attribute {attr}: {e}")
+                    logger.error("Error getting attribute %s: %s", attr, e)
                     return default
 
             # 簡化的記錄處理
@@ -1643,23 +1446,18 @@ class AuthController:
                     # 🔧 使用 relationship 獲取分享者資訊(已通過joinedload預先載入)
                     sharer = share.user
                     if not sharer:
-                        print(f"❌ Sharer user {share.user_id} not found, skipping record {share.id}")
+                        logger.error("Sharer user %s not found, skipping record %s", share.user_id, share.id)
                         continue
                     
-                    # 🔧 使用 relationship 獲取 diary 記錄(已在模型中設定為joined)
+                    # 🔧 使用 relationship 獲取 diary 記錄(已通過joinedload預先載入)
                     diary = share.diary
                     
-                    # 🔧 添加調試日誌
-                    print(f"📝 Processing ShareRecord:")
-                    print(f"  - ShareRecord ID: {share.id}")
-                    print(f"  - Sharer: {sharer.name} (ID: {share.user_id})")
-                    print(f"  - Record Type: {share.record_type}")
-                    print(f"  - Diary Record ID: {share.record_id}")
-                    print(f"  - Relation Type: {share.relation_type}")
-                    if diary:
-                        print(f"  - Diary exists: ID={diary.id}, Sugar={diary.sugar}, Weight={diary.weight}")
-                    else:
-                        print(f"  - ⚠️ Diary not found for record_id={share.record_id}")
+                    logger.debug(
+                        "Processing ShareRecord %s: sharer=%s, record_type=%s, record_id=%s, relation_type=%s",
+                        share.id, share.user_id, share.record_type, share.record_id, share.relation_type,
+                    )
+                    if not diary:
+                        logger.warning("Diary not found for record_id=%s", share.record_id)
 
                     # 🔧 構建記錄資料,包含分享者資訊
                     record_data = {
@@ -1680,9 +1478,9 @@ class AuthController:
                         "sugar": float(safe_get(diary, "sugar", 0)),
                         "meal_type": int(safe_get(diary, "meal", 0)),
                         "bmi": float(safe_get(diary, "bmi", 0)),
-                        "shared_at": safe_datetime_simple(share.shared_at),
-                        "recorded_at": safe_datetime_simple(safe_get(diary, "recorded_at")),
-                        "created_at": safe_datetime_simple(safe_get(diary, "created_at")),
+                        "shared_at": share.shared_at or "",
+                        "recorded_at": safe_get(diary, "recorded_at", ""),
+                        "created_at": safe_get(diary, "created_at", ""),
                         "meal": int(safe_get(diary, "meal", 0)),
                         "timeperiod": int(safe_get(diary, "timeperiod", 0)),
                         "tag": [[]],
@@ -1698,54 +1496,38 @@ class AuthController:
                     }
                     
                     records_list.append(record_data)
-                    print(f"Successfully processed record {share.id}")
+                    logger.debug("Successfully processed record %s", share.id)
                     
                     # 立即清理 diary 物件以節省記憶體
                     diary = None
                     
                 except Exception as e:
-                    print(f"Error processing share record {share.id}: {e}")
+                    logger.error("Error processing share record %s: %s", share.id, e)
                     continue
 
-            print(f"=== RETURNING {len(records_list)} RECORDS ===")
-            log_memory_usage("End get_shared_records")
             return {"status": "0", "message": "Success",
-            "message_code": "SUCCESS", "records": records_list}, 200
+            "message_code": "SUCCESS", "records": records_list,
+            "next_cursor": next_cursor, "prev_cursor": prev_cursor}, 200
 
         except Exception as e:
-            print(f"Critical error in get_shared_records: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            log_memory_usage("Error in get_shared_records")
+            logger.exception("Critical error in get_shared_records: %s", e)
             return {"status": "1", "message": "Failed to get share records",
             "message_code": "GET_SHARE_RECORDS_FAILED"}, 500
-        finally:
-            # 強制記憶體清理
-            try:
-                import gc
-                # 清理局部變數
-                locals_to_clear = ['user', 'share_records', 'records_list', 'diary']
-                for var_name in locals_to_clear:
-                    if var_name in locals():
-                        locals()[var_name] = None
-                
-                # 強制垃圾回收
-                collected = gc.collect()
-                print(f"GC collected {collected} objects in get_shared_records cleanup")
-                
-                # 記錄清理後的記憶體狀況
-                log_memory_usage("After get_shared_records cleanup")
-                
-            except Exception as cleanup_error:
-                print(f"Cleanup error in get_shared_records: {cleanup_error}")
 
 
     @staticmethod
-    def get_news(email: str):
-        print("Getting news...")
+    @read_only
+    def get_news(email: str, cursor: str = None, limit=None):
+        """
+        取得最新消息，依使用者群組篩選
+
+        Args:
+            cursor / limit: keyset 分頁；有提供其中之一時才分頁並回傳 next_cursor
+        """
+        logger.debug("Getting news...")
         try:
             # 查詢使用者
-            user = User.query.filter_by(email=email).first()
+            user = resolve_user(email)
             if not user:
                 return {
                     "status": "1",
@@ -1753,55 +1535,28 @@ class AuthController:
                     "message_code": "USER_NOT_FOUND"
                 }, 404
             
-            # 查詢最新消息（可以根據群組或全部顯示）
-            news_records = News.query.order_by(News.created_at.desc()).all()
-            
-            # 格式化回應資料
-            news_list = []
-            for news in news_records:
-                # 安全的時間格式化
-                def safe_strftime(dt, format_str="%Y-%m-%d %H:%M:%S", default=""):
-                    if not dt:
-                        return default
-                    try:
-                        return dt.strftime(format_str)
-                    except:
-                        return default
-                
-                # 安全的字符串處理 - 避免中文字符
-                def safe_string(text, default=""):
-                    if not text:
-                        return default
-                    try:
-                        # 檢查是否含有非ASCII字符
-                        text.encode('ascii')
-                        return text
-                    except UnicodeEncodeError:
-                        # 如果包含中文或其他非ASCII字符，返回安全的替代文本
-                        return f"Content {news.id}"
-            
-                news_data = {
-                    "id": news.id,
-                    "member_id": news.member_id,
-                    "group": news.group,
-                    "title": safe_string(news.title, f"News {news.id}"),
-                    "message": safe_string(news.message, "Content available"),
-                    "pushed_at": safe_strftime(news.pushed_at),
-                    "created_at": safe_strftime(news.created_at),
-                    "updated_at": safe_strftime(news.updated_at)
-                }
-                
-                news_list.append(news_data)
+            # 同群組的使用者共用已快取的頁面
+            try:
+                page = news_feed.get_page(news_feed.parse_group(user.group), cursor, limit)
+            except ValueError:
+                return {
+                    "status": "1",
+                    "message": "Invalid cursor or limit",
+                    "message_code": "INVALID_PAGINATION"
+                }, 400
 
-            return {
+            response = {
                 "status": "0",
                 "message": "News retrieved successfully",
                 "message_code": "SUCCESS",
-                "news": news_list
-            }, 200
+                "news": page["news"]
+            }
+            if page["next_cursor"] is not None:
+                response["next_cursor"] = page["next_cursor"]
+            return response, 200
             
         except Exception as e:
-            print(f"Get news error: {str(e)}")
+            logger.error("Get news error: %s", e)
             return {
                 "status": "1",
                 "message": "Failed to get news",
@@ -1810,66 +1565,58 @@ class AuthController:
 
 
     @staticmethod
+    @read_only
     def get_friend_list(email: str):
-        print("Getting friend list...")
+        logger.debug("Getting friend list...")
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {"status": "1", "message": "User not found", "message_code": "USER_NOT_FOUND"}, 404
             
-            # 查詢所有雙向關係中，狀態為 1 (已接受) 的紀錄
-            # 預先載入對方的使用者資料 (user 和 relation_user)
-            friend_relations = (
-                FriendResult.query
-                .options(joinedload(FriendResult.user), joinedload(FriendResult.relation_user))
-                .filter(
-                    db.or_(FriendResult.user_id == user.id, FriendResult.relation_id == user.id),
-                    FriendResult.status == 1
-                )
-            ).all()
+            # 已接受的好友（行程內好友關係圖快取），再一次查詢取得對方的使用者資料
+            graph = friend_graph.get_graph(user_id)
+            friend_ids = graph.friend_ids()
+            friend_users = {}
+            if friend_ids:
+                rows = db.session.execute(
+                    db.select(User.id, User.name, User.account, User.email).where(User.id.in_(friend_ids))
+                ).all()
+                friend_users = {row.id: row for row in rows}
 
             friends_list = []
-            seen_friend_ids = set() # 用來避免重複加入同一個好友
+            seen_friend_ids = set() # 同一人在多個團別時只列出一次
+            relation_type_map = {0: "醫師團", 1: "親友團", 2: "控糖團"}
 
-            for fr in friend_relations:
-                friend_user = None
-                # 判斷對方是誰
-                if fr.user_id == user.id:
-                    friend_user = fr.relation_user
-                else:
-                    friend_user = fr.user
-                
-                #【防呆】如果好友 user 物件不存在，或已經加過了，就跳過
+            for edge in graph.edges:
+                friend_user = friend_users.get(edge.friend_id)
+                #【防呆】如果好友 user 不存在，或已經加過了，就跳過
                 if not friend_user or friend_user.id in seen_friend_ids:
                     continue
                 
                 seen_friend_ids.add(friend_user.id)
 
-                relation_type_map = {0: "醫師團", 1: "親友團", 2: "控糖團"}
-                
                 friends_list.append({
                     "id": friend_user.id,
                     "name": friend_user.name or friend_user.account or f"User {friend_user.id}",
-                    "relation_type": fr.type,
-                    "relation_type_name": relation_type_map.get(fr.type, "general"),
+                    "relation_type": edge.relation_type,
+                    "relation_type_name": relation_type_map.get(edge.relation_type, "general"),
                     "email": friend_user.email or "",
-                    "created_at": fr.created_at.isoformat() if fr.created_at else ""
+                    "created_at": edge.created_at or ""
                 })
 
             return {"status": "0", "message": "Success", "message_code": "SUCCESS", "friends": friends_list}, 200
 
         except Exception as e:
-            print(f"Get friend list error: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Get friend list error: %s", e)
             return {"status": "1", "message": "Failed to get friends list", "message_code": "GET_FRIENDS_LIST_FAILED"}, 500
     
     @staticmethod
     def add_friend(email: str, friend_name: str, relation_type: int = 0):
-        print("Adding friend...")
+        logger.debug("Adding friend...")
         try:
             # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -1894,7 +1641,7 @@ class AuthController:
             
             # 檢查是否已存在相同名稱的好友
             existing_friend = Friend.query.filter_by(
-                user_id=user.id,
+                user_id=user_id,
                 name=friend_name.strip()
             ).first()
             
@@ -1907,7 +1654,7 @@ class AuthController:
             
             # 建立新好友
             new_friend = Friend(
-                user_id=user.id,
+                user_id=user_id,
                 name=friend_name.strip(),
                 relation_type=relation_type,
                 created_at=datetime.now(TZ_TAIWAN),
@@ -1931,12 +1678,78 @@ class AuthController:
             }, 500
 
     @staticmethod
-    def get_diary_entries(email: str, date: str = None):
-        print("Getting diary entries...")
+    def _diary_query(user_id: int, date: str = None, start: str = None, end: str = None, record_type: str = None):
+        """
+        建立套用篩選條件的日記查詢（不含排序與分頁）
+
+        Raises:
+            ValueError: 日期格式錯誤
+        """
+        query = Diary.query.filter_by(user_id=user_id)
+
+        # 指定日期視為當日整天的區間，直接比較 recorded_at 以使用 (user_id, recorded_at) 索引
+        if date:
+            start, end = date, date
+        range_conditions = pagination.range_filters(Diary.recorded_at, start, end)
+        if range_conditions:
+            query = query.filter(*range_conditions)
+
+        if record_type:
+            query = query.filter(Diary.type == record_type)
+        return query
+
+    @staticmethod
+    @read_only
+    def get_diary_etag(email: str, date: str = None, start: str = None, end: str = None,
+                       record_type: str = None, cursor: str = None, limit=None):
+        """
+        以日記的彙總值（筆數、最大 id、最大 updated_at）產生 ETag，不載入資料列
+
+        Returns:
+            ETag 字串；使用者不存在或參數錯誤時回傳 None（交由 get_diary_entries 回應錯誤）
+        """
+        user_id = current_user_id(email)
+        if not user_id:
+            return None
+        try:
+            query = AuthController._diary_query(user_id, date, start, end, record_type)
+        except ValueError:
+            return None
+        return conditional.rows_etag(
+            query, Diary.id, Diary.updated_at,
+            "diary", user_id, date, start, end, record_type, cursor, limit,
+        )
+
+    @staticmethod
+    @read_only
+    def get_news_etag(email: str, cursor: str = None, limit=None):
+        """取得快取頁面的 ETag；使用者不存在或參數錯誤時回傳 None"""
+        user = resolve_user(email)
+        if not user:
+            return None
+        try:
+            return news_feed.get_page(news_feed.parse_group(user.group), cursor, limit)["etag"]
+        except ValueError:
+            return None
+
+    @staticmethod
+    @read_only
+    def get_diary_entries(email: str, date: str = None, start: str = None, end: str = None,
+                          record_type: str = None, cursor: str = None, limit=None):
+        """
+        取得日記記錄，依 recorded_at、id 由新到舊排序
+
+        Args:
+            date: 指定單日 (YYYY-MM-DD)
+            start / end: 時間區間 (YYYY-MM-DD 或 YYYY-MM-DD HH:MM:SS)，end 只有日期時包含整天
+            record_type: 記錄類型 (blood_sugar / blood_pressure / weight / diet)
+            cursor / limit: keyset 分頁；有提供其中之一時才分頁並回傳 next_cursor
+        """
+        logger.debug("Getting diary entries...")
         try:
             # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -1944,32 +1757,37 @@ class AuthController:
                 }, 404
 
             # 建立查詢
-            query = Diary.query.filter_by(user_id=user.id)
+            try:
+                query = AuthController._diary_query(user_id, date, start, end, record_type)
+            except ValueError:
+                return {
+                    "status": "1",
+                    "message": "Date format error, should be YYYY-MM-DD",
+                    "message_code": "INVALID_DATE_FORMAT"
+                }, 400
 
-            # 如果有提供日期，篩選特定日期
-            if date:
+            paginate = cursor is not None or limit is not None
+            if paginate:
                 try:
-                    target_date = datetime.strptime(date, "%Y-%m-%d").date()
-                    query = query.filter(
-                        db.func.date(Diary.recorded_at) == target_date
-                    )
+                    page_size = pagination.parse_limit(limit)
+                    if cursor:
+                        query = query.filter(
+                            pagination.before(Diary.recorded_at, Diary.id, pagination.decode_cursor(cursor))
+                        )
                 except ValueError:
                     return {
                         "status": "1",
-                        "message": "Date format error, should be YYYY-MM-DD",
-                        "message_code": "INVALID_DATE_FORMAT"
+                        "message": "Invalid cursor or limit",
+                        "message_code": "INVALID_PAGINATION"
                     }, 400
 
-            diary_records = query.order_by(Diary.recorded_at.desc()).all()
-
-            # 安全的時間格式化
-            def safe_strftime(dt, format_str="%Y-%m-%d %H:%M:%S", default=""):
-                if not dt:
-                    return default
-                try:
-                    return dt.strftime(format_str)
-                except:
-                    return default
+            query = query.order_by(Diary.recorded_at.desc(), Diary.id.desc())
+            if paginate:
+                diary_records = query.limit(page_size + 1).all()
+                has_more = len(diary_records) > page_size
+                diary_records = diary_records[:page_size]
+            else:
+                diary_records = query.all()
 
             # 安全的 JSON 解析
             def safe_json_parse(json_data, default=None):
@@ -2022,25 +1840,30 @@ class AuthController:
                             "lng": str(safe_json_parse(diary.location, {}).get("lng", "") or "")
                             },
                         "reply": diary.reply or "",
-                        "recorded_at": safe_strftime(diary.recorded_at),
+                        "recorded_at": diary.recorded_at or "",
                         "type": diary.type or ""
                     }
                     diary_list.append(diary_data)
                     
                 except Exception as record_error:
-                    print(f"Error processing diary record {diary.id}: {record_error}")
+                    logger.error("Error processing diary record %s: %s", diary.id, record_error)
                     continue  # 跳過有問題的記錄
 
-            return {
+            response = {
                 "status": "0",
                 "message": "Success",
                 "message_code": "SUCCESS",
                 "diary": diary_list
-            }, 200
+            }
+            if paginate:
+                last = diary_records[-1] if diary_records else None
+                response["next_cursor"] = (
+                    pagination.encode_cursor(last.recorded_at, last.id) if has_more and last else ""
+                )
+            return response, 200
 
         except Exception as e:
-            print(f"Get diary error: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Get diary error: %s", e)
             return {
                 "status": "1",
                 "message": "Failed to get diary entries",
@@ -2049,11 +1872,11 @@ class AuthController:
     
     @staticmethod
     def update_user_badge(email: str, badge: int):
-        print("Updating user badge...")
+        logger.debug("Updating user badge...")
         try:
             # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -2087,7 +1910,7 @@ class AuthController:
                 }, 400
             
             # 檢查是否有 user_default 記錄
-            user_default = UserDefault.query.filter_by(user_id=user.id).first()
+            user_default = UserDefault.query.filter_by(user_id=user_id).first()
             
             if user_default:
                 # 更新現有記錄
@@ -2096,7 +1919,7 @@ class AuthController:
             else:
                 # 建立新記錄
                 user_default = UserDefault(
-                    user_id=user.id,
+                    user_id=user_id,
                     badge=badge,
                     created_at=datetime.now(TZ_TAIWAN),
                     updated_at=datetime.now(TZ_TAIWAN)
@@ -2120,13 +1943,14 @@ class AuthController:
             }, 500
 
     @staticmethod
+    @read_only
     def get_user_records(email: str, diet: int = None):
-        print("Getting user records...")
+        logger.debug("Getting user records...")
 
         try:
         # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -2144,56 +1968,18 @@ class AuthController:
                         "message_code": "DIET_MUST_BE_INTEGER"
                     }, 400
             
-            # 建立查詢條件
-            query = Diary.query.filter_by(user_id=user.id)
-            
-            # 如果有提供 diet 參數，按時段篩選
-            if diet is not None:
-                query = query.filter(Diary.timeperiod == diet)
-            
-            # 查詢記錄，按時間排序（最新的在前）
-            records = query.order_by(Diary.recorded_at.desc()).all()
-            
-            # 初始化回傳資料結構
-            blood_sugars = {"sugar": 0.0}
-            blood_pressures = {"systolic": 0, "diastolic": 0, "pulse": 0}
-            weights = {"weight": 0.0}
-            
-            # 處理記錄資料
-            for record in records:
-                # 取得最新的血糖記錄
-                if record.sugar is not None and record.sugar > 0 and blood_sugars["sugar"] == 0.0:
-                    blood_sugars["sugar"] = float(record.sugar)
-                
-                # 取得最新的血壓記錄
-                if (record.systolic is not None and record.systolic > 0 and 
-                    blood_pressures["systolic"] == 0):
-                    blood_pressures["systolic"] = int(record.systolic)
-                    blood_pressures["diastolic"] = int(record.diastolic or 0)
-                    blood_pressures["pulse"] = int(record.pulse or 0)
-                
-                # 取得最新的體重記錄
-                if record.weight is not None and record.weight > 0 and weights["weight"] == 0.0:
-                    weights["weight"] = float(record.weight)
-                
-                # 如果所有資料都已找到，可以提早結束
-                if (blood_sugars["sugar"] > 0 and 
-                    blood_pressures["systolic"] > 0 and 
-                    weights["weight"] > 0):
-                    break
+            # 各類型各取最新一筆（diet 參數可篩選時段）
+            vitals = latest_vitals(user_id, diet)
 
             return {
                 "status": "0",
                 "message": "Success",
                 "message_code": "SUCCESS",
-                "blood_sugars": blood_sugars,
-                "blood_pressures": blood_pressures,
-                "weights": weights
+                **vitals
             }, 200
             
         except Exception as e:
-            print(f"Get user records error: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Get user records error: %s", e)
             return {
                 "status": "1",
                 "message": "Failed to get health records",
@@ -2204,66 +1990,33 @@ class AuthController:
 
     @staticmethod
     def add_blood_sugar(email: str, sugar: float, timeperiod: int = None, recorded_at: str = None, drug: int = None, exercise: int = None):
-        print("Adding blood sugar record...")
+        logger.debug("Adding blood sugar record...")
         try:
         # 查詢使用者
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
                     "message_code": "USER_NOT_FOUND"
                 }, 404
             
-            # 驗證必要參數
-            if sugar is None:
-                return {
-                    "status": "1",
-                    "message": "Sugar parameter cannot be empty",
-                    "message_code": "SUGAR_REQUIRED"
-                }, 400
-            
-            # 驗證血糖值
+            # 驗證參數（與批次匯入共用規則）
             try:
-                sugar = float(sugar)
-                if sugar <= 0 or sugar > 1000:
-                    return {
-                        "status": "1",
-                        "message": "Invalid blood sugar value",
-                        "message_code": "INVALID_BLOOD_SUGAR"
-                    }, 400
-            except (ValueError, TypeError):
+                values = validate_blood_sugar(sugar, timeperiod, recorded_at, drug, exercise)
+            except ReadingError as e:
                 return {
                     "status": "1",
-                    "message": "Blood sugar value must be a number",
-                    "message_code": "BLOOD_SUGAR_MUST_BE_NUMBER"
+                    "message": e.message,
+                    "message_code": e.message_code
                 }, 400
             
-            # 處理記錄時間
-            if recorded_at:
-                try:
-                    recorded_datetime = datetime.strptime(recorded_at, "%Y-%m-%d %H:%M:%S")
-                    recorded_datetime = recorded_datetime.replace(tzinfo=TZ_TAIWAN)  # 修正：使用台灣時區
-                except ValueError:
-                    return {
-                        "status": "1",
-                        "message": "Invalid recorded_at format, should be YYYY-MM-DD HH:MM:SS",
-                        "message_code": "INVALID_RECORDED_AT_FORMAT"
-                    }, 400
-            else:
-                recorded_datetime = datetime.now(TZ_TAIWAN)  # 修正：使用台灣時區
-            
             # 建立血糖記錄
             new_blood_sugar = Diary(
-                user_id=user.id,
-                sugar=sugar,
-                timeperiod=timeperiod or 0,
-                drug=drug or 0,
-                exercise=exercise or 0,
-                type="blood_sugar",
-                recorded_at=recorded_datetime,
+                user_id=user_id,
                 created_at=datetime.now(TZ_TAIWAN),
-                updated_at=datetime.now(TZ_TAIWAN)
+                updated_at=datetime.now(TZ_TAIWAN),
+                **values
             )
             
             db.session.add(new_blood_sugar)
@@ -2278,8 +2031,7 @@ class AuthController:
         
         except Exception as e:
             db.session.rollback()
-            print(f"Add blood sugar error: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Add blood sugar error: %s", e)
             return {
                 "status": "1",
                 "message": "Failed to add blood sugar record",
@@ -2288,11 +2040,12 @@ class AuthController:
 
 
     @staticmethod
+    @read_only
     def get_friend_results(email: str):
-        print("Getting friend results...")
+        logger.debug("Getting friend results...")
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {"status": "1", "message": "User not found", "message_code": "USER_NOT_FOUND"}, 404
 
             # 🔧 修復：只查詢待處理(status=0)或未讀(read=0)的邀請結果
@@ -2301,7 +2054,7 @@ class AuthController:
                 FriendResult.query
                 .options(joinedload(FriendResult.relation_user)) # 預先載入被我邀請的人
                 .filter(
-                    FriendResult.user_id == user.id,
+                    FriendResult.user_id == user_id,
                     # 只返回: 1) 待處理的邀請 或 2) 未讀的邀請結果
                     db.or_(
                         FriendResult.status == 0,  # 待處理
@@ -2312,7 +2065,7 @@ class AuthController:
                 .all()
             )
 
-            print(f"Found {len(sent_invites)} friend result records for user {user.id}")
+            logger.debug("Found %s friend result records for user %s", len(sent_invites), user_id)
 
             results_list = []
             for invite in sent_invites:
@@ -2329,8 +2082,8 @@ class AuthController:
                     "type": invite.type,
                     "status": invite.status,
                     "read": invite.read,
-                    "created_at": invite.created_at.strftime("%Y-%m-%d %H:%M:%S") if invite.created_at else "",
-                    "updated_at": invite.updated_at.strftime("%Y-%m-%d %H:%M:%S") if invite.updated_at else "",
+                    "created_at": invite.created_at or "",
+                    "updated_at": invite.updated_at or "",
                     "relation": {
                         "id": invited_user.id,
                         "name": invited_user.name or "",
@@ -2338,28 +2091,28 @@ class AuthController:
                     }
                 })
 
-            print(f"Returning {len(results_list)} friend results")
+            logger.debug("Returning %s friend results", len(results_list))
             return {"status": "0", "message": "success", "message_code": "SUCCESS", "results": results_list}, 200
 
         except Exception as e:
-            print(f"Get friend results error: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Get friend results error: %s", e)
             return {"status": "1", "message": "system error", "message_code": "SYSTEM_ERROR"}, 500
 
 
     @staticmethod
+    @read_only
     def get_friend_requests(email: str):
-        print("Getting friend requests...")
+        logger.debug("Getting friend requests...")
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {"status": "1", "message": "User not found", "message_code": "USER_NOT_FOUND"}, 404
 
             # 使用 joinedload 預先載入邀請發送者的資料，避免 N+1 查詢
             friend_requests = (
                 FriendResult.query
                 .options(joinedload(FriendResult.user))
-                .filter_by(relation_id=user.id, status=0) # 只查詢待處理的
+                .filter_by(relation_id=user_id, status=0) # 只查詢待處理的
                 .order_by(FriendResult.created_at.desc())
                 .all()
             )
@@ -2371,7 +2124,7 @@ class AuthController:
                 
                 #【防呆】如果邀請者 user 莫名被刪除，就跳過這筆邀請，避免崩潰
                 if not from_user:
-                    print(f"Warning: Skipping friend request {req.id} because inviter user {req.user_id} not found.")
+                    logger.warning("Warning: Skipping friend request %s because inviter user %s not found.", req.id, req.user_id)
                     continue
 
                 requests_list.append({
@@ -2381,8 +2134,8 @@ class AuthController:
                     "type": req.type,
                     "status": req.status,
                     "read": req.read,
-                    "created_at": req.created_at.strftime("%Y-%m-%d %H:%M:%S") if req.created_at else "",
-                    "updated_at": req.updated_at.strftime("%Y-%m-%d %H:%M:%S") if req.updated_at else "",
+                    "created_at": req.created_at or "",
+                    "updated_at": req.updated_at or "",
                     "user": {
                         "id": from_user.id,
                         "name": from_user.name or "",
@@ -2393,99 +2146,37 @@ class AuthController:
             return {"status": "0", "message": "Success", "message_code": "SUCCESS", "requests": requests_list}, 200
 
         except Exception as e:
-            print(f"Get friend requests error: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Get friend requests error: %s", e)
             return {"status": "1", "message": "Failed to get invitation list", "message_code": "GET_INVITATIONS_FAILED"}, 500
 
 
     @staticmethod
     def add_weight(email: str, weight: float, bmi: float = None, body_fat: float = None, height: float = None, recorded_at: str = None):
-        user = User.query.filter_by(email=email).first()
-        if not user:
+        user_id = current_user_id(email)
+        if not user_id:
             return {
                 "status": "1",
                 "message": "User not found",
                 "message_code": "USER_NOT_FOUND"
             }, 404
 
-        # 參數型態安全轉換
+        # 驗證參數（與批次匯入共用規則）
         try:
-            if height is not None:
-                height = float(height)
-                if height <= 0 or height > 300:
-                    return {
-                        "status": "1",
-                        "message": "Invalid height parameter",
-                        "message_code": "INVALID_HEIGHT"
-                    }, 400
-            else:
-                height = 170.0  # 預設值，可依需求調整
-
-            if weight is not None:
-                weight = float(weight)
-                if weight <= 0 or weight > 500:
-                    return {
-                        "status": "1",
-                        "message": "Invalid weight parameter",
-                        "message_code": "INVALID_WEIGHT"
-                    }, 400
-            else:
-                return {
-                    "status": "1",
-                    "message": "Weight parameter cannot be empty",
-                    "message_code": "WEIGHT_REQUIRED"
-                }, 400
-
-            if bmi is not None:
-                bmi = float(bmi)
-                if bmi <= 0 or bmi > 100:
-                    return {
-                        "status": "1",
-                        "message": "Invalid BMI parameter",
-                        "message_code": "INVALID_BMI"
-                    }, 400
-            else:
-                bmi = round(weight / ((height / 100) ** 2), 2)
-
-            if body_fat is not None:
-                body_fat = float(body_fat)
-                if body_fat < 0 or body_fat > 100:
-                    return {
-                        "status": "1",
-                        "message": "Invalid body fat parameter",
-                        "message_code": "INVALID_BODY_FAT"
-                    }, 400
-            else:
-                body_fat = 0.0
-
-        except (ValueError, TypeError):
+            values = validate_weight(weight, bmi, body_fat, height, recorded_at)
+        except ReadingError as e:
             return {
                 "status": "1",
-                "message": "Parameter type error",
-                "message_code": "PARAMETER_TYPE_ERROR"
+                "message": e.message,
+                "message_code": e.message_code
             }, 400
-        
-        if recorded_at:
-            try:
-                recorded_datetime = datetime.strptime(recorded_at, "%Y-%m-%d %H:%M:%S")
-                recorded_datetime = recorded_datetime.replace(tzinfo=TZ_TAIWAN)
-            except Exception:
-                recorded_datetime = datetime.now(TZ_TAIWAN)
-        else:
-            recorded_datetime = datetime.now(TZ_TAIWAN)
-        
 
         # 新增體重記錄到 Diary
         try:
             new_diary = Diary(
-                user_id=user.id,
-                weight=weight,
-                body_fat=body_fat,
-                bmi=bmi,
-                type="weight",
-                recorded_at=recorded_datetime,
+                user_id=user_id,
                 created_at=datetime.now(TZ_TAIWAN),
-                updated_at=datetime.now(TZ_TAIWAN)
+                updated_at=datetime.now(TZ_TAIWAN),
+                **values
             )
             db.session.add(new_diary)
             db.session.commit()
@@ -2496,7 +2187,7 @@ class AuthController:
                 "new_record_id": new_diary.id
             }, 200
         except Exception as e:
-            print(traceback.format_exc())
+            logger.exception("Unhandled error")
             db.session.rollback()
             return {
                 "status": "1",
@@ -2508,11 +2199,82 @@ class AuthController:
 
 
 
+    @staticmethod
+    def add_records_batch(email: str, records):
+        """
+        批次新增量測記錄（血糖 / 血壓 / 體重可混合）
+
+        每筆依 type 以與單筆 API 相同的規則驗證，通過驗證的記錄在同一個交易中一次寫入；
+        回傳每筆的新 id 或錯誤
+        """
+        logger.debug("Adding records batch...")
+        try:
+            user_id = current_user_id(email)
+            if not user_id:
+                return {
+                    "status": "1",
+                    "message": "User not found",
+                    "message_code": "USER_NOT_FOUND"
+                }, 404
+
+            if not isinstance(records, list) or not records:
+                return {
+                    "status": "1",
+                    "message": "Records must be a non-empty array",
+                    "message_code": "RECORDS_REQUIRED"
+                }, 400
+
+            if len(records) > MAX_BATCH_RECORDS:
+                return {
+                    "status": "1",
+                    "message": f"Too many records, at most {MAX_BATCH_RECORDS} per request",
+                    "message_code": "TOO_MANY_RECORDS"
+                }, 400
+
+            results = [None] * len(records)
+            valid_indexes = []
+            valid_rows = []
+            for index, item in enumerate(records):
+                try:
+                    valid_rows.append(validate_reading(item))
+                    valid_indexes.append(index)
+                except ReadingError as e:
+                    results[index] = {
+                        "index": index,
+                        "status": "1",
+                        "message": e.message,
+                        "message_code": e.message_code
+                    }
+
+            new_ids = insert_readings(user_id, valid_rows)
+            db.session.commit()
+
+            for index, new_id in zip(valid_indexes, new_ids):
+                results[index] = {"index": index, "status": "0", "id": new_id}
+
+            return {
+                "status": "0",
+                "message": "Success",
+                "message_code": "SUCCESS",
+                "inserted": len(new_ids),
+                "failed": len(records) - len(new_ids),
+                "results": results
+            }, 200
+
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Add records batch error: %s", e)
+            return {
+                "status": "1",
+                "message": "Failed to add records",
+                "message_code": "ADD_RECORDS_FAILED"
+            }, 500
+
     @staticmethod
     def delete_user_records(email: str, delete_ids):
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -2540,7 +2302,7 @@ class AuthController:
             # 轉成 int
             delete_ids = [int(i) for i in delete_ids]
 
-            Diary.query.filter(Diary.user_id == user.id, Diary.id.in_(delete_ids)).delete(synchronize_session=False)
+            Diary.query.filter(Diary.user_id == user_id, Diary.id.in_(delete_ids)).delete(synchronize_session=False)
             db.session.commit()
 
             return {
@@ -2551,7 +2313,7 @@ class AuthController:
 
         except Exception as e:
             db.session.rollback()
-            print(f"Delete user records error: {str(e)}")
+            logger.error("Delete user records error: %s", e)
             return {
                 "status": "1",
                 "message": "Failed to delete health records",
@@ -2563,8 +2325,8 @@ class AuthController:
     @staticmethod
     def add_diet_record(email: str, description: str, meal: int, tag: list, image: int, lat: float, lng: float, recorded_at: str):
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -2589,7 +2351,7 @@ class AuthController:
 
             # 新增 Diary 記錄
             new_diary = Diary(
-                user_id=user.id,
+                user_id=user_id,
                 description=description,
                 meal=meal,
                 tag=tag_json,
@@ -2613,7 +2375,7 @@ class AuthController:
 
         except Exception as e:
             db.session.rollback()
-            print(f"Add diet record error: {str(e)}")
+            logger.error("Add diet record error: %s", e)
             return {
                 "status": "1",
                 "message": "Failed to add diet record",
@@ -2625,62 +2387,30 @@ class AuthController:
     @staticmethod
     def add_blood_pressure(email: str, systolic, diastolic, pulse, recorded_at: str = None):
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
                     "message_code": "USER_NOT_FOUND"
                 }, 404
 
-            # 重新啟用參數驗證 - 這是關鍵修正
-            if systolic is None or diastolic is None or pulse is None:
-                return {
-                    "status": "1",
-                    "message": "Blood pressure or heart rate parameters cannot be empty",
-                    "message_code": "BP_HR_REQUIRED"
-                }, 400
-
-            # 安全的型態轉換，支援字串和數字
+            # 驗證參數（與批次匯入共用規則）
             try:
-                systolic = int(float(systolic)) if systolic is not None else 0
-                diastolic = int(float(diastolic)) if diastolic is not None else 0
-                pulse = int(float(pulse)) if pulse is not None else 0
-            except (ValueError, TypeError):
-                return {
-                    "status": "1",
-                    "message": "Blood pressure and heart rate must be numbers",
-                    "message_code": "BP_HR_MUST_BE_NUMBER"
-                }, 400
-
-            # 現在可以安全地進行數值比較
-            if systolic <= 0 or diastolic <= 0 or pulse <= 0:
+                values = validate_blood_pressure(systolic, diastolic, pulse, recorded_at)
+            except ReadingError as e:
                 return {
                     "status": "1",
-                    "message": "Invalid blood pressure or heart rate values",
-                    "message_code": "INVALID_BP_HR"
+                    "message": e.message,
+                    "message_code": e.message_code
                 }, 400
 
-            # 處理記錄時間
-            if recorded_at:
-                try:
-                    recorded_datetime = datetime.strptime(recorded_at, "%Y-%m-%d %H:%M:%S")
-                    recorded_datetime = recorded_datetime.replace(tzinfo=TZ_TAIWAN)
-                except Exception:
-                    recorded_datetime = datetime.now(TZ_TAIWAN)
-            else:
-                recorded_datetime = datetime.now(TZ_TAIWAN)
-
             # 新增血壓記錄
             new_pressure = Diary(
-                user_id=user.id,
-                systolic=systolic,
-                diastolic=diastolic,
-                pulse=pulse,
-                type="blood_pressure",
-                recorded_at=recorded_datetime,
+                user_id=user_id,
                 created_at=datetime.now(TZ_TAIWAN),
-                updated_at=datetime.now(TZ_TAIWAN)
+                updated_at=datetime.now(TZ_TAIWAN),
+                **values
             )
             db.session.add(new_pressure)
             db.session.commit()
@@ -2694,8 +2424,7 @@ class AuthController:
 
         except Exception as e:
             db.session.rollback()
-            print(f"Add blood pressure error: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Add blood pressure error: %s", e)
             return {
                 "status": "1",
                 "message": "Failed to add blood pressure record",
@@ -2706,9 +2435,9 @@ class AuthController:
 
 
     @staticmethod
+    @read_only
     def get_friend_invite_code(email: str):
-        print("Getting friend invite code...")
-        log_memory_usage("Start get_friend_invite_code")
+        logger.debug("Getting friend invite code...")
         
         # 確保在 Flask Application Context 中執行
         from flask import has_app_context
@@ -2719,7 +2448,7 @@ class AuthController:
                 with app.app_context():
                     return AuthController.get_friend_invite_code(email)
             except Exception as context_error:
-                print(f"Failed to create app context: {context_error}")
+                logger.error("Failed to create app context: %s", context_error)
                 return {
                     "status": "1",
                     "message": "System error: Unable to create application context",
@@ -2727,65 +2456,23 @@ class AuthController:
                 }, 500
         
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
                     "message_code": "USER_NOT_FOUND"
                 }, 404
 
-            # 檢查 User 表是否已有邀請碼
-            if hasattr(user, 'invite_code') and user.invite_code:
-                # 如果已經有邀請碼，直接返回
-                log_memory_usage("Return existing invite code")
-                return {
-                    "status": "0",
-                    "message": "Success",
-                    "message_code": "SUCCESS",
-                    "invite_code": user.invite_code
-                }, 200
-
-            # 生成固定的邀請碼（基於 user_id 的數學運算）
-            user_id_str = f"{user.id:04d}"
-            suffix = (user.id * 7 + 1000) % 9000 + 1000
-            invite_code = user_id_str + f"{suffix:04d}"
-            
-            print(f"Generated fixed invite code for user {user.id}: {invite_code}")
-            log_memory_usage("Generated invite code")
+            # 邀請碼於註冊時發放（既有使用者以 flask backfill-invite-codes 補發），通常只需讀取
+            invite_code = db.session.execute(
+                db.select(User.invite_code).where(User.id == user_id)
+            ).scalar()
+            if not invite_code:
+                # 尚未補發時寫入後才回傳，確保 invite_codes.resolve 找得到
+                logger.warning("User %s has no invite code yet, issuing one (run `flask backfill-invite-codes`)", user_id)
+                invite_code = invite_codes.ensure(user_id)
 
-            # 更安全的資料庫操作
-            try:
-                # 檢查是否需要更新資料庫
-                if hasattr(user, 'invite_code'):
-                    if user.invite_code != invite_code:
-                        user.invite_code = invite_code
-                        # 移除對 updated_at 的引用，因為 User 模型中可能沒有這個欄位
-                        
-                        # 使用較安全的提交方式
-                        db.session.flush()  # 先 flush，檢查是否有錯誤
-                        db.session.commit()
-                        log_memory_usage("After commit invite code")
-                        print(f"Successfully updated invite_code for user {user.id}")
-                    else:
-                        print(f"Invite code already up to date for user {user.id}")
-                else:
-                    print(f"User model doesn't have invite_code field, returning generated code")
-                    
-            except SQLAlchemyError as db_error:
-                print(f"Database operation failed: {db_error}")
-                db.session.rollback()
-                # 即使資料庫更新失敗，仍然返回生成的邀請碼
-                print("Continuing with generated invite code despite DB error")
-            except Exception as unexpected_error:
-                print(f"Unexpected database error: {unexpected_error}")
-                try:
-                    db.session.rollback()
-                except:
-                    pass
-                print("Continuing with generated invite code despite unexpected error")
-            
-            log_memory_usage("End get_friend_invite_code")
             return {
                 "status": "0",
                 "message": "success",
@@ -2794,91 +2481,71 @@ class AuthController:
             }, 200
 
         except Exception as e:
-            try:
-                db.session.rollback()
-            except:
-                pass  # 如果 rollback 也失敗，忽略錯誤
-            print(f"Get friend invite code error: {str(e)}")
-            print(traceback.format_exc())
-            log_memory_usage("Error in get_friend_invite_code")
+            logger.exception("Get friend invite code error: %s", e)
             return {
                 "status": "1",
                 "message": "failed to get invite code",
                 "message_code": "INVITE_CODE_ERROR"
             }, 500
-        finally:
-            # 強制記憶體清理
-            try:
-                import gc
-                # 清理局部變數
-                locals_to_clear = ['user', 'invite_code', 'user_id_str', 'suffix']
-                for var_name in locals_to_clear:
-                    if var_name in locals():
-                        locals()[var_name] = None
-                
-                # 強制垃圾回收
-                collected = gc.collect()
-                print(f"GC collected {collected} objects in get_friend_invite_code cleanup")
-                
-                # 記錄清理後的記憶體狀況
-                log_memory_usage("After get_friend_invite_code cleanup")
-                
-            except Exception as cleanup_error:
-                print(f"Cleanup error in get_friend_invite_code: {cleanup_error}")
-        
 
 
     @staticmethod
     def send_friend_invite(email: str, invite_code: str, relation_type: int):
-        print(f"DEBUG: Starting send_friend_invite for user {email}")
+        logger.debug("Starting send_friend_invite for user %s", email)
         try:
             if not invite_code or not str(invite_code).strip():
                 return {"status": "1", "message": "invite code cannot be empty", "message_code": "INVITE_CODE_EMPTY"}, 400
 
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {"status": "1", "message": "user not found", "message_code": "USER_NOT_FOUND"}, 404
 
-            invited_user = User.query.filter_by(invite_code=str(invite_code).strip()).first()
-            if not invited_user:
+            invited_id = invite_codes.resolve(invite_code)
+            if not invited_id:
                 return {"status": "1", "message": "Please enter a valid friend invite code", "message_code": "INVALID_INVITE_CODE"}, 404
 
-            if user.id == invited_user.id:
+            if user_id == invited_id:
                 return {"status": "1", "message": "Cannot invite yourself", "message_code": "CANNOT_INVITE_SELF"}, 400
             
-            # 檢查雙向是否已是好友或已有待處理邀請
+            # 已是好友時不需查詢；否則檢查雙向是否已有待處理邀請
+            if friend_graph.are_friends(user_id, invited_id, relation_type):
+                return {"status": "1", "message": "Already friends", "message_code": "ALREADY_FRIENDS"}, 409
+
             existing_relation = FriendResult.query.filter(
                 db.or_(
-                    db.and_(FriendResult.user_id == user.id, FriendResult.relation_id == invited_user.id),
-                    db.and_(FriendResult.user_id == invited_user.id, FriendResult.relation_id == user.id)
+                    db.and_(FriendResult.user_id == user_id, FriendResult.relation_id == invited_id),
+                    db.and_(FriendResult.user_id == invited_id, FriendResult.relation_id == user_id)
                 ),
                 FriendResult.type == relation_type
             ).first()
 
             if existing_relation:
                 if existing_relation.status == 1:
+                    # 快取尚未反映其他 worker 的接受
+                    friend_graph.invalidate(user_id, invited_id)
                     return {"status": "1", "message": "Already friends", "message_code": "ALREADY_FRIENDS"}, 409
                 elif existing_relation.status == 0:
                     return {"status": "1", "message": "Invitation already sent", "message_code": "INVITATION_ALREADY_SENT"}, 409
 
             # 🔧 關鍵修復：創建新的邀請記錄
             new_invite = FriendResult(
-                user_id=user.id,                # 邀請發送者
-                relation_id=invited_user.id,    # 邀請接收者
+                user_id=user_id,                # 邀請發送者
+                relation_id=invited_id,    # 邀請接收者
                 type=relation_type,             # 關係類型
                 status=0,                       # 待處理
                 read=0                          # 未讀
             )
             db.session.add(new_invite)
+            unread_counters.invite_sent(user_id, invited_id, relation_type)
             db.session.commit()
+            friend_graph.invalidate(user_id, invited_id)
             
-            print(f"DEBUG: Friend invite sent successfully from {user.id} to {invited_user.id}, invite_id={new_invite.id}")
+            logger.debug("Friend invite sent successfully from %s to %s, invite_id=%s", user_id, invited_id, new_invite.id)
             return {"status": "0", "message": "friend invitation sent successfully", "message_code": "SUCCESS"}, 200
 
         except Exception as e:
             db.session.rollback()
-            print(f"DEBUG: Critical error in send_friend_invite: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Critical error in send_friend_invite: %s", e)
             return {"status": "1", "message": "failed to send invitation", "message_code": "SEND_INVITATION_FAILED"}, 500
 
 
@@ -2886,72 +2553,17 @@ class AuthController:
     def find_user_by_invite_code(invite_code):
         """
         根據邀請碼找到對應的使用者
-        直接從 User 表中查詢
+        以 users.invite_code 唯一索引查詢（邀請碼對應的 id 有行程內快取）
         """
         try:
-            # 嚴格的參數檢查
-            if not invite_code:
-                print("Invite code is empty")
+            user_id = invite_codes.resolve(invite_code)
+            if user_id is None:
+                logger.debug("No user found for invite code: %s", invite_code)
                 return None
-                
-            invite_code_str = str(invite_code).strip()
-            
-            # 檢查邀請碼格式
-            if len(invite_code_str) != 8:
-                print(f"Invalid invite code format: {invite_code_str} (length: {len(invite_code_str)})")
-                return None
-                
-            if not invite_code_str.isdigit():
-                print(f"Invalid invite code format: {invite_code_str} (not all digits)")
-                return None
-            
-            print(f"Looking for user with invite code: {invite_code_str}")
-            
-            # 方法1：如果 User 表有 invite_code 欄位，直接查詢
-            try:
-                if hasattr(User, 'invite_code'):
-                    user = User.query.filter_by(invite_code=invite_code_str).first()
-                    if user:
-                        print(f"Found user {user.id} via User table")
-                        return user
-            except Exception as db_error:
-                print(f"Database query error in method 1: {db_error}")
-            
-            # 方法2：解析邀請碼前4位作為 user_id（備用方法）
-            try:
-                user_id_str = invite_code_str[:4]
-                user_id = int(user_id_str)
-                
-                if user_id <= 0:
-                    print(f"Invalid user_id extracted from invite code: {user_id}")
-                    return None
-                
-                user = User.query.filter_by(id=user_id).first()
-                if user:
-                    # 驗證邀請碼是否正確（使用相同的生成邏輯）
-                    try:
-                        suffix = (user.id * 7 + 1000) % 9000 + 1000
-                        expected_code = f"{user.id:04d}{suffix:04d}"
-                        
-                        if invite_code_str == expected_code:
-                            print(f"Found user {user.id} via code parsing")
-                            return user
-                        else:
-                            print(f"Code mismatch: expected {expected_code}, got {invite_code_str}")
-                    except Exception as calc_error:
-                        print(f"Error calculating expected code: {calc_error}")
-                else:
-                    print(f"No user found with ID: {user_id}")
-                
-            except (ValueError, TypeError) as parse_error:
-                print(f"Error parsing user_id from invite code: {parse_error}")
-                
-            print(f"No user found for invite code: {invite_code_str}")
-            return None
-            
+            return db.session.get(User, user_id)
+
         except Exception as e:
-            print(f"Critical error in find_user_by_invite_code: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Critical error in find_user_by_invite_code: %s", e)
             return None
 
     @staticmethod
@@ -2961,119 +2573,82 @@ class AuthController:
         應該檢查 FriendResult 表中是否有已接受的邀請
         """
         try:
-            # 檢查雙向的已接受邀請
-            existing_friendship = FriendResult.query.filter(
-                db.or_(
-                    db.and_(
-                        FriendResult.user_id == user_id,
-                        FriendResult.relation_id == target_user_id,
-                        FriendResult.type == relation_type,
-                        FriendResult.status == 1  # 已接受
-                    ),
-                    db.and_(
-                        FriendResult.user_id == target_user_id,
-                        FriendResult.relation_id == user_id,
-                        FriendResult.type == relation_type,
-                        FriendResult.status == 1  # 已接受
-                    )
-                )
-            ).first()
-            
-            return existing_friendship is not None
+            # 雙向的已接受邀請（行程內好友關係圖快取）
+            return friend_graph.are_friends(user_id, target_user_id, relation_type)
             
         except Exception as e:
-            print(f"Is already friend error: {str(e)}")
+            logger.error("Is already friend error: %s", e)
             return False
 
 
     @staticmethod
     def accept_friend_invite(email: str, invite_id: int):
-        print(f"========== ACCEPT INVITE START ==========")
-        print(f"Invite ID: {invite_id}, User Email: {email}")
+        logger.debug("Invite ID: %s, User Email: %s", invite_id, email)
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
-                print(f"❌ User not found: {email}")
+            user_id = current_user_id(email)
+            if not user_id:
+                logger.error("User not found: %s", email)
                 return {"status": "1", "message": "User not found", "message_code": "USER_NOT_FOUND"}, 404
 
-            print(f"✅ User found: ID={user.id}, Email={user.email}")
+            logger.debug("User found: ID=%s, Email=%s", user_id, email)
 
             # 🔧 先查詢邀請是否存在(不限制status)
             invite = FriendResult.query.filter_by(
                 id=invite_id,
-                relation_id=user.id
+                relation_id=user_id
             ).first()
 
             if not invite:
-                print(f"❌ Invitation not found: invite_id={invite_id}, relation_id={user.id}")
+                logger.error("Invitation not found: invite_id=%s, relation_id=%s", invite_id, user_id)
                 return {"status": "1", "message": "Invitation not found", "message_code": "INVITATION_NOT_FOUND"}, 404
             
-            print(f"✅ Invitation found: ID={invite.id}, Status={invite.status}, From User={invite.user_id}, To User={invite.relation_id}")
+            logger.debug("Invitation found: ID=%s, Status=%s, From User=%s, To User=%s", invite.id, invite.status, invite.user_id, invite.relation_id)
             
             # 🔧 檢查邀請狀態
             if invite.status == 1:
                 # 已經接受過了,直接返回成功(冪等性)
-                print(f"⚠️ Invitation already accepted (status=1)")
+                logger.warning("Invitation already accepted (status=1)")
                 return {"status": "0", "message": "Friend invitation already accepted", "message_code": "ALREADY_ACCEPTED"}, 200
             elif invite.status == 2:
                 # 已經拒絕過了
-                print(f"⚠️ Invitation was already rejected (status=2)")
+                logger.warning("Invitation was already rejected (status=2)")
                 return {"status": "1", "message": "Invitation was already rejected", "message_code": "ALREADY_REJECTED"}, 400
             
-            print(f"✅ Invitation status=0 (pending), proceeding to accept...")
+            logger.debug("Invitation status=0 (pending), proceeding to accept...")
             
             # status=0,待處理的邀請,可以接受
             # 更新邀請狀態為接受
             invite.status = 1
             invite.read = 1
             invite.updated_at = datetime.now(TZ_TAIWAN)
-            print(f"✅ Updated invite status to 1 (accepted)")
+            unread_counters.invite_answered(invite.user_id, user_id, invite.type)
+            logger.debug("Updated invite status to 1 (accepted)")
             
-            # 🔧 檢查反向好友關係是否已存在(避免重複創建)
-            existing_reverse = FriendResult.query.filter_by(
-                user_id=user.id,
-                relation_id=invite.user_id
-            ).first()
-            
-            if existing_reverse:
-                print(f"⚠️ Reverse friendship already exists: ID={existing_reverse.id}, Status={existing_reverse.status}")
-            else:
-                print(f"✅ Creating reverse friendship: user_id={user.id} -> relation_id={invite.user_id}")
-                # (可選但建議) 為了方便雙向查詢，可以建立一筆反向的已接受紀錄
-                # 這能簡化後續查詢好友列表的邏輯
-                reverse_friendship = FriendResult(
-                    user_id=user.id,
-                    relation_id=invite.user_id,
-                    type=invite.type,
-                    status=1,  # 直接設為已接受
-                    read=1,
-                    created_at=datetime.now(TZ_TAIWAN),
-                    updated_at=datetime.now(TZ_TAIWAN)
-                )
-                db.session.add(reverse_friendship)
-                print(f"✅ Reverse friendship added to session")
+            # 建立無方向的好友關係（同一對同一類型只有一筆），不再寫入反向的 FriendResult
+            if Friendship.add(user_id, invite.user_id, invite.type) is None:
+                logger.warning("Friendship already exists: %s <-> %s, type=%s", user_id, invite.user_id, invite.type)
+            elif share_inbox.enabled():
+                share_inbox.backfill_friendship(user_id, invite.user_id, invite.type)
             
+            inviter_id = invite.user_id
             db.session.commit()
-            print(f"✅ Database commit successful")
-            print(f"========== ACCEPT INVITE SUCCESS ==========")
+            friend_graph.invalidate(user_id, inviter_id)
+            logger.debug("Database commit successful")
             return {"status": "0", "message": "Friend invitation accepted successfully", "message_code": "SUCCESS"}, 200
 
         except Exception as e:
             db.session.rollback()
-            print(f"❌ Accept friend invite error: {str(e)}")
-            traceback.print_exc()
-            print(f"========== ACCEPT INVITE FAILED ==========")
+            logger.exception("Accept friend invite error: %s", e)
             return {"status": "1", "message": "Failed to accept invitation", "message_code": "ACCEPT_INVITATION_FAILED"}, 500
 
 
     @staticmethod
     def refuse_friend_invite(email: str, invite_id: int):
-        print(f"Refusing friend invite {invite_id} for user {email}")
-        log_memory_usage("Start refuse_friend_invite")
+        logger.debug("Refusing friend invite %s for user %s", invite_id, email)
         
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1", 
                     "message": "User not found", 
@@ -3082,7 +2657,7 @@ class AuthController:
 
             invite = FriendResult.query.filter_by(
                 id=invite_id,
-                relation_id=user.id,
+                relation_id=user_id,
                 status=0
             ).first()
 
@@ -3097,10 +2672,12 @@ class AuthController:
             invite.status = 2
             invite.read = 1  # 標記為已讀
             invite.updated_at = datetime.now(TZ_TAIWAN)
+            unread_counters.invite_answered(invite.user_id, user_id, invite.type)
+            inviter_id = invite.user_id
             
             db.session.commit()
+            friend_graph.invalidate(user_id, inviter_id)
             
-            log_memory_usage("End refuse_friend_invite")
             return {
                 "status": "0", 
                 "message": "Invitation rejected successfully", 
@@ -3109,22 +2686,12 @@ class AuthController:
 
         except Exception as e:
             db.session.rollback()
-            print(f"Refuse friend invite error: {str(e)}")
-            log_memory_usage("Error in refuse_friend_invite")
+            logger.error("Refuse friend invite error: %s", e)
             return {
                 "status": "1", 
                 "message": "Failed to refuse invitation", 
                 "message_code": "REFUSE_INVITATION_FAILED"
             }, 500
-        
-        finally:
-            # 🔧 添加資源清理
-            try:
-                db.session.close()
-                gc.collect()
-                log_memory_usage("After refuse_friend_invite cleanup")
-            except:
-                pass
 
 
     @staticmethod
@@ -3134,10 +2701,10 @@ class AuthController:
         用於邀請發送者查看對方接受/拒絕的結果後,標記為已讀
         這樣 get_friend_results 就不會再返回這條記錄
         """
-        print(f"Marking friend result {result_id} as read for user {email}")
+        logger.debug("Marking friend result %s as read for user %s", result_id, email)
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1", 
                     "message": "User not found", 
@@ -3147,7 +2714,7 @@ class AuthController:
             # 查詢這條邀請結果(必須是我發出的邀請)
             result = FriendResult.query.filter_by(
                 id=result_id,
-                user_id=user.id  # 確保是我發出的邀請
+                user_id=user_id  # 確保是我發出的邀請
             ).first()
 
             if not result:
@@ -3157,13 +2724,15 @@ class AuthController:
                     "message_code": "RESULT_NOT_FOUND"
                 }, 404
 
-            # 標記為已讀
+            # 標記為已讀（待處理的邀請仍會出現在結果列表，計數不變）
+            if result.status != 0 and not result.read:
+                unread_counters.result_read(user_id, result.type)
             result.read = 1
             result.updated_at = datetime.now(TZ_TAIWAN)
             
             db.session.commit()
             
-            print(f"✅ Friend result {result_id} marked as read")
+            logger.debug("Friend result %s marked as read", result_id)
             return {
                 "status": "0", 
                 "message": "Friend result marked as read", 
@@ -3172,8 +2741,7 @@ class AuthController:
 
         except Exception as e:
             db.session.rollback()
-            print(f"Mark friend result as read error: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Mark friend result as read error: %s", e)
             return {
                 "status": "1", 
                 "message": "Failed to mark result as read", 
@@ -3181,14 +2749,63 @@ class AuthController:
             }, 500
 
 
+    @staticmethod
+    @read_only
+    def get_unread_counts(email: str):
+        """
+        badge 用的未讀計數（依關係類型 0/1/2 排列），只讀取計數表
+        """
+        try:
+            user_id = current_user_id(email)
+            if not user_id:
+                return {"status": "1", "message": "User not found", "message_code": "USER_NOT_FOUND"}, 404
+
+            counts = unread_counters.counts(user_id)
+            return {
+                "status": "0",
+                "message": "Success",
+                "message_code": "SUCCESS",
+                "counts": counts,
+                "total": {field: sum(values) for field, values in counts.items()},
+            }, 200
+
+        except Exception as e:
+            logger.exception("Get unread counts error: %s", e)
+            return {"status": "1", "message": "Failed to get unread counts", "message_code": "GET_UNREAD_COUNTS_FAILED"}, 500
+
+
+    @staticmethod
+    def mark_shares_read(email: str, relation_type: int):
+        """
+        將指定團別的未讀分享數歸零（看過分享列表後由前端呼叫）
+        """
+        try:
+            user_id = current_user_id(email)
+            if not user_id:
+                return {"status": "1", "message": "User not found", "message_code": "USER_NOT_FOUND"}, 404
+
+            if relation_type not in unread_counters.RELATION_TYPES:
+                return {"status": "1", "message": "Invalid relation_type parameter",
+                "message_code": "INVALID_RELATION_TYPE"}, 400
+
+            unread_counters.shares_read(user_id, relation_type)
+            db.session.commit()
+            return {"status": "0", "message": "Success", "message_code": "SUCCESS"}, 200
+
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Mark shares read error: %s", e)
+            return {"status": "1", "message": "Failed to mark shares as read", "message_code": "MARK_SHARES_READ_FAILED"}, 500
+
+
     @staticmethod
     def remove_friends(email: str, friend_ids: list):
         """
         刪除多個好友
         """
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -3215,11 +2832,12 @@ class AuthController:
 
             # 刪除好友記錄
             deleted_count = Friend.query.filter(
-                Friend.user_id == user.id,
+                Friend.user_id == user_id,
                 Friend.id.in_(friend_ids)
             ).delete(synchronize_session=False)
 
             db.session.commit()
+            friend_graph.invalidate(user_id)
 
             return {
                 "status": "0",
@@ -3229,7 +2847,7 @@ class AuthController:
 
         except Exception as e:
             db.session.rollback()
-            print(f"Remove friends error: {str(e)}")
+            logger.error("Remove friends error: %s", e)
             return {
                 "status": "1",
                 "message": "Failed to remove friend",
@@ -3252,14 +2870,14 @@ class AuthController:
         調試用：檢查用戶的好友關係
         """
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "message": "User not found",
                     "message_code": "USER_NOT_FOUND"
                 }, 404
 
-            friends = Friend.query.filter_by(user_id=user.id).all()
+            friends = Friend.query.filter_by(user_id=user_id).all()
             friend_data = []
             
             for friend in friends:
@@ -3278,11 +2896,11 @@ class AuthController:
                     "id": friend.id,
                     "name": safe_name,
                     "relation_type": friend.relation_type,
-                    "created_at": friend.created_at.strftime("%Y-%m-%d %H:%M:%S") if friend.created_at else None
+                    "created_at": friend.created_at
                 })
 
             return {
-                "user_id": user.id,
+                "user_id": user_id,
                 "total_friends": len(friends),
                 "friends": friend_data,
                 "by_type": {
@@ -3306,8 +2924,8 @@ class AuthController:
         為現有用戶創建預設好友關係
         """
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            user_id = current_user_id(email)
+            if not user_id:
                 return {
                     "status": "1",
                     "message": "User not found",
@@ -3315,7 +2933,7 @@ class AuthController:
                 }, 404
 
             # 檢查是否已有預設好友
-            existing_friends = Friend.query.filter_by(user_id=user.id).all()
+            existing_friends = Friend.query.filter_by(user_id=user_id).all()
             existing_types = [f.relation_type for f in existing_friends]
 
             # 預設好友列表
@@ -3330,7 +2948,7 @@ class AuthController:
                 # 只添加不存在的關係類型
                 if friend_data["relation_type"] not in existing_types:
                     default_friend = Friend(
-                        user_id=user.id,
+                        user_id=user_id,
                         name=friend_data["name"],
                         relation_type=friend_data["relation_type"],
                         created_at=datetime.now(TZ_TAIWAN),
@@ -3350,7 +2968,7 @@ class AuthController:
 
         except Exception as e:
             db.session.rollback()
-            print(f"Create default friends error: {str(e)}")
+            logger.error("Create default friends error: %s", e)
             return {
                 "status": "1",
                 "message": "Failed to create default friends",
@@ -3,9 +3,25 @@ from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from flask_mail import Mail
+from app.utils.memory_profiler import MemoryProfiler
+from app.utils.password_hasher import PasswordHasher
+from app.utils.mail_dispatcher import MailDispatcher
+from app.utils.compression import ResponseCompressor
+from app.utils.pool_metrics import PoolMetrics
+from app.utils.db_routing import RoutingSession
+from app.utils.request_metrics import RequestMetrics
+from app.utils.query_inspector import QueryInspector
 
-db = SQLAlchemy()
+# 讀寫分離：@read_only 範圍內的查詢走 replica bind（見 app/utils/db_routing.py）
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 bcrypt = Bcrypt()
 jwt = JWTManager()
 migrate = Migrate()
 mail = Mail()
+memory_profiler = MemoryProfiler()
+password_hasher = PasswordHasher(bcrypt)
+mail_dispatcher = MailDispatcher(mail)
+compressor = ResponseCompressor()
+pool_metrics = PoolMetrics(db)
+request_metrics = RequestMetrics(db)
+query_inspector = QueryInspector(db)
@@ -48,5 +48,10 @@ class Diary(db.Model):
         onupdate=lambda: datetime.now(TZ_TAIWAN)
     )
 
+    __table_args__ = (
+        db.Index('idx_diary_user_recorded_at', 'user_id', 'recorded_at'),
+        db.Index('idx_diary_user_type_recorded_at', 'user_id', 'type', 'recorded_at'),
+    )
+
     def __repr__(self):
         return f"<Diary {self.user_id}: {self.type}>"
@@ -0,0 +1,20 @@
+from app.extensions import db
+
+
+class FriendUnreadCounter(db.Model):
+    """
+    每位使用者、每種關係類型的未讀計數（badge 用）
+
+    由 app/services/unread_counters.py 在邀請 / 分享寫入時以原子 UPDATE 增減，
+    讀取只需依主鍵取 (user_id, 0..2) 三筆
+    """
+    __tablename__ = "friend_unread_counters"
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    relation_type = db.Column(db.Integer, primary_key=True)  # 0:醫師團 1:親友團 2:控糖團
+    pending_requests = db.Column(db.Integer, nullable=False, default=0)  # 收到、待處理的邀請（get_friend_requests）
+    unread_results = db.Column(db.Integer, nullable=False, default=0)    # 發出、待處理或結果未讀的邀請（get_friend_results）
+    unread_shares = db.Column(db.Integer, nullable=False, default=0)     # 好友新分享、尚未查看
+
+    def __repr__(self):
+        return f"<FriendUnreadCounter {self.user_id}/{self.relation_type}: {self.pending_requests}, {self.unread_results}, {self.unread_shares}>"
@@ -56,7 +56,11 @@ class FriendResult(db.Model):
 
     # 🎯 添加安全的輔助方法 - 不影響前端現有邏輯
     def to_dict(self):
-        """轉換為前端安全的字典格式"""
+        """
+        轉換為前端安全的字典格式
+
+        會存取 user / relation_user，列表使用時請以 joinedload 預先載入，否則每筆多兩次查詢
+        """
         return {
             "id": self.id,
             "user_id": self.user_id,
@@ -64,8 +68,8 @@ class FriendResult(db.Model):
             "type": self.type,
             "status": self.status,
             "read": self.read,
-            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else "",
-            "updated_at": self.updated_at.strftime("%Y-%m-%d %H:%M:%S") if self.updated_at else "",
+            "created_at": self.created_at or "",
+            "updated_at": self.updated_at or "",
             # 安全地包含用戶信息
             "user_name": self.user.name if self.user else "",
             "relation_user_name": self.relation_user.name if self.relation_user else ""
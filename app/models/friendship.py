@@ -0,0 +1,77 @@
+from app.extensions import db
+from datetime import datetime, timezone, timedelta
+
+TZ_TAIWAN = timezone(timedelta(hours=8))
+
+
+class Friendship(db.Model):
+    """
+    已成立的好友關係（無方向）
+
+    每一對使用者、每種關係類型只有一筆，low_id < high_id；
+    FriendResult 只保存邀請本身（待處理 / 接受 / 拒絕）
+    """
+    __tablename__ = "friendships"
+
+    id = db.Column(db.Integer, primary_key=True)
+    low_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)   # 較小的使用者 id
+    high_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)  # 較大的使用者 id
+    type = db.Column(db.Integer, nullable=False)  # 關係類型 (0:醫師團, 1:親友團, 2:控糖團)
+    created_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(TZ_TAIWAN)
+    )
+
+    __table_args__ = (
+        # 以 low_id 查好友，並保證同一對同一類型只有一筆
+        db.Index('uq_friendships_pair_type', 'low_id', 'high_id', 'type', unique=True),
+        # 以 high_id 查好友
+        db.Index('idx_friendships_high_low', 'high_id', 'low_id', 'type'),
+    )
+
+    def __repr__(self):
+        return f"<Friendship {self.low_id} <-> {self.high_id}, type: {self.type}>"
+
+    @staticmethod
+    def pair(user_id: int, other_id: int):
+        """兩個使用者 id 排序為 (low_id, high_id)"""
+        return (user_id, other_id) if user_id < other_id else (other_id, user_id)
+
+    @classmethod
+    def friends_of(cls, user_id: int, relation_type: int = None):
+        """
+        使用者的好友 (friend_id, type, created_at) 查詢
+
+        兩段各走一個索引的範圍掃描，以 UNION ALL 合併（同一對只有一筆，不會重複）
+        """
+        as_low = db.select(cls.high_id.label("friend_id"), cls.type, cls.created_at, cls.id).where(cls.low_id == user_id)
+        as_high = db.select(cls.low_id.label("friend_id"), cls.type, cls.created_at, cls.id).where(cls.high_id == user_id)
+        if relation_type is not None:
+            as_low = as_low.where(cls.type == relation_type)
+            as_high = as_high.where(cls.type == relation_type)
+        return db.union_all(as_low, as_high)
+
+    @classmethod
+    def exists(cls, user_id: int, other_id: int, relation_type: int) -> bool:
+        """兩人是否已是指定類型的好友（唯一索引單筆查詢）"""
+        low_id, high_id = cls.pair(user_id, other_id)
+        return db.session.execute(
+            db.select(cls.id).where(cls.low_id == low_id, cls.high_id == high_id, cls.type == relation_type).limit(1)
+        ).first() is not None
+
+    @classmethod
+    def add(cls, user_id: int, other_id: int, relation_type: int, created_at=None):
+        """
+        建立好友關係（已存在時不重複建立），需由呼叫端 commit
+
+        Returns:
+            新建立的 Friendship，已存在時回傳 None
+        """
+        if cls.exists(user_id, other_id, relation_type):
+            return None
+        low_id, high_id = cls.pair(user_id, other_id)
+        friendship = cls(low_id=low_id, high_id=high_id, type=relation_type,
+                         created_at=created_at or datetime.now(TZ_TAIWAN))
+        db.session.add(friendship)
+        return friendship
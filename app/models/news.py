@@ -13,13 +13,17 @@ class News(db.Model):
     created_at = db.Column(
         db.DateTime, 
         nullable=False,
-        default=datetime.now(timezone.utc)
+        default=lambda: datetime.now(timezone.utc)
     )
     updated_at = db.Column(
         db.DateTime, 
         nullable=False,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc)
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (
+        db.Index('idx_news_group_created_at', 'group', 'created_at'),
     )
 
     def __repr__(self):
@@ -17,10 +17,10 @@ class ShareRecord(db.Model):
                           backref=db.backref("shared_records", lazy='dynamic'),
                           lazy="select")
     
-    # Diary 記錄的 relationship
+    # Diary 記錄的 relationship（需要時以 joinedload(ShareRecord.diary) 明確載入）
     diary = db.relationship("Diary",
                             primaryjoin="foreign(ShareRecord.record_id)==Diary.id",
-                            lazy="joined",
+                            lazy="select",
                             viewonly=True)
     
     relation_type = db.Column(db.Integer, nullable=False)  # 0:醫師團 1:親友團 2:控糖團
@@ -42,5 +42,9 @@ class ShareRecord(db.Model):
         onupdate=datetime.now(TZ_TAIWAN)
     )
 
+    __table_args__ = (
+        db.Index('idx_share_relation_user_created', 'relation_type', 'user_id', 'created_at'),
+    )
+
     def __repr__(self):
         return f"<ShareRecord {self.user_id}: type={self.record_type}, relation={self.relation_type}>"
\ No newline at end of file
@@ -0,0 +1,26 @@
+from app.extensions import db
+
+
+class ShareInbox(db.Model):
+    """
+    分享收件匣（SHARE_FEED_MODE = "fanout" 時使用）
+
+    分享時為每位對應團別的好友寫入一筆，讀取時只需依 (viewer_id, relation_type, created_at)
+    做一次索引範圍掃描；created_at 與 share_id 與 ShareRecord 相同，分頁游標兩種模式通用
+    """
+    __tablename__ = "share_inbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+    viewer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)   # 收件者
+    share_id = db.Column(db.Integer, db.ForeignKey('share_records.id'), nullable=False)
+    sharer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)   # 分享者
+    relation_type = db.Column(db.Integer, nullable=False)  # 0:醫師團 1:親友團 2:控糖團
+    created_at = db.Column(db.DateTime, nullable=False)    # 同 ShareRecord.created_at
+
+    __table_args__ = (
+        db.Index('idx_share_inbox_feed', 'viewer_id', 'relation_type', 'created_at', 'share_id'),
+        db.Index('uq_share_inbox_viewer_share', 'viewer_id', 'share_id', unique=True),
+    )
+
+    def __repr__(self):
+        return f"<ShareInbox {self.viewer_id}: share={self.share_id}, relation={self.relation_type}>"
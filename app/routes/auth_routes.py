@@ -3,15 +3,17 @@ from flask import Blueprint, request, jsonify
 from app.controllers.auth_controller import AuthController
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_jwt_extended.exceptions import NoAuthorizationError, InvalidHeaderError
-from app.models.a1c import A1cRecord
 from app.utils.api_response import APIResponse, missing_auth, invalid_auth, auth_failed, invalid_user_id
-import traceback
+from app.utils.conditional import conditional_json, not_modified
+import logging
+
+logger = logging.getLogger(__name__)
 
 auth_bp = Blueprint("auth", __name__) 
 
 @auth_bp.post("/register")            
 def register():
-    print("Register endpoint called")  # 調試輸出
+    logger.debug("Register endpoint called")
     data = request.get_json(silent=True) or {}
     email = (data.get("email") or "").strip().lower()
     password = data.get("password") or ""
@@ -51,11 +53,11 @@ def login():
 @auth_bp.post("/verification/send")
 def send_verification():
     data = request.get_json()
-    print("1",data)  # 調試輸出
+    logger.debug("Send verification request: %s", data)
     email = data.get("email")
     
     result, status = AuthController.send_verification(email)  # 使用正確的方法名
-    print("2",result)  # 調試輸出
+    logger.debug("Send verification result: %s", result)
     return jsonify(result), status
 
 
@@ -66,7 +68,7 @@ def verify_code():
         email = data.get("email")
         code = data.get("code")
         result, status = AuthController.verify_code(email, code)  # 使用正確的方法名
-        print("1",result)
+        logger.debug("Verify code result: %s", result)
 
         return jsonify(result), status
         
@@ -100,18 +102,7 @@ def reset_password():
 
 @auth_bp.get("/user")
 def get_user():
-    print("Get user endpoint called")
-    
-    # 路由級別記憶體監控
-    try:
-        import psutil
-        import os
-        import gc
-        process = psutil.Process(os.getpid())
-        memory_before = process.memory_info().rss / 1024 / 1024
-        print(f"[ROUTE] user start: {memory_before:.2f} MB")
-    except:
-        pass
+    logger.debug("Get user endpoint called")
     
     try:
         # 安全的 JWT 驗證
@@ -120,60 +111,44 @@ def get_user():
             verify_jwt_in_request()
             email = get_jwt_identity()
         except NoAuthorizationError:
-            print("No authorization header found")
+            logger.debug("No authorization header found")
             return missing_auth()
         except InvalidHeaderError as e:
-            print(f"Invalid JWT header: {e}")
+            logger.debug("Invalid JWT header: %s", e)
             return invalid_auth()
         except Exception as jwt_error:
-            print(f"JWT validation error: {jwt_error}")
+            logger.warning("JWT validation error: %s", jwt_error)
             return auth_failed()
         
         if not isinstance(email, str) or not email.strip():
-            print(f"Invalid email format: {email} (type: {type(email)})")
+            logger.debug("Invalid email format: %s (type: %s)", email, type(email))
             return invalid_user_id()
         
         result, status = AuthController.get_user(email)
-        
-        # 路由結束前強制清理
-        try:
-            gc.collect()
-            memory_after = process.memory_info().rss / 1024 / 1024
-            print(f"[ROUTE] user end: {memory_after:.2f} MB, change: {memory_after-memory_before:+.2f} MB")
-        except:
-            pass
-            
-        return jsonify(result), status
+
+        # 以回應內容雜湊作為 ETag，內容未變時回傳 304
+        return conditional_json(result, status)
         
     except Exception as e:
-        print(f"Get user route error: {e}")
-        print(traceback.format_exc())
+        logger.exception("Get user route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "System error",
             "message_code": "SYSTEM_ERROR"
         }), 500
     finally:
-        # 路由級別強制清理
+        # 確保資料庫連接正常關閉
         try:
-            import gc
-            # 確保資料庫連接正常關閉
-            try:
-                from app.extensions import db
-                db.session.remove()
-            except Exception as db_cleanup_error:
-                print(f"[ROUTE] DB cleanup error in user: {db_cleanup_error}")
-            
-            collected = gc.collect()
-            print(f"[ROUTE] user cleanup: {collected} objects")
-        except Exception as route_cleanup_error:
-            print(f"[ROUTE] Cleanup error in user: {route_cleanup_error}")
+            from app.extensions import db
+            db.session.remove()
+        except Exception as db_cleanup_error:
+            logger.error("[ROUTE] DB cleanup error in user: %s", db_cleanup_error)
 
 
 @auth_bp.patch("/user")
 @jwt_required()
 def update_user():
-    print("Update user endpoint called")
+    logger.debug("Update user endpoint called")
     try:
         email = get_jwt_identity()
         
@@ -190,7 +165,7 @@ def update_user():
         return jsonify(result), status
         
     except Exception as e:
-        print(traceback.format_exc())  # 修正：移除參數
+        logger.exception("Update user route error: %s", e)
         return jsonify({
             "status": "1",
             "message": f"Update failed: {str(e)}",
@@ -201,7 +176,7 @@ def update_user():
 @auth_bp.patch("/user/setting")
 @jwt_required()
 def update_user_setting():
-    print("Update user setting endpoint called")  # 調試輸出
+    logger.debug("Update user setting endpoint called")
     try:
         email = get_jwt_identity()
         
@@ -216,7 +191,7 @@ def update_user_setting():
         # 取得請求資料
         setting_data = request.get_json(silent=True) or {}
         
-        print(f"Update user setting request - Email: {email}, Data: {setting_data}")
+        logger.debug("Update user setting request - Email: %s, Data: %s", email, setting_data)
         
         result, status = AuthController.update_user_setting(email, setting_data)
         return jsonify(result), status
@@ -231,7 +206,7 @@ def update_user_setting():
 @auth_bp.post("/user/weight")
 @jwt_required()
 def add_weight():
-    print("Add weight endpoint called")  # 調試輸出
+    logger.debug("Add weight endpoint called")
     try:
         email = get_jwt_identity()
 
@@ -257,7 +232,7 @@ def add_weight():
 @auth_bp.get("/user/medical")
 @jwt_required()
 def get_medical_records():
-    print("Get medical records endpoint called")  # 調試輸出
+    logger.debug("Get medical records endpoint called")
     try:
         email = get_jwt_identity()
         result, status = AuthController.get_medical_records(email)
@@ -273,7 +248,7 @@ def get_medical_records():
 @auth_bp.patch("/user/medical")
 @jwt_required()
 def update_medical_records():
-    print("Update medical records endpoint called")  # 調試輸出
+    logger.debug("Update medical records endpoint called")
     try:
         email = get_jwt_identity()
         
@@ -302,7 +277,7 @@ def update_medical_records():
 @auth_bp.post("/user/a1c")
 @jwt_required()
 def add_a1c(): 
-    print("Add A1C endpoint called")  # 調試輸出
+    logger.debug("Add A1C endpoint called")
     try:
         email = get_jwt_identity()
         
@@ -332,7 +307,7 @@ def add_a1c():
 @auth_bp.get("/user/a1c")
 @jwt_required()
 def get_a1c_records():
-    print("Get A1C records endpoint called")  # 調試輸出
+    logger.debug("Get A1C records endpoint called")
     try:
         email = get_jwt_identity()
         result, status = AuthController.get_a1c_records(email)
@@ -349,7 +324,7 @@ def get_a1c_records():
 @auth_bp.post("/user/care")
 @jwt_required() 
 def add_care_record():
-    print("Add care record endpoint called")  # 調試輸出
+    logger.debug("Add care record endpoint called")
     try:
         email = get_jwt_identity()
         care_data = request.json.get("care_data")
@@ -367,7 +342,7 @@ def add_care_record():
 @auth_bp.get("/user/care")
 @jwt_required()
 def get_care_records():
-    print("Get care records endpoint called")  # 調試輸出
+    logger.debug("Get care records endpoint called")
     try:
         email = get_jwt_identity()
         result, status = AuthController.get_care_records(email)
@@ -386,7 +361,7 @@ def get_care_records():
 @auth_bp.post("/share")
 @jwt_required()
 def add_share():
-    print("Add share endpoint called")
+    logger.debug("Add share endpoint called")
     try:
         email = get_jwt_identity()
         
@@ -398,7 +373,7 @@ def add_share():
             }), 422
         
         data = request.get_json(silent=True) or {}
-        print(f"Received share data: {data}")  # 調試用
+        logger.debug("Received share data: %s", data)
 
         record_type = data.get('type')
         record_id = data.get('id')
@@ -443,8 +418,7 @@ def add_share():
         return jsonify(result), status
         
     except Exception as e:
-        print(f"Add share route error: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Add share route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "Share failed",
@@ -457,7 +431,7 @@ def add_share():
 @auth_bp.get("/share/<relation_type>")
 @jwt_required()
 def get_shared_records(relation_type):
-    print("Get shared records endpoint called")
+    logger.debug("Get shared records endpoint called")
     try:
         email = get_jwt_identity()
         
@@ -468,12 +442,17 @@ def get_shared_records(relation_type):
                 "message_code": "INVALID_USER_ID"
             }), 422
         
-        result, status = AuthController.get_shared_records(email, relation_type)
+        result, status = AuthController.get_shared_records(
+            email,
+            relation_type,
+            before=request.args.get('before'),
+            after=request.args.get('after'),
+            limit=request.args.get('limit'),
+        )
         return jsonify(result), status
         
     except Exception as e:
-        print(f"Get shared records route error: {str(e)}")
-        print(traceback.format_exc())  # 修正：移除參數 e
+        logger.exception("Get shared records route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "Failed to get shared records",
@@ -484,10 +463,36 @@ def get_shared_records(relation_type):
 
 
 
+@auth_bp.patch("/share/<int:relation_type>/read")
+@jwt_required()
+def mark_shares_read(relation_type):
+    """將指定團別的未讀分享數歸零"""
+    logger.debug("Mark shares read endpoint called")
+    try:
+        email = get_jwt_identity()
+        if not isinstance(email, str):
+            return jsonify({
+                "status": "1",
+                "message": "Invalid user identification",
+                "message_code": "INVALID_USER_ID"
+            }), 422
+
+        result, status = AuthController.mark_shares_read(email, relation_type)
+        return jsonify(result), status
+
+    except Exception as e:
+        logger.error("Mark shares read route error: %s", e)
+        return jsonify({
+            "status": "1",
+            "message": "Failed to mark shares as read",
+            "message_code": "MARK_SHARES_READ_FAILED"
+        }), 500
+
+
 @auth_bp.get("/news")
 @jwt_required()
 def get_news():
-    print("Get news endpoint called")  # 調試輸出
+    logger.debug("Get news endpoint called")
     try:
         email = get_jwt_identity()
         
@@ -499,8 +504,16 @@ def get_news():
                 "message_code": "INVALID_USER_ID"
             }), 422
         
-        result, status = AuthController.get_news(email)
-        return jsonify(result), status
+        # 最新消息未變動時直接回傳 304（頁面由行程內快取提供）
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit')
+        etag = AuthController.get_news_etag(email, cursor, limit)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        result, status = AuthController.get_news(email, cursor, limit)
+        return conditional_json(result, status, etag)
         
     except Exception as e:
         return jsonify({
@@ -513,7 +526,7 @@ def get_news():
 @auth_bp.get("/friend/list")
 @jwt_required()
 def get_friend_list():
-    print("Get friend list endpoint called")
+    logger.debug("Get friend list endpoint called")
     try:
         email = get_jwt_identity()
 
@@ -528,8 +541,7 @@ def get_friend_list():
         return jsonify(result), status
 
     except Exception as e:
-        print(f"Get friend list route error: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Get friend list route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "Failed to get friends list",
@@ -541,7 +553,7 @@ def get_friend_list():
 @auth_bp.post("/friend")
 @jwt_required()
 def add_friend():
-    print("Add friend endpoint called")  # 調試輸出
+    logger.debug("Add friend endpoint called")
     try:
         email = get_jwt_identity()
         
@@ -571,7 +583,7 @@ def add_friend():
 @auth_bp.get("/user/diary")
 @jwt_required()
 def get_diary_entries():
-    print("Get diary entries endpoint called")  # 調試輸出
+    logger.debug("Get diary entries endpoint called")
     try:
         email = get_jwt_identity()
         
@@ -583,11 +595,24 @@ def get_diary_entries():
                 "message_code": "INVALID_USER_ID"
             }), 422
         
-        # 從查詢參數獲取日期
-        date = request.args.get('date')  # 可選參數
-        
-        result, status = AuthController.get_diary_entries(email, date)
-        return jsonify(result), status
+        # 從查詢參數獲取篩選與分頁條件（皆為可選參數）
+        filters = dict(
+            date=request.args.get('date'),
+            start=request.args.get('start'),
+            end=request.args.get('end'),
+            record_type=request.args.get('type'),
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit'),
+        )
+
+        # 日記未變動時直接回傳 304，不載入資料列
+        etag = AuthController.get_diary_etag(email, **filters)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        result, status = AuthController.get_diary_entries(email, **filters)
+        return conditional_json(result, status, etag)
         
     except Exception as e:
         return jsonify({
@@ -599,7 +624,7 @@ def get_diary_entries():
 @auth_bp.put("/user/badge")
 @jwt_required()
 def update_user_badge():
-    print("Update badge endpoint called")  # 調試輸出
+    logger.debug("Update badge endpoint called")
     try:
         email = get_jwt_identity()
         
@@ -629,7 +654,7 @@ def update_user_badge():
         return jsonify(result), status
         
     except Exception as e:
-        print(f"Request data: {request.get_json(silent=True)}")
+        logger.exception("Update badge route error, request data: %s", request.get_json(silent=True))
         return jsonify({
             "status": "1",
             "message": "Failed to update badge",
@@ -641,7 +666,7 @@ def update_user_badge():
 @auth_bp.post("/user/records")
 @jwt_required()
 def get_user_records():
-    print("Get user records endpoint called")  # 調試輸出
+    logger.debug("Get user records endpoint called")
     try:
         email = get_jwt_identity()
         
@@ -668,10 +693,36 @@ def get_user_records():
         }), 500
     
 
+@auth_bp.post("/user/records/batch")
+@jwt_required()
+def add_records_batch():
+    logger.debug("Add records batch endpoint called")
+    try:
+        email = get_jwt_identity()
+        if not isinstance(email, str):
+            return jsonify({
+                "status": "1",
+                "message": "Invalid user identification",
+                "message_code": "INVALID_USER_ID"
+            }), 422
+
+        data = request.get_json(silent=True) or {}
+        result, status = AuthController.add_records_batch(email, data.get('records'))
+        return jsonify(result), status
+
+    except Exception as e:
+        logger.exception("Add records batch route error: %s", e)
+        return jsonify({
+            "status": "1",
+            "message": "Failed to add records",
+            "message_code": "ADD_RECORDS_FAILED"
+        }), 500
+
+
 @auth_bp.delete("/user/records")
 @jwt_required()
 def delete_user_records():
-    print("Delete user records endpoint called")  # 調試輸出
+    logger.debug("Delete user records endpoint called")
     try:
         email = get_jwt_identity()
         if not isinstance(email, str):
@@ -710,14 +761,14 @@ def delete_user_records():
 @auth_bp.post("/user/blood/sugar")
 @jwt_required()
 def add_blood_sugar():
-    print("Add blood sugar endpoint called")  # 調試輸出
+    logger.debug("Add blood sugar endpoint called")
     try:
         email = get_jwt_identity()
-        print(f"Processing blood sugar for user: {email}")
+        logger.debug("Processing blood sugar for user: %s", email)
         
         # 確保 email 是字串
         if not isinstance(email, str):
-            print("Invalid email format")
+            logger.debug("Invalid email format")
             return jsonify({
                 "status": "1",
                 "message": "Invalid user identification",
@@ -726,7 +777,7 @@ def add_blood_sugar():
         
         # 取得請求資料
         data = request.get_json(silent=True) or {}
-        print(f"Received data: {data}")
+        logger.debug("Received data: %s", data)
         
         timeperiod = data.get('timeperiod')
         recorded_at = data.get('recorded_at')
@@ -734,7 +785,7 @@ def add_blood_sugar():
         exercise = data.get('exercise')
 
         
-        print("Calling AuthController.add_blood_sugar...")
+        logger.debug("Calling AuthController.add_blood_sugar...")
         result, status = AuthController.add_blood_sugar(
             email=email,
             sugar=data.get('sugar'),
@@ -744,14 +795,11 @@ def add_blood_sugar():
             exercise=exercise
         )
         
-        print(f"Controller returned: {result}, status: {status}")
-        response = jsonify(result)
-        print(f"Final response: {response.get_json()}")
-        return response, status
+        logger.debug("Controller returned: %s, status: %s", result, status)
+        return jsonify(result), status
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()  # 打印完整堆疊追蹤
+        logger.exception("Add blood sugar route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "Failed to add blood sugar record",
@@ -764,25 +812,14 @@ def add_blood_sugar():
 @auth_bp.get("/friend/code")
 @jwt_required()
 def get_friend_invite_code():
-    print("Get friend invite code endpoint called")
-    
-    # 路由級別記憶體監控
-    try:
-        import psutil
-        import os
-        import gc
-        process = psutil.Process(os.getpid())
-        memory_before = process.memory_info().rss / 1024 / 1024
-        print(f"[ROUTE] friend/code start: {memory_before:.2f} MB")
-    except:
-        pass
+    logger.debug("Get friend invite code endpoint called")
     
     try:
         # 使用標準的 JWT 驗證
         email = get_jwt_identity()
         
         if not isinstance(email, str) or not email.strip():
-            print(f"Invalid email format: {email} (type: {type(email)})")
+            logger.debug("Invalid email format: %s (type: %s)", email, type(email))
             return jsonify({
                 "status": "1",
                 "message": "invalid user identity",
@@ -792,68 +829,38 @@ def get_friend_invite_code():
         result, status = AuthController.get_friend_invite_code(email)
         
         # 🔧 添加調試日誌
-        print(f"[DEBUG] get_friend_invite_code result: {result}")
-        print(f"[DEBUG] get_friend_invite_code status: {status}")
-        
-        # 路由結束前強制清理
-        try:
-            gc.collect()
-            memory_after = process.memory_info().rss / 1024 / 1024
-            print(f"[ROUTE] friend/code end: {memory_after:.2f} MB, change: {memory_after-memory_before:+.2f} MB")
-        except:
-            pass
-            
-        response = jsonify(result)
-        print(f"[DEBUG] jsonify response: {response.get_json()}")
-        return response, status
+        logger.debug("get_friend_invite_code result: %s", result)
+        logger.debug("get_friend_invite_code status: %s", status)
+
+        return jsonify(result), status
 
     except Exception as e:
-        print(f"Friend code route error: {e}")
-        print(traceback.format_exc())
+        logger.exception("Friend code route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "failed to get invite code",
             "message_code": "GET_INVITE_CODE_FAILED"
         }), 500
     finally:
-        # 路由級別強制清理
+        # 確保資料庫連接正常關閉
         try:
-            import gc
-            # 確保資料庫連接正常關閉
-            try:
-                from app.extensions import db
-                db.session.remove()
-            except Exception as db_cleanup_error:
-                print(f"[ROUTE] DB cleanup error in friend/code: {db_cleanup_error}")
-            
-            collected = gc.collect()
-            print(f"[ROUTE] friend/code cleanup: {collected} objects")
-        except Exception as route_cleanup_error:
-            print(f"[ROUTE] Cleanup error in friend/code: {route_cleanup_error}")
+            from app.extensions import db
+            db.session.remove()
+        except Exception as db_cleanup_error:
+            logger.error("[ROUTE] DB cleanup error in friend/code: %s", db_cleanup_error)
 
 
 @auth_bp.get("/friend/results")
 @jwt_required()
 def get_friend_results():
-    print("Get friend results endpoint called")
-    
-    # 路由級別記憶體監控
-    try:
-        import psutil
-        import os
-        import gc
-        process = psutil.Process(os.getpid())
-        memory_before = process.memory_info().rss / 1024 / 1024
-        print(f"[ROUTE] friend/results start: {memory_before:.2f} MB")
-    except:
-        pass
+    logger.debug("Get friend results endpoint called")
     
     try:
         # 使用標準的 JWT 驗證
         email = get_jwt_identity()
         
         if not isinstance(email, str) or not email.strip():
-            print(f"Invalid email format: {email} (type: {type(email)})")
+            logger.debug("Invalid email format: %s (type: %s)", email, type(email))
             return jsonify({
                 "status": "1",
                 "message": "invalid user identity",
@@ -861,40 +868,23 @@ def get_friend_results():
             }), 422
 
         result, status = AuthController.get_friend_results(email)
-        
-        # 路由結束前強制清理
-        try:
-            gc.collect()
-            memory_after = process.memory_info().rss / 1024 / 1024
-            print(f"[ROUTE] friend/results end: {memory_after:.2f} MB, change: {memory_after-memory_before:+.2f} MB")
-        except:
-            pass
-            
+
         return jsonify(result), status
 
     except Exception as e:
-        print(f"Friend results route error: {e}")
-        print(traceback.format_exc())
+        logger.exception("Friend results route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "failed to get invitation results",
             "message_code": "GET_INVITE_RESULTS_FAILED"
         }), 500
     finally:
-        # 路由級別強制清理
+        # 確保資料庫連接正常關閉
         try:
-            import gc
-            # 確保資料庫連接正常關閉
-            try:
-                from app.extensions import db
-                db.session.remove()
-            except Exception as db_cleanup_error:
-                print(f"[ROUTE] DB cleanup error in friend/results: {db_cleanup_error}")
-            
-            collected = gc.collect()
-            print(f"[ROUTE] friend/results cleanup: {collected} objects")
-        except Exception as route_cleanup_error:
-            print(f"[ROUTE] Cleanup error in friend/results: {route_cleanup_error}")
+            from app.extensions import db
+            db.session.remove()
+        except Exception as db_cleanup_error:
+            logger.error("[ROUTE] DB cleanup error in friend/results: %s", db_cleanup_error)
 
 
 
@@ -904,7 +894,7 @@ def get_friend_results():
 @auth_bp.get("/friend/requests")
 @jwt_required()
 def get_friend_requests():
-    print("Get friend requests endpoint called")  # 調試輸出
+    logger.debug("Get friend requests endpoint called")
     try:
         email = get_jwt_identity()
         if not isinstance(email, str):
@@ -933,7 +923,7 @@ def get_friend_requests():
 @auth_bp.post("/user/diet")
 @jwt_required()
 def add_diet_record():
-    print("Add diet record endpoint called")
+    logger.debug("Add diet record endpoint called")
     try:
         email = get_jwt_identity()
         if not isinstance(email, str):
@@ -1020,13 +1010,13 @@ def add_blood_pressure():
 @auth_bp.post("/friend/send")
 @jwt_required()
 def send_friend_invite():
-    print("DEBUG: Friend send endpoint called")
+    logger.debug("Friend send endpoint called")
     try:
         email = get_jwt_identity()
-        print(f"DEBUG: JWT identity: {email}")
+        logger.debug("JWT identity: %s", email)
         
         if not isinstance(email, str):
-            print(f"DEBUG: Invalid email type: {type(email)}")
+            logger.debug("Invalid email type: %s", type(email))
             return jsonify({
                 "status": "1",
                 "message": "invalid user identity",
@@ -1034,16 +1024,16 @@ def send_friend_invite():
             }), 422
         
         data = request.get_json(silent=True) or {}
-        print(f"DEBUG: Received request data: {data}")
+        logger.debug("Received request data: %s", data)
         
         invite_code = data.get("invite_code")
         relation_type = data.get("type")  # 0: 醫師團; 1: 親友團; 2: 糖友團
         
-        print(f"DEBUG: invite_code={invite_code}, relation_type={relation_type}")
+        logger.debug("invite_code=%s, relation_type=%s", invite_code, relation_type)
         
         # 驗證必要參數
         if invite_code is None or relation_type is None:
-            print(f"DEBUG: Missing parameters - invite_code: {invite_code}, relation_type: {relation_type}")
+            logger.debug("Missing parameters - invite_code: %s, relation_type: %s", invite_code, relation_type)
             return jsonify({
                 "status": "1",
                 "message": "missing required parameters",
@@ -1053,26 +1043,24 @@ def send_friend_invite():
         # 型態驗證
         try:
             relation_type = int(relation_type)
-            print(f"DEBUG: Converted relation_type to int: {relation_type}")
+            logger.debug("Converted relation_type to int: %s", relation_type)
         except (ValueError, TypeError) as e:
-            print(f"DEBUG: Type conversion error: {e}")
+            logger.debug("Type conversion error: %s", e)
             return jsonify({
                 "status": "1",
                 "message": "parameter type error",
                 "message_code": "PARAMETER_TYPE_ERROR"
             }), 400
         
-        print(f"DEBUG: About to call AuthController.send_friend_invite")
+        logger.debug("About to call AuthController.send_friend_invite")
         # 呼叫控制器處理邀請碼邏輯
         result, status = AuthController.send_friend_invite(email, invite_code, relation_type)
-        print(f"DEBUG: Controller returned - result: {result}, status: {status}")
+        logger.debug("Controller returned - result: %s, status: %s", result, status)
         
         return jsonify(result), status
         
     except Exception as e:
-        print(f"DEBUG: Route exception: {str(e)}")
-        import traceback
-        print(f"DEBUG: Full traceback: {traceback.format_exc()}")
+        logger.exception("Send friend invite route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "failed to send invitation",
@@ -1082,7 +1070,7 @@ def send_friend_invite():
 @auth_bp.get("/friend/<int:invite_id>/accept")
 @jwt_required()
 def accept_friend_invite(invite_id):
-    print("Accept friend invite endpoint called")
+    logger.debug("Accept friend invite endpoint called")
     try:
         email = get_jwt_identity()
         if not isinstance(email, str):
@@ -1096,7 +1084,7 @@ def accept_friend_invite(invite_id):
         return jsonify(result), status
 
     except Exception as e:
-        print(f"Accept friend invite route error: {str(e)}")
+        logger.error("Accept friend invite route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "Failed to accept invitation",
@@ -1106,7 +1094,7 @@ def accept_friend_invite(invite_id):
 @auth_bp.get("/friend/<int:invite_id>/refuse")
 @jwt_required()
 def refuse_friend_invite(invite_id):
-    print("Refuse friend invite endpoint called")
+    logger.debug("Refuse friend invite endpoint called")
     try:
         email = get_jwt_identity()
         if not isinstance(email, str):
@@ -1120,18 +1108,44 @@ def refuse_friend_invite(invite_id):
         return jsonify(result), status
 
     except Exception as e:
-        print(f"Refuse friend invite route error: {str(e)}")
+        logger.error("Refuse friend invite route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "Failed to refuse invitation",
                 "message_code": "REFUSE_INVITATION_FAILED"
         }), 500
 
+@auth_bp.get("/friend/counts")
+@jwt_required()
+def get_unread_counts():
+    """badge 用的未讀計數（待處理邀請、邀請結果、新分享）"""
+    logger.debug("Get unread counts endpoint called")
+    try:
+        email = get_jwt_identity()
+        if not isinstance(email, str):
+            return jsonify({
+                "status": "1",
+                "message": "Invalid user identification",
+                "message_code": "INVALID_USER_ID"
+            }), 422
+
+        result, status = AuthController.get_unread_counts(email)
+        return jsonify(result), status
+
+    except Exception as e:
+        logger.error("Get unread counts route error: %s", e)
+        return jsonify({
+            "status": "1",
+            "message": "Failed to get unread counts",
+            "message_code": "GET_UNREAD_COUNTS_FAILED"
+        }), 500
+
+
 @auth_bp.patch("/friend/result/<int:result_id>/read")
 @jwt_required()
 def mark_friend_result_as_read(result_id):
     """標記邀請結果為已讀"""
-    print(f"Mark friend result {result_id} as read endpoint called")
+    logger.debug("Mark friend result %s as read endpoint called", result_id)
     try:
         email = get_jwt_identity()
         if not isinstance(email, str):
@@ -1145,7 +1159,7 @@ def mark_friend_result_as_read(result_id):
         return jsonify(result), status
 
     except Exception as e:
-        print(f"Mark friend result as read route error: {str(e)}")
+        logger.error("Mark friend result as read route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "Failed to mark result as read",
@@ -1156,7 +1170,7 @@ def mark_friend_result_as_read(result_id):
 @auth_bp.delete("/friend/remove")
 @jwt_required()
 def remove_friends():
-    print("Remove friends endpoint called")
+    logger.debug("Remove friends endpoint called")
     try:
         email = get_jwt_identity()
         if not isinstance(email, str):
@@ -1173,7 +1187,7 @@ def remove_friends():
         return jsonify(result), status
 
     except Exception as e:
-        print(f"Remove friends route error: {str(e)}")
+        logger.error("Remove friends route error: %s", e)
         return jsonify({
             "status": "1",
             "message": "Failed to remove friend",
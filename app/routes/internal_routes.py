@@ -0,0 +1,61 @@
+# app/routes/internal_routes.py
+"""
+內部監控端點（/internal）
+預設僅在 development / testing 開啟；INTERNAL_TOKEN 有設定時需帶 X-Internal-Token 標頭
+"""
+import hmac
+from flask import Blueprint, Response, current_app, jsonify, request
+from app.utils.request_metrics import render_metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+internal_bp = Blueprint("internal", __name__)
+
+
+@internal_bp.before_request
+def guard():
+    if not current_app.config.get("INTERNAL_ENDPOINTS_ENABLED"):
+        return jsonify({"status": "1", "message": "Not found", "message_code": "NOT_FOUND"}), 404
+    token = current_app.config.get("INTERNAL_TOKEN")
+    if token and not hmac.compare_digest(request.headers.get("X-Internal-Token", ""), token):
+        logger.warning("Rejected internal request from %s", request.remote_addr)
+        return jsonify({"status": "1", "message": "Forbidden", "message_code": "FORBIDDEN"}), 403
+
+
+@internal_bp.get("/metrics/pool")
+def pool_metrics():
+    """各 engine 的連線池狀態、等待時間直方圖與溢出 / 回收次數"""
+    return jsonify(current_app.extensions["pool_metrics"].metrics()), 200
+
+
+@internal_bp.get("/metrics/memory")
+def memory_metrics():
+    """記憶體取樣：行程 RSS / tracemalloc、各 endpoint 的配置差異與 tracemalloc 增長最多的位置"""
+    profiler = current_app.extensions.get("memory_profiler")
+    if profiler is None:
+        return jsonify({"status": "1", "message": "Not found", "message_code": "NOT_FOUND"}), 404
+    return jsonify(profiler.export()), 200
+
+
+@internal_bp.get("/metrics")
+def metrics():
+    """Prometheus 文字格式：各路由延遲 / 狀態碼 / DB 查詢，連線池、密碼雜湊、郵件佇列與記憶體取樣"""
+    extensions = current_app.extensions
+    parts = []
+    if "request_metrics" in extensions:
+        parts.append(extensions["request_metrics"].render())
+    if "pool_metrics" in extensions:
+        parts.append(extensions["pool_metrics"].render())
+    lines = []
+    for name in ("password_hasher", "mail_dispatcher"):
+        if name in extensions:
+            lines += render_metrics(name, extensions[name].metrics())
+    if "memory_profiler" in extensions:
+        memory = extensions["memory_profiler"].export()
+        lines += render_metrics("memory_process", memory["process"])
+        for endpoint, stats in sorted(memory["endpoints"].items()):
+            lines += render_metrics("memory_endpoint", stats, {"endpoint": endpoint})
+    if lines:
+        parts.append("\n".join(lines) + "\n")
+    return Response("".join(parts), mimetype="text/plain; version=0.0.4")
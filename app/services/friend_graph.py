@@ -0,0 +1,81 @@
+"""
+好友關係圖快取
+每位使用者的好友（friendships，依關係類型分組）保存在行程內 TTL 快取，
+分享 / 好友列表等讀取路徑取得好友 id 時不需查詢資料庫；
+邀請送出 / 接受 / 拒絕、刪除好友時由 controller 呼叫 invalidate()，其他 worker 依 FRIEND_GRAPH_TTL 自然過期
+"""
+
+from collections import namedtuple
+from typing import Dict, FrozenSet, Optional
+from flask import current_app, has_app_context
+from app.extensions import db
+from app.models.friendship import Friendship
+from app.utils.ttl_cache import TTLCache
+
+# 一條好友邊：對方 id、關係類型、成為好友的時間
+FriendEdge = namedtuple("FriendEdge", ["friend_id", "relation_type", "created_at"])
+
+
+class FriendGraph(namedtuple("FriendGraph", ["edges", "by_type"])):
+    """
+    edges: 依建立順序排列的 FriendEdge
+    by_type: {relation_type: frozenset(friend_id)}
+    """
+
+    def friend_ids(self, relation_type: Optional[int] = None) -> FrozenSet[int]:
+        if relation_type is None:
+            return frozenset(edge.friend_id for edge in self.edges)
+        return self.by_type.get(relation_type, frozenset())
+
+
+_cache = TTLCache(maxsize=10000)
+
+
+def _ttl() -> float:
+    if has_app_context():
+        return float(current_app.config.get("FRIEND_GRAPH_TTL", 60))
+    return 60.0
+
+
+def _load(user_id: int) -> FriendGraph:
+    # 結果會快取整個 FRIEND_GRAPH_TTL，一律讀主庫；@read_only 範圍內讀副本可能把延遲的資料保存到寫入後的 sticky 期間之後
+    rows = db.session.execute(Friendship.friends_of(user_id), bind_arguments={"bind": db.engine}).all()
+    # 依成為好友的先後排序（UNION ALL 兩段各自依索引順序）
+    rows.sort(key=lambda row: (row.created_at, row.id))
+
+    by_type: Dict[int, set] = {}
+    for row in rows:
+        by_type.setdefault(row.type, set()).add(row.friend_id)
+    edges = tuple(FriendEdge(row.friend_id, row.type, row.created_at) for row in rows)
+    return FriendGraph(edges, {key: frozenset(ids) for key, ids in by_type.items()})
+
+
+def get_graph(user_id: int) -> FriendGraph:
+    """取得使用者的好友關係圖（快取未命中時查詢一次主庫）"""
+    ttl = _ttl()
+    graph = _cache.get(user_id, ttl) if ttl > 0 else None
+    if graph is None:
+        graph = _load(user_id)
+        if ttl > 0:
+            _cache.set(user_id, graph)
+    return graph
+
+
+def friend_ids(user_id: int, relation_type: Optional[int] = None) -> FrozenSet[int]:
+    """已接受的好友 id；relation_type 為 None 時回傳所有類型"""
+    return get_graph(user_id).friend_ids(relation_type)
+
+
+def are_friends(user_id: int, other_id: int, relation_type: int) -> bool:
+    return other_id in friend_ids(user_id, relation_type)
+
+
+def invalidate(*user_ids: int):
+    """
+    清除指定使用者的快取（關係兩端都要清除）
+
+    僅清除本行程的快取，其他 worker 依 FRIEND_GRAPH_TTL 自然過期
+    """
+    for user_id in user_ids:
+        if user_id:
+            _cache.pop(user_id)
@@ -0,0 +1,96 @@
+"""
+好友邀請碼
+註冊時即發放邀請碼（既有使用者以 `flask backfill-invite-codes` 補發），GET 路徑不再寫入；
+以邀請碼找使用者時查詢 users.invite_code 唯一索引一次，結果保存在行程內 LRU 快取
+"""
+
+from typing import Optional
+from flask import current_app, has_app_context
+from app.extensions import db
+from app.models.user import User
+from app.utils.ttl_cache import TTLCache
+
+_cache = TTLCache(maxsize=10000)
+
+
+def _ttl() -> float:
+    if has_app_context():
+        return float(current_app.config.get("INVITE_CODE_CACHE_TTL", 3600))
+    return 3600.0
+
+
+def code_for(user_id: int) -> str:
+    """使用者 id 對應的邀請碼（id 四位數 + 檢查碼四位數，與既有已發放的邀請碼相同）"""
+    user_id = int(user_id)
+    suffix = (user_id * 7 + 1000) % 9000 + 1000
+    return f"{user_id:04d}{suffix:04d}"
+
+
+def issue(user: User) -> str:
+    """為使用者設定邀請碼（需已 flush 取得 id，由呼叫端 commit）"""
+    if not user.invite_code:
+        user.invite_code = code_for(user.id)
+    return user.invite_code
+
+
+def ensure(user_id: int) -> str:
+    """
+    補發尚無邀請碼的使用者並 commit，回傳主庫中的邀請碼
+
+    只更新仍為 NULL 的欄位，重複或並行呼叫不會覆寫既有邀請碼；
+    可能在 @read_only 範圍內呼叫，讀寫都明確指定主庫
+    """
+    primary = {"bind": db.engine}
+    db.session.execute(
+        db.update(User).where(User.id == user_id, User.invite_code.is_(None)).values(invite_code=code_for(user_id)),
+        bind_arguments=primary,
+    )
+    invite_code = db.session.execute(
+        db.select(User.invite_code).where(User.id == user_id), bind_arguments=primary
+    ).scalar()
+    db.session.commit()
+    return invite_code
+
+
+def backfill(batch_size: int = 1000) -> int:
+    """
+    為尚無邀請碼的使用者補發，每批各自 commit
+
+    Returns:
+        補發筆數
+    """
+    total = 0
+    while True:
+        user_ids = db.session.execute(
+            db.select(User.id).where(User.invite_code.is_(None)).order_by(User.id).limit(batch_size)
+        ).scalars().all()
+        if not user_ids:
+            return total
+        db.session.execute(
+            db.update(User),
+            [{"id": user_id, "invite_code": code_for(user_id)} for user_id in user_ids],
+        )
+        db.session.commit()
+        total += len(user_ids)
+
+
+def resolve(invite_code) -> Optional[int]:
+    """
+    邀請碼對應的使用者 id
+
+    Returns:
+        使用者 id，找不到時回傳 None（不快取不存在的結果）
+    """
+    code = str(invite_code or "").strip()
+    if not code:
+        return None
+
+    ttl = _ttl()
+    user_id = _cache.get(code, ttl) if ttl > 0 else None
+    if user_id is None:
+        user_id = db.session.execute(
+            db.select(User.id).where(User.invite_code == code).limit(1)
+        ).scalar()
+        if user_id is not None and ttl > 0:
+            _cache.set(code, user_id)
+    return user_id
@@ -0,0 +1,134 @@
+"""
+最新消息分頁與快取
+最新消息對同群組的所有使用者都相同且讀多寫少，
+因此將組裝好的每一頁快取在行程內；News 資料列變動時清除，並以 TTL 兜底
+（bulk update / 其他 worker 寫入不會觸發本行程的 mapper 事件）
+"""
+
+from typing import Optional
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.models.news import News
+from app.utils import pagination
+from app.utils.conditional import make_etag
+from app.utils.ttl_cache import TTLCache
+
+_cache = TTLCache(maxsize=256)
+
+
+def _ttl() -> float:
+    if has_app_context():
+        return float(current_app.config.get("NEWS_CACHE_TTL", 60))
+    return 60.0
+
+
+def invalidate_news_cache():
+    """清除所有已快取的最新消息頁面"""
+    _cache.clear()
+
+
+def _on_news_change(_mapper, _connection, target):
+    # flush 時先清除一次；交易 commit 後再清除一次，避免 commit 前被其他請求以舊資料回填
+    invalidate_news_cache()
+    session = object_session(target)
+    if session is not None:
+        session.info["news_changed"] = True
+
+
+def _on_commit(session):
+    if session.info.pop("news_changed", False):
+        invalidate_news_cache()
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(News, _event_name, _on_news_change)
+event.listen(Session, "after_commit", _on_commit)
+
+
+def safe_string(text, default="", replacement=""):
+    """安全的字符串處理 - 避免中文字符，含非 ASCII 字元時回傳 replacement"""
+    if not text:
+        return default
+    try:
+        text.encode('ascii')
+        return text
+    except UnicodeEncodeError:
+        return replacement
+
+
+def serialize_news(news) -> dict:
+    """將 News 轉為回應格式"""
+    return {
+        "id": news.id,
+        "member_id": news.member_id,
+        "group": news.group,
+        "title": safe_string(news.title, f"News {news.id}", f"Content {news.id}"),
+        "message": safe_string(news.message, "Content available", f"Content {news.id}"),
+        "pushed_at": news.pushed_at or "",
+        "created_at": news.created_at or "",
+        "updated_at": news.updated_at or "",
+    }
+
+
+def parse_group(group) -> Optional[int]:
+    """使用者的群組（字串）轉為 News.group；未設定或非數字時回傳 None（不篩選）"""
+    try:
+        return int(str(group).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_page(group: Optional[int] = None, cursor: Optional[str] = None, limit=None) -> dict:
+    """
+    取得一頁最新消息（依 created_at、id 由新到舊）
+
+    Args:
+        group: 只顯示此群組的消息，None 表示全部
+        cursor / limit: keyset 分頁；兩者皆未提供時回傳全部
+
+    Returns:
+        {"news": [...], "next_cursor": ... 或 None, "etag": ...}
+
+    Raises:
+        ValueError: cursor 或 limit 格式錯誤
+    """
+    key = (group, cursor, limit)
+    ttl = _ttl()
+    page = _cache.get(key, ttl) if ttl > 0 else None
+    if page is not None:
+        return page
+
+    paginate = cursor is not None or limit is not None
+    query = News.query
+    if group is not None:
+        query = query.filter(News.group == group)
+    if paginate:
+        page_size = pagination.parse_limit(limit)
+        if cursor:
+            query = query.filter(
+                pagination.before(News.created_at, News.id, pagination.decode_cursor(cursor))
+            )
+
+    query = query.order_by(News.created_at.desc(), News.id.desc())
+    if paginate:
+        rows = query.limit(page_size + 1).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+    else:
+        rows = query.all()
+
+    news_list = [serialize_news(news) for news in rows]
+    next_cursor = None
+    if paginate:
+        last = rows[-1] if rows else None
+        next_cursor = pagination.encode_cursor(last.created_at, last.id) if has_more and last else ""
+
+    page = {
+        "news": news_list,
+        "next_cursor": next_cursor,
+        "etag": make_etag("news", group, cursor, limit, news_list),
+    }
+    if ttl > 0:
+        _cache.set(key, page)
+    return page
@@ -0,0 +1,213 @@
+"""
+使用者個人資料載入器
+以單一 SELECT（LEFT OUTER JOIN）取得 GET /api/user 所需的全部資料，
+並一次組裝出回應內容
+"""
+
+from datetime import datetime
+from sqlalchemy import select
+from app.extensions import db
+from app.models.user import User
+from app.models.user_default import UserDefault
+from app.models.user_setting import UserSetting
+from app.models.user_vip import UserVip
+from app.models.a1c import A1cRecord
+from app.services import invite_codes
+
+
+def ss(v, default=""):
+    """安全轉換為字串"""
+    return default if v is None else str(v)
+
+
+def si0(v, default=0):
+    """安全轉換為整數"""
+    if v is None or v == "":
+        return default
+    try:
+        return int(v)
+    except (ValueError, TypeError):
+        return default
+
+
+def sf0(v, default=0.0):
+    """安全轉換為浮點數，確保回傳數值而非 NaN/Inf"""
+    if v is None or v == "":
+        return default
+    try:
+        result = float(v)
+        # 檢查是否為有效數值
+        if result != result or result == float('inf') or result == float('-inf'):
+            return default
+        return result
+    except (ValueError, TypeError):
+        return default
+
+
+def safe_dt(dt, fmt="%Y-%m-%d %H:%M:%S"):
+    """
+    正規化以字串儲存的日期（birthday、VIP 起訖時間等）
+
+    DateTime 欄位直接放入回應即可，由 JSON provider 轉為字串
+    """
+    if not dt:
+        return ""
+    try:
+        if isinstance(dt, str):
+            for f in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%Y/%m/%d", "%Y/%m/%d %H:%M:%S"):
+                try:
+                    return datetime.strptime(dt, f).strftime(fmt)
+                except ValueError:
+                    continue
+            return dt
+        if hasattr(dt, "strftime"):
+            return dt.strftime(fmt)
+    except Exception:
+        pass
+    return ""
+
+
+def load_profile(email: str):
+    """
+    以一次資料庫往返載入使用者及其 default / setting / vip / 最新 A1c 記錄
+
+    Args:
+        email: 使用者 email
+
+    Returns:
+        (user, user_default, user_setting, user_vip, user_a1c) 元組，
+        使用者不存在時回傳 None
+    """
+    # 最新一筆 A1c 記錄的 id（相關子查詢）
+    latest_a1c_id = (
+        select(A1cRecord.id)
+        .where(A1cRecord.user_id == User.id)
+        .order_by(A1cRecord.created_at.desc())
+        .limit(1)
+        .correlate(User)
+        .scalar_subquery()
+    )
+
+    stmt = (
+        select(User, UserDefault, UserSetting, UserVip, A1cRecord)
+        .outerjoin(UserDefault, UserDefault.user_id == User.id)
+        .outerjoin(UserSetting, UserSetting.user_id == User.id)
+        .outerjoin(UserVip, UserVip.user_id == User.id)
+        .outerjoin(A1cRecord, A1cRecord.id == latest_a1c_id)
+        .where(User.email == email)
+        .limit(1)
+    )
+
+    row = db.session.execute(stmt).first()
+    if row is None:
+        return None
+    return tuple(row)
+
+
+def build_profile(user, user_default, user_setting, user_vip, user_a1c) -> dict:
+    """
+    將查詢結果組裝為 GET /api/user 的 user 欄位內容
+
+    Returns:
+        user 字典（包含 default / setting / vip / a1c 子物件）
+    """
+    user_id = user.id
+
+    gender_value = 1 if getattr(user, "gender", False) else 0
+    invite_code = ss(getattr(user, "invite_code", None)) or invite_codes.code_for(user_id)
+    vip_level = si0(getattr(user_vip, "level", 0)) if user_vip else 0
+    user_status = "VIP" if vip_level > 0 else "general"
+
+    user_data = {
+        "id": si0(user_id),
+        "name": ss(getattr(user, "name", "")),
+        "account": ss(getattr(user, "account", "")),
+        "email": ss(getattr(user, "email", "")),
+        "phone": ss(getattr(user, "phone", "")),
+        "fb_id": ss(getattr(user, "fb_id", "")),
+        "status": user_status,
+        "group": ss(getattr(user, "group", "0")),
+        "birthday": safe_dt(getattr(user, "birthday", None), "%Y-%m-%d"),
+        "height": sf0(getattr(user, "height", 0.0)),
+        "weight": sf0(getattr(user, "weight", 0.0)),
+        "gender": gender_value,
+        "address": ss(getattr(user, "address", "")),
+        "unread_records": [0, 0, 0],
+        "verified": 1 if getattr(user, "is_verified", False) else 0,
+        "privacy_policy": 1,
+        "must_change_password": si0(getattr(user, "must_change_password", 0)),
+        "fcm_id": ss(getattr(user, "fcm_id", "")),
+        "login_times": si0(getattr(user, "login_times", 0)),
+        "created_at": getattr(user, "created_at", None) or "",
+        "updated_at": getattr(user, "created_at", None) or "",
+        "invite_code": invite_code,
+        "verification_code": ss(getattr(user, "verification_code", "")),
+    }
+
+    default_data = {
+        "id": si0(getattr(user_default, "id", 0)) if user_default else 0,
+        "user_id": si0(user_id),
+        "sugar_delta_max": sf0(getattr(user_default, "sugar_delta_max", 0.0)) if user_default else 0.0,
+        "sugar_delta_min": sf0(getattr(user_default, "sugar_delta_min", 0.0)) if user_default else 0.0,
+        "sugar_morning_max": sf0(getattr(user_default, "sugar_morning_max", 0.0)) if user_default else 0.0,
+        "sugar_morning_min": sf0(getattr(user_default, "sugar_morning_min", 0.0)) if user_default else 0.0,
+        "sugar_evening_max": sf0(getattr(user_default, "sugar_evening_max", 0.0)) if user_default else 0.0,
+        "sugar_evening_min": sf0(getattr(user_default, "sugar_evening_min", 0.0)) if user_default else 0.0,
+        "sugar_before_max": sf0(getattr(user_default, "sugar_before_max", 0.0)) if user_default else 0.0,
+        "sugar_before_min": sf0(getattr(user_default, "sugar_before_min", 0.0)) if user_default else 0.0,
+        "sugar_after_max": sf0(getattr(user_default, "sugar_after_max", 0.0)) if user_default else 0.0,
+        "sugar_after_min": sf0(getattr(user_default, "sugar_after_min", 0.0)) if user_default else 0.0,
+        "systolic_max": si0(getattr(user_default, "systolic_max", 0)) if user_default else 0,
+        "systolic_min": si0(getattr(user_default, "systolic_min", 0)) if user_default else 0,
+        "diastolic_max": si0(getattr(user_default, "diastolic_max", 0)) if user_default else 0,
+        "diastolic_min": si0(getattr(user_default, "diastolic_min", 0)) if user_default else 0,
+        "pulse_max": si0(getattr(user_default, "pulse_max", 0)) if user_default else 0,
+        "pulse_min": si0(getattr(user_default, "pulse_min", 0)) if user_default else 0,
+        "weight_max": sf0(getattr(user_default, "weight_max", 0.0)) if user_default else 0.0,
+        "weight_min": sf0(getattr(user_default, "weight_min", 0.0)) if user_default else 0.0,
+        "bmi_max": sf0(getattr(user_default, "bmi_max", 0.0)) if user_default else 0.0,
+        "bmi_min": sf0(getattr(user_default, "bmi_min", 0.0)) if user_default else 0.0,
+        "body_fat_max": sf0(getattr(user_default, "body_fat_max", 0.0)) if user_default else 0.0,
+        "body_fat_min": sf0(getattr(user_default, "body_fat_min", 0.0)) if user_default else 0.0,
+        "created_at": getattr(user_default, "created_at", None) or "",
+        "updated_at": getattr(user_default, "updated_at", None) or "",
+    }
+
+    setting_data = {
+        "id": si0(getattr(user_setting, "id", 0)) if user_setting else 0,
+        "user_id": si0(user_id),
+        "after_recording": si0(getattr(user_setting, "after_recording", 0)) if user_setting else 0,
+        "no_recording_for_a_day": si0(getattr(user_setting, "no_recording_for_a_day", 0)) if user_setting else 0,
+        "over_max_or_under_min": si0(getattr(user_setting, "over_max_or_under_min", 0)) if user_setting else 0,
+        "after_meal": si0(getattr(user_setting, "after_meal", 0)) if user_setting else 0,
+        "unit_of_sugar": si0(getattr(user_setting, "unit_of_sugar", 0)) if user_setting else 0,
+        "unit_of_weight": si0(getattr(user_setting, "unit_of_weight", 0)) if user_setting else 0,
+        "unit_of_height": si0(getattr(user_setting, "unit_of_height", 0)) if user_setting else 0,
+        "created_at": getattr(user_setting, "created_at", None) or "",
+        "updated_at": getattr(user_setting, "updated_at", None) or "",
+    }
+
+    vip_data = {
+        "id": si0(getattr(user_vip, "id", 0)) if user_vip else 0,
+        "user_id": si0(user_id),
+        "level": vip_level,
+        "remark": sf0(getattr(user_vip, "remark", 0.0)) if user_vip else 0.0,  # 必須是 Double
+        "started_at": safe_dt(getattr(user_vip, "started_at", None)) if user_vip else "",
+        "ended_at": safe_dt(getattr(user_vip, "ended_at", None)) if user_vip else "",
+        "created_at": getattr(user_vip, "created_at", None) or "",
+        "updated_at": getattr(user_vip, "updated_at", None) or "",
+    }
+
+    a1c_data = {
+        "message": ss(getattr(user_a1c, "message", "")) if user_a1c else "",
+        "latest_value": sf0(getattr(user_a1c, "A1c", 0.0)) if user_a1c else 0.0,
+        "latest_date": safe_dt(getattr(user_a1c, "record_date", None)) if user_a1c else "",
+    }
+
+    # 將 default, setting, vip, a1c 放入 user 內部
+    user_data["default"] = default_data
+    user_data["setting"] = setting_data
+    user_data["vip"] = vip_data
+    user_data["a1c"] = a1c_data
+
+    return user_data
@@ -0,0 +1,221 @@
+"""
+生理量測記錄（血糖 / 血壓 / 體重）的驗證與寫入
+單筆新增與批次匯入共用相同的驗證規則
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List
+from sqlalchemy import insert
+from app.extensions import db
+from app.models.diary import Diary
+
+TZ_TAIWAN = timezone(timedelta(hours=8))
+
+RECORDED_AT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ReadingError(ValueError):
+    """量測資料驗證失敗，帶有回應用的 message 與 message_code"""
+
+    def __init__(self, message: str, message_code: str):
+        super().__init__(message)
+        self.message = message
+        self.message_code = message_code
+
+
+def parse_recorded_at(recorded_at, strict: bool = True) -> datetime:
+    """
+    解析記錄時間（台灣時區），未提供時使用現在時間
+
+    strict=False 時格式錯誤改用現在時間（血壓、體重的既有行為）
+    """
+    if not recorded_at:
+        return datetime.now(TZ_TAIWAN)
+    try:
+        return datetime.strptime(recorded_at, RECORDED_AT_FORMAT).replace(tzinfo=TZ_TAIWAN)
+    except (ValueError, TypeError):
+        if not strict:
+            return datetime.now(TZ_TAIWAN)
+        raise ReadingError(
+            "Invalid recorded_at format, should be YYYY-MM-DD HH:MM:SS",
+            "INVALID_RECORDED_AT_FORMAT",
+        )
+
+
+def validate_blood_sugar(sugar, timeperiod=None, recorded_at=None, drug=None, exercise=None) -> dict:
+    """驗證血糖記錄，回傳 Diary 欄位值"""
+    if sugar is None:
+        raise ReadingError("Sugar parameter cannot be empty", "SUGAR_REQUIRED")
+    try:
+        sugar = float(sugar)
+    except (ValueError, TypeError):
+        raise ReadingError("Blood sugar value must be a number", "BLOOD_SUGAR_MUST_BE_NUMBER")
+    if sugar <= 0 or sugar > 1000:
+        raise ReadingError("Invalid blood sugar value", "INVALID_BLOOD_SUGAR")
+
+    return {
+        "sugar": sugar,
+        "timeperiod": timeperiod or 0,
+        "drug": drug or 0,
+        "exercise": exercise or 0,
+        "type": "blood_sugar",
+        "recorded_at": parse_recorded_at(recorded_at),
+    }
+
+
+def validate_blood_pressure(systolic, diastolic, pulse, recorded_at=None) -> dict:
+    """驗證血壓記錄，回傳 Diary 欄位值"""
+    if systolic is None or diastolic is None or pulse is None:
+        raise ReadingError("Blood pressure or heart rate parameters cannot be empty", "BP_HR_REQUIRED")
+    try:
+        systolic = int(float(systolic))
+        diastolic = int(float(diastolic))
+        pulse = int(float(pulse))
+    except (ValueError, TypeError):
+        raise ReadingError("Blood pressure and heart rate must be numbers", "BP_HR_MUST_BE_NUMBER")
+    if systolic <= 0 or diastolic <= 0 or pulse <= 0:
+        raise ReadingError("Invalid blood pressure or heart rate values", "INVALID_BP_HR")
+
+    return {
+        "systolic": systolic,
+        "diastolic": diastolic,
+        "pulse": pulse,
+        "type": "blood_pressure",
+        "recorded_at": parse_recorded_at(recorded_at, strict=False),
+    }
+
+
+def validate_weight(weight, bmi=None, body_fat=None, height=None, recorded_at=None) -> dict:
+    """驗證體重記錄，回傳 Diary 欄位值（未提供 BMI 時依身高計算）"""
+    try:
+        if height is not None:
+            height = float(height)
+            if height <= 0 or height > 300:
+                raise ReadingError("Invalid height parameter", "INVALID_HEIGHT")
+        else:
+            height = 170.0  # 預設值，可依需求調整
+
+        if weight is None:
+            raise ReadingError("Weight parameter cannot be empty", "WEIGHT_REQUIRED")
+        weight = float(weight)
+        if weight <= 0 or weight > 500:
+            raise ReadingError("Invalid weight parameter", "INVALID_WEIGHT")
+
+        if bmi is not None:
+            bmi = float(bmi)
+            if bmi <= 0 or bmi > 100:
+                raise ReadingError("Invalid BMI parameter", "INVALID_BMI")
+        else:
+            bmi = round(weight / ((height / 100) ** 2), 2)
+
+        if body_fat is not None:
+            body_fat = float(body_fat)
+            if body_fat < 0 or body_fat > 100:
+                raise ReadingError("Invalid body fat parameter", "INVALID_BODY_FAT")
+        else:
+            body_fat = 0.0
+    except ReadingError:
+        raise
+    except (ValueError, TypeError):
+        raise ReadingError("Parameter type error", "PARAMETER_TYPE_ERROR")
+
+    return {
+        "weight": weight,
+        "body_fat": body_fat,
+        "bmi": bmi,
+        "type": "weight",
+        "recorded_at": parse_recorded_at(recorded_at, strict=False),
+    }
+
+
+def validate_reading(item) -> dict:
+    """依 type 驗證批次匯入中的單筆資料"""
+    if not isinstance(item, dict):
+        raise ReadingError("Record must be an object", "INVALID_RECORD")
+
+    record_type = item.get("type")
+    if record_type == "blood_sugar":
+        return validate_blood_sugar(
+            item.get("sugar"), item.get("timeperiod"), item.get("recorded_at"),
+            item.get("drug"), item.get("exercise"),
+        )
+    if record_type == "blood_pressure":
+        return validate_blood_pressure(
+            item.get("systolic"), item.get("diastolic"), item.get("pulse"), item.get("recorded_at"),
+        )
+    if record_type == "weight":
+        return validate_weight(
+            item.get("weight"), item.get("bmi"), item.get("body_fat"), item.get("height"),
+            item.get("recorded_at"),
+        )
+    raise ReadingError("Invalid record type", "INVALID_RECORD_TYPE")
+
+
+def _column_default(name: str):
+    default = Diary.__table__.c[name].default
+    if default is not None and default.is_scalar:
+        return default.arg
+    return None
+
+
+def _mysql_consecutive_ids(connection):
+    """
+    目前連線的單一多列 INSERT 是否取得連續的自動遞增 id，回傳 id 間隔；不保證連續時回傳 None
+
+    innodb_autoinc_lock_mode 為 0（traditional）或 1（consecutive）時，已知筆數的 INSERT 會一次配置
+    連續的 id；2（interleaved，MySQL 8 預設）時可能與其他交易交錯。結果依連線快取
+    """
+    info = connection.info
+    if "autoinc_step" not in info:
+        lock_mode, increment = connection.exec_driver_sql(
+            "SELECT @@innodb_autoinc_lock_mode, @@auto_increment_increment"
+        ).one()
+        info["autoinc_step"] = int(increment) if int(lock_mode) in (0, 1) else None
+    return info["autoinc_step"]
+
+
+def insert_readings(user_id: int, rows: List[dict]) -> List[int]:
+    """
+    在目前交易中寫入多筆記錄（不 commit），回傳與 rows 順序相同的新 id
+
+    依資料庫選擇寫入方式：
+        支援依參數順序回傳的 INSERT ... RETURNING（PostgreSQL 等）：單一 executemany，直接取回 id
+        MySQL 且 innodb_autoinc_lock_mode 為 0 / 1：單一多列 INSERT，LAST_INSERT_ID() 為第一筆 id，
+            其餘依 auto_increment_increment 推算
+        其他（含 innodb_autoinc_lock_mode = 2）：ORM flush（同一交易內逐筆 INSERT，各自取回 id）
+    """
+    if not rows:
+        return []
+
+    dialect = db.session.get_bind(mapper=Diary.__mapper__).dialect
+    now = datetime.now(TZ_TAIWAN)
+    values = [dict(row, user_id=user_id, created_at=now, updated_at=now) for row in rows]
+
+    # executemany 需要每筆參數的欄位一致，缺少的欄位補上欄位預設值
+    keys = set().union(*values)
+    for v in values:
+        for key in keys - v.keys():
+            v[key] = _column_default(key)
+
+    if getattr(dialect, "insert_executemany_returning_sort_by_parameter_order", False):
+        result = db.session.execute(
+            insert(Diary).returning(Diary.id, sort_by_parameter_order=True),
+            values,
+        )
+        return list(result.scalars())
+
+    if dialect.name == "mysql":
+        connection = db.session.connection(bind_arguments={"mapper": Diary.__mapper__})
+        step = _mysql_consecutive_ids(connection)
+        if step is not None:
+            # 單一語句（而非 executemany，避免 driver 拆成多個語句），同一語句的 id 依 VALUES 順序連續配置
+            result = connection.execute(insert(Diary).values(values))
+            if result.rowcount != len(values):
+                raise RuntimeError(f"expected {len(values)} new diary rows, inserted {result.rowcount}")
+            first_id = result.lastrowid
+            return [first_id + i * step for i in range(len(values))]
+
+    diaries = [Diary(**v) for v in values]
+    db.session.add_all(diaries)
+    db.session.flush()
+    return [diary.id for diary in diaries]
@@ -0,0 +1,100 @@
+"""
+分享收件匣（fan-out on write）
+SHARE_FEED_MODE = "fanout" 時，新增分享即寫入每位對應團別好友的收件匣，
+GET /api/share/<relation_type> 只需掃描自己的收件匣；"pull"（預設）則於讀取時計算好友與分享
+
+由 pull 切換為 fanout 前請先執行 `flask rebuild-share-inbox` 建立既有分享的收件匣
+"""
+
+from typing import List, Optional
+from flask import current_app
+from sqlalchemy import insert, literal
+from app.extensions import db
+from app.models.friendship import Friendship
+from app.models.share import ShareRecord
+from app.models.share_inbox import ShareInbox
+
+FEED_MODES = ("pull", "fanout")
+
+
+def enabled() -> bool:
+    return current_app.config.get("SHARE_FEED_MODE", "pull") == "fanout"
+
+
+def audience(sharer_id: int, relation_type: int) -> List[int]:
+    """
+    分享會送達的好友 id（分享者該團別的所有好友）
+
+    直接查詢 friendships 而不使用好友關係圖快取，避免其他 worker 剛成立的好友漏收
+    """
+    return db.session.execute(
+        db.select(Friendship.friends_of(sharer_id, relation_type).subquery().c.friend_id)
+    ).scalars().all()
+
+
+def fan_out(share: ShareRecord, viewer_ids: Optional[List[int]] = None) -> int:
+    """
+    將分享寫入收件匣（與分享在同一交易，需由呼叫端 commit）
+
+    Args:
+        viewer_ids: 收件者，未提供時以 audience() 查詢
+
+    Returns:
+        寫入筆數
+    """
+    if viewer_ids is None:
+        viewer_ids = audience(share.user_id, share.relation_type)
+    if not viewer_ids:
+        return 0
+    db.session.execute(insert(ShareInbox), [
+        {
+            "viewer_id": viewer_id, "share_id": share.id, "sharer_id": share.user_id,
+            "relation_type": share.relation_type, "created_at": share.created_at,
+        }
+        for viewer_id in viewer_ids
+    ])
+    return len(viewer_ids)
+
+
+def _copy_shares(sharer_id: int, viewer_id: int, relation_type: int):
+    # sharer 既有的該團別分享複製到 viewer 的收件匣（已存在的略過）
+    already = db.select(ShareInbox.id).where(
+        ShareInbox.viewer_id == viewer_id, ShareInbox.share_id == ShareRecord.id
+    ).exists()
+    rows = db.select(
+        literal(viewer_id), ShareRecord.id, ShareRecord.user_id, ShareRecord.relation_type, ShareRecord.created_at
+    ).where(
+        ShareRecord.user_id == sharer_id,
+        ShareRecord.relation_type == relation_type,
+        ~already,
+    )
+    db.session.execute(insert(ShareInbox).from_select(
+        ["viewer_id", "share_id", "sharer_id", "relation_type", "created_at"], rows
+    ))
+
+
+def backfill_friendship(user_id: int, other_id: int, relation_type: int):
+    """新成立的好友互相收到對方既有的分享（需由呼叫端 commit）"""
+    _copy_shares(user_id, other_id, relation_type)
+    _copy_shares(other_id, user_id, relation_type)
+
+
+def rebuild() -> int:
+    """
+    依 friendships 與 share_records 重建所有收件匣（需由呼叫端 commit）
+
+    Returns:
+        寫入筆數
+    """
+    db.session.execute(db.delete(ShareInbox))
+    columns = ["viewer_id", "share_id", "sharer_id", "relation_type", "created_at"]
+    total = 0
+    # 好友關係兩個方向各一次：分享者為 low_id 時收件者為 high_id，反之亦然
+    for sharer, viewer in ((Friendship.low_id, Friendship.high_id), (Friendship.high_id, Friendship.low_id)):
+        rows = db.select(
+            viewer, ShareRecord.id, ShareRecord.user_id, ShareRecord.relation_type, ShareRecord.created_at
+        ).join(
+            Friendship, db.and_(sharer == ShareRecord.user_id, Friendship.type == ShareRecord.relation_type)
+        )
+        total += db.session.execute(insert(ShareInbox).from_select(columns, rows)).rowcount or 0
+    return total
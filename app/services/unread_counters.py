@@ -0,0 +1,110 @@
+"""
+好友 / 分享未讀計數
+邀請送出 / 接受 / 拒絕、結果標記已讀、新增分享時，在同一交易內以 `SET x = x + n` 原子增減，
+badge 只需讀取 friend_unread_counters 的三筆資料，不必查詢完整的邀請 / 分享列表
+
+計數與列表的條件一致：
+    pending_requests: FriendResult.relation_id == 我 且 status == 0
+    unread_results:   FriendResult.user_id == 我 且 (status == 0 或 read == 0)
+"""
+
+from typing import Dict, Iterable, List
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.friend_unread_counter import FriendUnreadCounter
+
+RELATION_TYPES = (0, 1, 2)
+COUNTER_FIELDS = ("pending_requests", "unread_results", "unread_shares")
+
+
+def create_rows(user_id: int):
+    """新使用者建立計數資料列（由呼叫端 commit）"""
+    db.session.add_all(FriendUnreadCounter(user_id=user_id, relation_type=t) for t in RELATION_TYPES)
+
+
+def _adjusted(column, delta: int):
+    # 不低於 0（資料不一致時避免出現負數 badge）
+    return db.case((column + delta < 0, 0), else_=column + delta)
+
+
+def _bump(user_ids: Iterable[int], relation_type: int, field: str, delta: int):
+    user_ids = [user_id for user_id in set(user_ids) if user_id]
+    if not user_ids or not delta:
+        return
+    column = getattr(FriendUnreadCounter, field)
+    condition = db.and_(
+        FriendUnreadCounter.user_id.in_(user_ids), FriendUnreadCounter.relation_type == relation_type
+    )
+    updated = db.session.execute(
+        db.update(FriendUnreadCounter).where(condition).values({field: _adjusted(column, delta)})
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if updated == len(user_ids) or delta < 0:
+        return
+
+    # 補建缺少的資料列（例如 migration 之後、尚未有計數的使用者）
+    existing = set(db.session.execute(db.select(FriendUnreadCounter.user_id).where(condition)).scalars())
+    for user_id in user_ids:
+        if user_id in existing:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.add(FriendUnreadCounter(user_id=user_id, relation_type=relation_type, **{field: delta}))
+        except IntegrityError:
+            # 同時有其他請求建立了同一列
+            db.session.execute(
+                db.update(FriendUnreadCounter)
+                .where(FriendUnreadCounter.user_id == user_id, FriendUnreadCounter.relation_type == relation_type)
+                .values({field: column + delta})
+                .execution_options(synchronize_session=False)
+            )
+
+
+def invite_sent(sender_id: int, recipient_id: int, relation_type: int):
+    _bump([recipient_id], relation_type, "pending_requests", 1)
+    _bump([sender_id], relation_type, "unread_results", 1)
+
+
+def invite_answered(sender_id: int, recipient_id: int, relation_type: int):
+    """接受或拒絕（status 0 -> 1/2 且 read = 1）"""
+    _bump([recipient_id], relation_type, "pending_requests", -1)
+    _bump([sender_id], relation_type, "unread_results", -1)
+
+
+def result_read(sender_id: int, relation_type: int):
+    """已處理的邀請結果由未讀改為已讀（待處理的邀請仍計入 unread_results）"""
+    _bump([sender_id], relation_type, "unread_results", -1)
+
+
+def shares_added(viewer_ids: Iterable[int], relation_type: int):
+    _bump(viewer_ids, relation_type, "unread_shares", 1)
+
+
+def shares_read(user_id: int, relation_type: int):
+    db.session.execute(
+        db.update(FriendUnreadCounter)
+        .where(FriendUnreadCounter.user_id == user_id, FriendUnreadCounter.relation_type == relation_type)
+        .values(unread_shares=0)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def counts(user_id: int) -> Dict[str, List[int]]:
+    """
+    各計數依關係類型排列
+
+    Returns:
+        {"pending_requests": [0, 1, 0], "unread_results": [...], "unread_shares": [...]}
+    """
+    result = {field: [0] * len(RELATION_TYPES) for field in COUNTER_FIELDS}
+    rows = db.session.execute(
+        db.select(
+            FriendUnreadCounter.relation_type,
+            *(getattr(FriendUnreadCounter, field) for field in COUNTER_FIELDS),
+        ).where(FriendUnreadCounter.user_id == user_id)
+    ).all()
+    for relation_type, *values in rows:
+        if relation_type in RELATION_TYPES:
+            for field, value in zip(COUNTER_FIELDS, values):
+                result[field][RELATION_TYPES.index(relation_type)] = value or 0
+    return result
@@ -0,0 +1,106 @@
+"""
+已登入使用者解析快取
+將 JWT identity（email）對應到輕量的使用者資料 (id, email, name, account, group)，
+依序查詢：JWT claims -> 請求內快取 (flask.g) -> 行程內 TTL/LRU 快取 -> 資料庫
+"""
+
+from collections import namedtuple
+from typing import Optional
+from flask import current_app, g, has_app_context, has_request_context
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from app.extensions import db
+from app.models.user import User
+from app.utils.ttl_cache import TTLCache
+
+UserRef = namedtuple("UserRef", ["id", "email", "name", "account", "group"])
+
+USER_ID_CLAIM = "uid"
+
+_cache = TTLCache()
+
+
+def _ttl() -> float:
+    if has_app_context():
+        return float(current_app.config.get("USER_CACHE_TTL", 60))
+    return 60.0
+
+
+def _request_cache() -> dict:
+    if not hasattr(g, "_user_refs"):
+        g._user_refs = {}
+    return g._user_refs
+
+
+def resolve_user(email: str) -> Optional[UserRef]:
+    """
+    取得 email 對應的輕量使用者資料
+
+    Returns:
+        UserRef，使用者不存在時回傳 None（不快取不存在的結果）
+    """
+    if not email:
+        return None
+
+    in_request = has_request_context()
+    if in_request:
+        ref = _request_cache().get(email)
+        if ref is not None:
+            return ref
+
+    ttl = _ttl()
+    ref = _cache.get(email, ttl) if ttl > 0 else None
+    if ref is None:
+        row = db.session.execute(
+            db.select(User.id, User.email, User.name, User.account, User.group)
+            .where(User.email == email)
+            .limit(1)
+        ).first()
+        if row is None:
+            return None
+        ref = UserRef(*row)
+        if ttl > 0:
+            _cache.set(email, ref)
+
+    if in_request:
+        _request_cache()[email] = ref
+    return ref
+
+
+def current_user_id(email: str) -> Optional[int]:
+    """
+    取得目前使用者 id
+
+    若 JWT 內含 uid claim 且 identity 與 email 相符則直接使用，不需查詢資料庫；
+    否則（例如舊版 token）退回 resolve_user
+    """
+    if has_request_context():
+        try:
+            if get_jwt_identity() == email:
+                uid = get_jwt().get(USER_ID_CLAIM)
+                if uid is not None:
+                    return int(uid)
+        except Exception:
+            # 非 JWT 保護的請求
+            pass
+
+    ref = resolve_user(email)
+    return ref.id if ref else None
+
+
+def user_claims(user) -> dict:
+    """登入時寫入 JWT 的額外 claims"""
+    return {USER_ID_CLAIM: user.id}
+
+
+def invalidate_user(*emails: str):
+    """
+    清除指定 email 的快取
+
+    僅清除本行程與本請求的快取，其他 worker 依 USER_CACHE_TTL 自然過期
+    """
+    for email in emails:
+        if not email:
+            continue
+        _cache.pop(email)
+        if has_request_context():
+            _request_cache().pop(email, None)
@@ -0,0 +1,60 @@
+"""
+最新生理數值查詢
+各類型各取最新一筆（LIMIT 1），由 diary(user_id, type, recorded_at) 索引支援，
+不需要讀取使用者的完整日記歷史
+"""
+
+from typing import Optional
+from app.extensions import db
+from app.models.diary import Diary
+
+# 類型 -> (代表欄位, 回傳欄位)
+VITAL_TYPES = {
+    "blood_sugar": (Diary.sugar, (Diary.sugar,)),
+    "blood_pressure": (Diary.systolic, (Diary.systolic, Diary.diastolic, Diary.pulse)),
+    "weight": (Diary.weight, (Diary.weight,)),
+}
+
+
+def _latest(user_id: int, record_type: str, timeperiod: Optional[int]):
+    value_column, columns = VITAL_TYPES[record_type]
+    stmt = (
+        db.select(*columns)
+        .where(
+            Diary.user_id == user_id,
+            Diary.type == record_type,
+            value_column > 0,
+        )
+        .order_by(Diary.recorded_at.desc(), Diary.id.desc())
+        .limit(1)
+    )
+    if timeperiod is not None:
+        stmt = stmt.where(Diary.timeperiod == timeperiod)
+    return db.session.execute(stmt).first()
+
+
+def latest_vitals(user_id: int, timeperiod: Optional[int] = None) -> dict:
+    """
+    取得最新的血糖、血壓、體重
+
+    Args:
+        user_id: 使用者 id
+        timeperiod: 只看指定時段的記錄
+
+    Returns:
+        {"blood_sugars": {...}, "blood_pressures": {...}, "weights": {...}}，
+        沒有記錄的項目為 0
+    """
+    sugar = _latest(user_id, "blood_sugar", timeperiod)
+    pressure = _latest(user_id, "blood_pressure", timeperiod)
+    weight = _latest(user_id, "weight", timeperiod)
+
+    return {
+        "blood_sugars": {"sugar": float(sugar.sugar) if sugar else 0.0},
+        "blood_pressures": {
+            "systolic": int(pressure.systolic) if pressure else 0,
+            "diastolic": int(pressure.diastolic or 0) if pressure else 0,
+            "pulse": int(pressure.pulse or 0) if pressure else 0,
+        },
+        "weights": {"weight": float(weight.weight) if weight else 0.0},
+    }
@@ -5,13 +5,17 @@
 
 from flask import jsonify
 from typing import Any, Optional, Dict, Union
-import traceback
+import logging
+from app.utils.conditional import conditional_json
+
+logger = logging.getLogger(__name__)
 
 class APIResponse:
     """標準化 API 回應處理器"""
     
     @staticmethod
-    def success(data: Any = None, message: str = "Success", message_code: str = "SUCCESS", status_code: int = 200) -> tuple:
+    def success(data: Any = None, message: str = "Success", message_code: str = "SUCCESS", status_code: int = 200,
+                etag: Optional[str] = None) -> tuple:
         """
         成功回應格式
         
@@ -20,6 +24,7 @@ class APIResponse:
             message: 成功訊息
             message_code: 訊息代碼
             status_code: HTTP 狀態碼
+            etag: 提供時附上 ETag，並在 If-None-Match 相符時回傳 304
         
         Returns:
             (response, status_code) 元組
@@ -39,6 +44,10 @@ class APIResponse:
                 # 否則將 data 作為 data 欄位
                 response["data"] = data
         
+        if etag:
+            resp = conditional_json(response, status_code, etag)
+            return resp, resp.status_code
+        
         return jsonify(response), status_code
     
     @staticmethod
@@ -152,7 +161,7 @@ class APIResponse:
         error_details = str(e)
         
         # 記錄完整的 traceback 用於調試
-        traceback.print_exc()
+        logger.exception("Unhandled API error: %s", e)
         
         return APIResponse.server_error(message, message_code, error_details)
 
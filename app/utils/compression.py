@@ -0,0 +1,184 @@
+"""
+回應壓縮
+依 Accept-Encoding 以 brotli（有安裝時）或 gzip 壓縮 JSON / 文字回應；
+小於門檻的回應不壓縮，串流回應與大型回應以分段方式壓縮輸出
+"""
+
+import logging
+import zlib
+from typing import Iterable, Iterator
+
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # brotli 為選用套件
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    "application/json",
+    "application/javascript",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/csv",
+    "text/xml",
+)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class _GzipEncoder:
+    """gzip 格式（zlib wbits=31）"""
+
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def process(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class ResponseCompressor:
+    """
+    回應壓縮擴充（after_request）
+
+    設定:
+        COMPRESS_ENABLED: 是否啟用
+        COMPRESS_MIN_SIZE: 小於此 bytes 數的回應不壓縮
+        COMPRESS_STREAM_THRESHOLD: 大於此 bytes 數的回應以分段方式輸出，0 表示停用
+        COMPRESS_GZIP_LEVEL: gzip 壓縮等級 (1 ~ 9)
+        COMPRESS_BR_QUALITY: brotli 品質 (0 ~ 11)
+        COMPRESS_MIMETYPES: 可壓縮的 Content-Type
+    """
+
+    def __init__(self, app=None):
+        self.min_size = 500
+        self.stream_threshold = 1024 * 1024
+        self.gzip_level = 6
+        self.br_quality = 4
+        self.mimetypes = COMPRESSIBLE_MIMETYPES
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("COMPRESS_ENABLED", True)
+        app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+        app.config.setdefault("COMPRESS_STREAM_THRESHOLD", 1024 * 1024)
+        app.config.setdefault("COMPRESS_GZIP_LEVEL", 6)
+        app.config.setdefault("COMPRESS_BR_QUALITY", 4)
+        app.config.setdefault("COMPRESS_MIMETYPES", COMPRESSIBLE_MIMETYPES)
+
+        self.min_size = int(app.config["COMPRESS_MIN_SIZE"])
+        self.stream_threshold = int(app.config["COMPRESS_STREAM_THRESHOLD"])
+        self.gzip_level = int(app.config["COMPRESS_GZIP_LEVEL"])
+        self.br_quality = int(app.config["COMPRESS_BR_QUALITY"])
+        self.mimetypes = tuple(app.config["COMPRESS_MIMETYPES"])
+
+        if app.config["COMPRESS_ENABLED"]:
+            app.after_request(self._after_request)
+
+        app.extensions["compressor"] = self
+
+    @property
+    def encodings(self) -> tuple:
+        """伺服器支援的編碼，依偏好排序"""
+        return ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def _encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.br_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    def _should_compress(self, response) -> bool:
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if request.method == "HEAD" or "Content-Encoding" in response.headers:
+            return False
+        if response.mimetype not in self.mimetypes:
+            return False
+        if response.direct_passthrough:
+            return False
+        if not response.is_streamed:
+            length = response.content_length
+            if length is None or length < self.min_size:
+                return False
+        return True
+
+    def _after_request(self, response):
+        # 是否壓縮與 Accept-Encoding 有關，快取必須依此區分
+        if response.mimetype in self.mimetypes:
+            response.vary.add("Accept-Encoding")
+
+        if not self._should_compress(response):
+            return response
+
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        encoder = self._encoder(encoding)
+        if response.is_streamed:
+            response.response = _stream(encoder, response.response)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if self.stream_threshold and len(data) >= self.stream_threshold:
+                response.response = _stream(encoder, _chunks(data))
+                response.headers.pop("Content-Length", None)
+            else:
+                response.set_data(encoder.process(data) + encoder.finish())
+
+        response.headers["Content-Encoding"] = encoding
+
+        # 壓縮後的位元組與原始內容不同，強式 ETag 改為弱式
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
+
+
+def _chunks(data: bytes) -> Iterator[bytes]:
+    view = memoryview(data)
+    for start in range(0, len(view), STREAM_CHUNK_SIZE):
+        yield bytes(view[start:start + STREAM_CHUNK_SIZE])
+
+
+def _stream(encoder, chunks: Iterable) -> Iterator[bytes]:
+    """逐段壓縮並立即送出（每段 flush，客戶端可邊收邊解壓）"""
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if not chunk:
+                continue
+            out = encoder.process(chunk) + encoder.flush()
+            if out:
+                yield out
+        yield encoder.finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
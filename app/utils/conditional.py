@@ -0,0 +1,68 @@
+"""
+條件式 GET（ETag / If-None-Match）
+可由資料列的彙總值（筆數、最大 id、最大 updated_at）產生 ETag，
+在組裝回應內容之前就判斷是否能直接回傳 304 Not Modified
+"""
+
+import hashlib
+from typing import Optional
+from flask import jsonify, request
+from app.extensions import db
+
+
+def make_etag(*parts) -> str:
+    """由任意可轉為字串的值產生 ETag（不含引號）"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def rows_etag(query, id_column, updated_column, *extra) -> str:
+    """
+    依查詢結果的彙總值產生 ETag，不載入資料列
+
+    Args:
+        query: 已套用篩選條件的 ORM 查詢（不含排序與分頁）
+        id_column: 主鍵欄位
+        updated_column: 最後更新時間欄位
+        extra: 其他會影響回應內容的值（例如查詢參數）
+    """
+    count, max_id, max_updated = query.with_entities(
+        db.func.count(id_column), db.func.max(id_column), db.func.max(updated_column)
+    ).order_by(None).one()
+    return make_etag(count, max_id, max_updated, *extra)
+
+
+def not_modified(etag: Optional[str]):
+    """
+    若請求的 If-None-Match 與 etag 相符，回傳 304 回應，否則回傳 None
+
+    路由可在產生回應內容前先呼叫，相符時直接回傳
+    """
+    if etag and request.method in ("GET", "HEAD") and request.if_none_match.contains_weak(etag):
+        response = jsonify()
+        response.status_code = 304
+        response.set_etag(etag)
+        response.set_data(b"")
+        return response
+    return None
+
+
+def conditional_json(result, status: int = 200, etag: Optional[str] = None):
+    """
+    以 JSON 回傳結果並附上 ETag
+
+    未提供 etag 時以回應內容的雜湊作為 ETag；只有 200 回應會加上 ETag 並處理 304
+    """
+    response = jsonify(result)
+    response.status_code = status
+    if status != 200 or request.method not in ("GET", "HEAD"):
+        return response
+
+    if etag:
+        response.set_etag(etag)
+    else:
+        response.add_etag()
+    return response.make_conditional(request)
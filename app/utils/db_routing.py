@@ -0,0 +1,115 @@
+"""
+讀寫分離
+標記為 @read_only 的 controller 方法查詢改走唯讀副本（SQLALCHEMY_BINDS["replica"]），
+flush / 寫入一律走主庫；使用者寫入後 REPLICA_STICKY_SECONDS 秒內的讀取也留在主庫，
+避免因副本延遲讀不到自己剛寫入的資料（read-your-writes）
+
+注意：寫入紀錄保存在行程內，多個 worker 行程之間不共享
+"""
+
+import functools
+import logging
+from contextvars import ContextVar
+from typing import Optional
+
+from flask import current_app, has_app_context
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from sqlalchemy import event
+
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND_KEY = "replica"
+
+_use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+_recent_writers = TTLCache(maxsize=10000)
+
+
+def _sticky_seconds() -> float:
+    if has_app_context():
+        return float(current_app.config.get("REPLICA_STICKY_SECONDS", 5))
+    return 5.0
+
+
+def _jwt_identity() -> Optional[str]:
+    try:
+        from flask_jwt_extended import get_jwt_identity
+        return get_jwt_identity()
+    except Exception:
+        # 不在已驗證 JWT 的請求中（CLI、登入 / 註冊等）
+        return None
+
+
+def mark_write(identity: Optional[str]):
+    """記錄使用者剛寫入，之後一段時間內的讀取留在主庫"""
+    if identity:
+        _recent_writers.set(identity, True)
+
+
+def wrote_recently(identity: Optional[str]) -> bool:
+    if not identity:
+        return False
+    return _recent_writers.get(identity, _sticky_seconds()) is not None
+
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """
+    依目前是否在 @read_only 範圍內選擇 engine
+
+    未設定 replica bind、flush 中、或本 session 已寫入過時，都使用主庫
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _use_replica.get() and not self._flushing and not self.info.get("wrote"):
+            replica = self._db.engines.get(REPLICA_BIND_KEY)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, _flush_context):
+    session.info["wrote"] = True
+    # 註冊 / 登入等未帶 JWT 的寫入，以寫入的使用者 email 作為識別
+    writers = session.info.setdefault("writers", set())
+    for obj in list(session.new) + list(session.dirty):
+        email = getattr(obj, "email", None)
+        if isinstance(email, str):
+            writers.add(email)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session):
+    writers = session.info.pop("writers", set())
+    if not session.info.get("wrote"):
+        return
+    writers.add(_jwt_identity())
+    for identity in writers:
+        mark_write(identity)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("writers", None)
+
+
+def read_only(func):
+    """
+    標記只讀取資料的方法，查詢改走唯讀副本
+
+    第一個字串參數（email）或 JWT identity 近期有寫入時仍使用主庫
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        identity = args[0] if args and isinstance(args[0], str) else _jwt_identity()
+        if _use_replica.get() or wrote_recently(identity):
+            return func(*args, **kwargs)
+        token = _use_replica.set(True)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+
+    return wrapper
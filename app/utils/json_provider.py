@@ -0,0 +1,96 @@
+"""
+JSON 序列化
+以 orjson 序列化所有 API 回應（未安裝時退回標準函式庫 json），
+datetime / date 直接轉為 API 使用的字串格式，controller 不需要自行 strftime
+"""
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 依部署環境而定
+    orjson = None
+
+TZ_TAIWAN = timezone(timedelta(hours=8))
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def format_datetime(value: datetime) -> str:
+    """datetime 轉為 API 格式；帶時區者先轉為台灣時間"""
+    if value.tzinfo is not None:
+        value = value.astimezone(TZ_TAIWAN)
+    return value.strftime(DATETIME_FORMAT)
+
+
+def _default(o: Any):
+    """orjson / json 無法直接序列化的型別"""
+    if isinstance(o, datetime):
+        return format_datetime(o)
+    if isinstance(o, date):
+        return o.strftime(DATE_FORMAT)
+    if isinstance(o, time):
+        return o.strftime("%H:%M:%S")
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if isinstance(o, tuple):
+        # namedtuple、SQLAlchemy Row 等 tuple 子類別
+        return list(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON provider（app.json）
+
+    jsonify、request.get_json 與 APIResponse 都經由此處序列化；
+    sort_keys 與 Flask 預設相同（True），compact 為 None 時僅在 debug 模式縮排
+    """
+
+    sort_keys = True
+    compact = None
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._dumps_bytes(obj, indent=kwargs.get("indent")).decode("utf-8")
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = None
+        if self.compact is None and self._app.debug or self.compact is False:
+            indent = 2
+        return self._app.response_class(
+            self._dumps_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype
+        )
+
+    def _dumps_bytes(self, obj: Any, indent=None) -> bytes:
+        if orjson is not None:
+            option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option)
+
+        separators = None if indent else (",", ":")
+        return json.dumps(
+            obj, default=_default, sort_keys=self.sort_keys, indent=indent,
+            separators=separators, ensure_ascii=False,
+        ).encode("utf-8")
@@ -0,0 +1,105 @@
+"""
+非同步日誌設定
+請求執行緒只把 LogRecord 放入佇列，由背景 QueueListener 負責格式化與寫檔，
+避免在請求路徑上同步寫入 stdout / error.log
+"""
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+_listener = None
+_queue_handler = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    不在請求執行緒套用 Formatter 的 QueueHandler
+
+    標準 QueueHandler.prepare() 會先呼叫 format()，這裡只在呼叫端合併 msg % args
+    並保留例外資訊的文字，時間與格式欄位交由 QueueListener 端的 handler 格式化；
+    args 可能是之後會被修改的物件或綁定 session 的 ORM 物件，不能留到其他執行緒才轉成字串
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # exc_info 內的 traceback 物件不能跨執行緒延後處理，先轉為文字
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _build_handlers(app):
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+    handlers = [stream_handler]
+
+    log_file = app.config["LOG_FILE"]
+    if log_file:
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setLevel(logging.ERROR)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    return handlers
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener():
+    """fork 後子行程沒有 listener 執行緒，改用新的佇列重新啟動"""
+    global _listener
+    if _listener is None:
+        return
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def configure_logging(app):
+    """
+    設定佇列式日誌管線與各模組層級
+
+    設定:
+        LOG_LEVEL: root logger 層級（預設 WARNING）
+        LOG_LEVELS: 各模組 logger 層級，例如 {"app.controllers": "DEBUG"}
+        LOG_FILE: 錯誤日誌檔路徑（僅記錄 ERROR 以上），空值表示不寫檔
+    """
+    global _listener, _queue_handler
+
+    app.config.setdefault("LOG_LEVEL", "WARNING")
+    app.config.setdefault("LOG_LEVELS", {"app": "DEBUG" if app.debug else "INFO"})
+    app.config.setdefault("LOG_FILE", "error.log")
+
+    root = logging.getLogger()
+
+    # 重複呼叫 create_app 時只建立一次背景 listener
+    if _listener is None:
+        log_queue = queue.SimpleQueue()
+        _queue_handler = DeferredQueueHandler(log_queue)
+        _listener = QueueListener(log_queue, *_build_handlers(app), respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop_listener)
+        os.register_at_fork(after_in_child=_restart_listener)
+        root.addHandler(_queue_handler)
+
+    root.setLevel(app.config["LOG_LEVEL"])
+    for name, level in app.config["LOG_LEVELS"].items():
+        logging.getLogger(name).setLevel(level)
@@ -0,0 +1,241 @@
+"""
+背景郵件佇列
+請求只負責把 Message 放入佇列即回傳，由背景執行緒批次寄出：
+每一批共用同一個 SMTP 連線，失敗時依指數退避重試
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+import logging
+from uuid import uuid4
+from flask import current_app
+from flask_mail import Message
+
+logger = logging.getLogger(__name__)
+
+
+class _Envelope:
+    """佇列中的待寄郵件與其重試資訊"""
+
+    __slots__ = ("app", "message", "attempts")
+
+    def __init__(self, app, message):
+        self.app = app
+        self.message = message
+        self.attempts = 0
+
+
+class _AppState:
+    """各 app 的寄送後端與重試設定，存於 app.extensions["mail_dispatcher"]"""
+
+    __slots__ = ("dispatcher", "backend", "max_retries", "backoff")
+
+    def __init__(self, dispatcher, backend, max_retries: int, backoff: float):
+        self.dispatcher = dispatcher
+        self.backend = backend
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def metrics(self) -> dict:
+        return self.dispatcher.metrics()
+
+
+class SMTPBackend:
+    """以 Flask-Mail 寄送，同一批郵件共用一個 SMTP 連線"""
+
+    def __init__(self, mail):
+        self.mail = mail
+
+    def send_batch(self, messages):
+        """
+        寄出一批郵件
+
+        Returns:
+            寄送失敗的郵件清單
+        """
+        failed = []
+        with self.mail.connect() as conn:
+            for message in messages:
+                try:
+                    conn.send(message)
+                except Exception as e:
+                    logger.warning("Failed to send mail to %s: %s", message.recipients, e)
+                    failed.append(message)
+        return failed
+
+
+class FileBackend:
+    """將郵件寫入目錄（.eml），供測試或本機開發取代 SMTP 伺服器"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def send_batch(self, messages):
+        os.makedirs(self.directory, exist_ok=True)
+        for message in messages:
+            path = os.path.join(self.directory, f"{time.time():.6f}-{uuid4().hex}.eml")
+            with open(path, "wb") as f:
+                f.write(message.as_bytes())
+        return []
+
+
+class MailDispatcher:
+    """
+    可插拔的背景郵件寄送擴充
+
+    佇列與背景執行緒由所有 app 共用；寄送後端與重試設定則依 app 分開，
+    背景寄送時以放入郵件的 app 查詢 app.extensions["mail_dispatcher"]
+
+    設定:
+        MAIL_BACKEND: "smtp"（預設）或 "file"
+        MAIL_FILE_SINK_DIR: file 後端寫入的目錄
+        MAIL_QUEUE_WORKERS: 背景寄送執行緒數量
+        MAIL_QUEUE_BATCH_SIZE: 每個 SMTP 連線最多寄出的郵件數
+        MAIL_QUEUE_MAX_RETRIES: 單封郵件最多重試次數
+        MAIL_QUEUE_BACKOFF: 重試退避基準秒數（第 n 次重試等待 backoff * 2^(n-1) 秒）
+    """
+
+    def __init__(self, mail=None, app=None):
+        self.mail = mail
+        self.batch_size = 20
+        self._queue = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._stats = {"enqueued": 0, "sent": 0, "retried": 0, "dropped": 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("MAIL_BACKEND", "smtp")
+        app.config.setdefault("MAIL_FILE_SINK_DIR", os.path.join(app.instance_path, "mail"))
+        app.config.setdefault("MAIL_QUEUE_WORKERS", 1)
+        app.config.setdefault("MAIL_QUEUE_BATCH_SIZE", 20)
+        app.config.setdefault("MAIL_QUEUE_MAX_RETRIES", 3)
+        app.config.setdefault("MAIL_QUEUE_BACKOFF", 2.0)
+
+        if app.config["MAIL_BACKEND"] == "file":
+            backend = FileBackend(app.config["MAIL_FILE_SINK_DIR"])
+        else:
+            backend = SMTPBackend(self.mail)
+
+        self.batch_size = int(app.config["MAIL_QUEUE_BATCH_SIZE"])
+
+        if not self._workers:
+            self._start_workers(int(app.config["MAIL_QUEUE_WORKERS"]))
+            atexit.register(self.flush, 5)
+            # 預先載入 app 後 fork 的 worker 行程不會繼承執行緒，需重新啟動
+            os.register_at_fork(after_in_child=self._after_fork)
+
+        app.extensions["mail_dispatcher"] = _AppState(
+            self,
+            backend,
+            max_retries=int(app.config["MAIL_QUEUE_MAX_RETRIES"]),
+            backoff=float(app.config["MAIL_QUEUE_BACKOFF"]),
+        )
+
+    def _start_workers(self, count: int):
+        for i in range(count):
+            worker = threading.Thread(target=self._run, name=f"mail-dispatcher-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _after_fork(self):
+        count = len(self._workers)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._start_workers(count)
+
+    def enqueue(self, subject: str, recipients: list, body: str, **kwargs):
+        """
+        建立郵件並放入佇列，立即回傳
+
+        需在 application context 中呼叫（用於取得預設寄件者與背景寄送時的 app）
+        """
+        try:
+            message = Message(subject=subject, recipients=recipients, body=body, **kwargs)
+            self._queue.put(_Envelope(current_app._get_current_object(), message))
+            with self._lock:
+                self._stats["enqueued"] += 1
+        except Exception as e:
+            logger.error("Failed to enqueue mail to %s: %s", recipients, e)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._dispatch(batch)
+            except Exception:
+                logger.exception("Mail dispatcher error")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _dispatch(self, batch):
+        # 依 app 分組，每組在各自的 app context 中共用一個連線
+        by_app = {}
+        for envelope in batch:
+            by_app.setdefault(envelope.app, []).append(envelope)
+
+        for app, envelopes in by_app.items():
+            state = app.extensions["mail_dispatcher"]
+            with app.app_context():
+                try:
+                    failed = state.backend.send_batch([envelope.message for envelope in envelopes])
+                except Exception as error:
+                    # 連線或登入失敗，整批重試
+                    logger.warning("Mail batch failed (%s messages): %s", len(envelopes), error)
+                    failed = [envelope.message for envelope in envelopes]
+
+            failed_ids = {id(m) for m in failed}
+            with self._lock:
+                self._stats["sent"] += len(envelopes) - len(failed_ids)
+            for envelope in envelopes:
+                if id(envelope.message) in failed_ids:
+                    self._retry(envelope, state)
+
+    def _retry(self, envelope, state: _AppState):
+        envelope.attempts += 1
+        if envelope.attempts > state.max_retries:
+            logger.error("Dropping mail to %s after %s attempts", envelope.message.recipients, envelope.attempts)
+            with self._lock:
+                self._stats["dropped"] += 1
+            return
+
+        delay = state.backoff * (2 ** (envelope.attempts - 1))
+        with self._lock:
+            self._stats["retried"] += 1
+        timer = threading.Timer(delay, self._queue.put, args=(envelope,))
+        timer.daemon = True
+        timer.start()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        等待佇列中的郵件處理完畢（不含等待退避中的重試）
+
+        Returns:
+            是否在時限內處理完畢
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def metrics(self) -> dict:
+        """匯出佇列深度與寄送統計"""
+        with self._lock:
+            return dict(self._stats, pending=self._queue.qsize())
@@ -0,0 +1,237 @@
+"""
+取樣式記憶體量測
+依設定比例抽樣請求（或以計時器定期）記錄 RSS 與 tracemalloc 數值，
+並彙整各 endpoint 的記憶體配置差異；不會在請求路徑上強制執行 gc.collect()
+"""
+
+import os
+import random
+import threading
+import time
+import tracemalloc
+import logging
+from typing import Dict, List, Optional
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+except ImportError:  # psutil 為選用套件
+    psutil = None
+
+
+class RssSampler:
+    """目前行程的常駐記憶體 (RSS)，單位 bytes"""
+
+    name = "rss"
+
+    def __init__(self):
+        self._pid = None
+        self._process = None
+
+    def _current_process(self):
+        # preload_app 時 worker 由 master fork 而來，需依目前 pid 重新取得，否則量到的是 master 的 RSS
+        pid = os.getpid()
+        if self._pid != pid:
+            self._process = psutil.Process(pid)
+            self._pid = pid
+        return self._process
+
+    def sample(self) -> Optional[int]:
+        if psutil is not None:
+            return self._current_process().memory_info().rss
+        # 沒有 psutil 時，Linux 可由 /proc 讀取
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+
+
+class TracemallocSampler:
+    """tracemalloc 追蹤到的 Python 物件配置量，單位 bytes"""
+
+    name = "tracemalloc"
+
+    def __init__(self, frames: int = 1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def sample(self) -> Optional[int]:
+        if not tracemalloc.is_tracing():
+            return None
+        current, _peak = tracemalloc.get_traced_memory()
+        return current
+
+
+class _AppState:
+    """各 app 的抽樣設定與 endpoint 統計，存於 app.extensions["memory_profiler"]"""
+
+    def __init__(self, profiler, sample_rate: float, samplers: List):
+        self.profiler = profiler
+        self.sample_rate = sample_rate
+        self.samplers = samplers
+        self._stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def _take(self) -> Dict[str, Optional[int]]:
+        return _take(self.profiler.samplers + self.samplers)
+
+    def before_request(self):
+        if random.random() < self.sample_rate:
+            g._memory_sample = self._take()
+
+    def after_request(self, response):
+        before = g.pop("_memory_sample", None)
+        if before is None:
+            return response
+
+        after = self._take()
+        endpoint = request.endpoint or "unknown"
+        with self._lock:
+            endpoint_stats = self._stats.setdefault(endpoint, {})
+            for name, start in before.items():
+                end = after.get(name)
+                if start is None or end is None:
+                    continue
+                delta = end - start
+                stat = endpoint_stats.setdefault(
+                    name, {"samples": 0, "total_delta": 0, "max_delta": 0, "last": 0}
+                )
+                stat["samples"] += 1
+                stat["total_delta"] += delta
+                stat["max_delta"] = max(stat["max_delta"], delta)
+                stat["last"] = end
+
+        logger.debug("memory sample %s: %s -> %s", endpoint, before, after)
+        return response
+
+    def export(self) -> dict:
+        """
+        匯出此 app 的 endpoint 統計與行程層級的計時器取樣
+
+        Returns:
+            {"process": {...}, "endpoints": {...}, "top_allocations": [...]}
+        """
+        with self._lock:
+            endpoints = {}
+            for endpoint, stats in self._stats.items():
+                endpoints[endpoint] = {
+                    name: dict(stat, avg_delta=stat["total_delta"] / stat["samples"])
+                    for name, stat in stats.items()
+                }
+        return dict(self.profiler.export_process(), endpoints=endpoints)
+
+
+def _take(samplers) -> Dict[str, Optional[int]]:
+    values = {}
+    for sampler in samplers:
+        try:
+            values[sampler.name] = sampler.sample()
+        except Exception:
+            values[sampler.name] = None
+    return values
+
+
+class MemoryProfiler:
+    """
+    可插拔的記憶體量測擴充
+
+    抽樣比例、tracemalloc 與 endpoint 統計依 app 分開保存於 app.extensions["memory_profiler"]；
+    RSS 與計時器屬於整個行程，計時器與 fork 後重新啟動只註冊一次，
+    依第一個設定 MEMORY_PROFILE_INTERVAL 的 app 啟動
+
+    設定:
+        MEMORY_PROFILE_SAMPLE_RATE: 抽樣請求比例 (0.0 ~ 1.0)，0 表示不抽樣
+        MEMORY_PROFILE_INTERVAL: 計時器取樣間隔秒數，0 表示停用
+        MEMORY_PROFILE_TRACEMALLOC: 是否啟用 tracemalloc
+        MEMORY_PROFILE_TRACEMALLOC_FRAMES: tracemalloc 保留的堆疊層數
+        MEMORY_PROFILE_TOP_N: 計時器比對 tracemalloc 快照時保留的筆數
+    """
+
+    def __init__(self, app=None):
+        self.samplers: List = [RssSampler()]
+        self.interval = 0
+        self.top_n = 10
+        self._process_samples: Dict[str, Optional[int]] = {}
+        self._top_allocations: List[str] = []
+        self._last_snapshot = None
+        self._lock = threading.Lock()
+        self._timer = None
+        self._tracemalloc = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("MEMORY_PROFILE_SAMPLE_RATE", 0.0)
+        app.config.setdefault("MEMORY_PROFILE_INTERVAL", 0)
+        app.config.setdefault("MEMORY_PROFILE_TRACEMALLOC", False)
+        app.config.setdefault("MEMORY_PROFILE_TRACEMALLOC_FRAMES", 1)
+        app.config.setdefault("MEMORY_PROFILE_TOP_N", 10)
+
+        app_samplers = []
+        if app.config["MEMORY_PROFILE_TRACEMALLOC"]:
+            # tracemalloc 為行程層級，只啟動一次；只有啟用的 app 會記錄其數值
+            if self._tracemalloc is None:
+                self._tracemalloc = TracemallocSampler(int(app.config["MEMORY_PROFILE_TRACEMALLOC_FRAMES"]))
+            app_samplers.append(self._tracemalloc)
+
+        state = _AppState(self, float(app.config["MEMORY_PROFILE_SAMPLE_RATE"]), app_samplers)
+        if state.sample_rate > 0:
+            app.before_request(state.before_request)
+            app.after_request(state.after_request)
+
+        interval = float(app.config["MEMORY_PROFILE_INTERVAL"])
+        if interval > 0 and self._timer is None:
+            self.interval = interval
+            self.top_n = int(app.config["MEMORY_PROFILE_TOP_N"])
+            self._start_timer()
+            # 預先載入 app 後 fork 的 worker 行程不會繼承執行緒，需重新啟動
+            os.register_at_fork(after_in_child=self._start_timer)
+
+        app.extensions["memory_profiler"] = state
+
+    def register_sampler(self, sampler):
+        """加入所有 app 共用的自訂取樣器，需提供 name 屬性與回傳 bytes 的 sample() 方法"""
+        self.samplers.append(sampler)
+
+    def _start_timer(self):
+        def run():
+            while True:
+                time.sleep(self.interval)
+                self._tick()
+
+        self._timer = threading.Thread(target=run, name="memory-profiler", daemon=True)
+        self._timer.start()
+
+    def _tick(self):
+        samplers = self.samplers + ([self._tracemalloc] if self._tracemalloc is not None else [])
+        values = _take(samplers)
+        top = []
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            if self._last_snapshot is not None:
+                diff = snapshot.compare_to(self._last_snapshot, "lineno")
+                top = [str(stat) for stat in diff[:self.top_n]]
+            self._last_snapshot = snapshot
+
+        with self._lock:
+            self._process_samples = values
+            if top:
+                self._top_allocations = top
+
+        logger.debug("memory timer sample: %s", values)
+
+    def export_process(self) -> dict:
+        """
+        匯出計時器取樣結果（行程層級）
+
+        Returns:
+            {"process": {...}, "top_allocations": [...]}
+        """
+        with self._lock:
+            return {
+                "process": dict(self._process_samples),
+                "top_allocations": list(self._top_allocations),
+            }
@@ -0,0 +1,87 @@
+"""
+Keyset（游標）分頁工具
+游標為 (時間, id) 的不透明字串，查詢以 (時間, id) 排序並從游標位置繼續，
+不需要 OFFSET，頁數再多也只讀取需要的筆數
+"""
+
+import base64
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    """將 (時間, id) 編碼為游標字串"""
+    raw = f"{ts.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    解析游標字串
+
+    Raises:
+        ValueError: 游標格式錯誤
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        ts, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def parse_limit(value, default: Optional[int] = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> Optional[int]:
+    """
+    解析每頁筆數，限制在 1 ~ maximum 之間
+
+    Raises:
+        ValueError: 不是整數
+    """
+    if value is None or value == "":
+        return default
+    limit = int(value)
+    return max(1, min(limit, maximum))
+
+
+def before(ts_column, id_column, cursor: Tuple[datetime, int]):
+    """(ts, id) 小於游標位置的條件（遞減排序時取下一頁）"""
+    ts, row_id = cursor
+    return or_(ts_column < ts, and_(ts_column == ts, id_column < row_id))
+
+
+def after(ts_column, id_column, cursor: Tuple[datetime, int]):
+    """(ts, id) 大於游標位置的條件（取得較新的資料）"""
+    ts, row_id = cursor
+    return or_(ts_column > ts, and_(ts_column == ts, id_column > row_id))
+
+
+def range_filters(column, start: Optional[str] = None, end: Optional[str] = None) -> list:
+    """
+    建立時間區間條件，直接比較欄位（不包函式），可使用索引
+
+    start / end 接受 YYYY-MM-DD 或 YYYY-MM-DD HH:MM:SS；
+    end 只有日期時包含該日整天
+
+    Raises:
+        ValueError: 格式錯誤
+    """
+    filters = []
+    if start:
+        filters.append(column >= _parse_datetime(start)[0])
+    if end:
+        ts, date_only = _parse_datetime(end)
+        filters.append(column < ts + timedelta(days=1) if date_only else column <= ts)
+    return filters
+
+
+def _parse_datetime(value: str) -> Tuple[datetime, bool]:
+    value = value.strip()
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S"), False
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%d"), True
@@ -0,0 +1,161 @@
+"""
+密碼雜湊服務
+以有上限的執行緒池執行 bcrypt（bcrypt 運算時會釋放 GIL），
+限制同時進行的雜湊數量，避免大量登入時所有 worker 都被 CPU 密集運算佔滿
+"""
+
+import os
+import re
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_COST_RE = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class PasswordHasherBusy(RuntimeError):
+    """等待中的雜湊工作已達上限"""
+
+
+class PasswordHasher:
+    """
+    可插拔的密碼雜湊擴充，包裝 Flask-Bcrypt
+
+    設定:
+        BCRYPT_LOG_ROUNDS: bcrypt 成本（work factor），預設 12
+        PASSWORD_HASH_WORKERS: 執行緒池大小，預設為 CPU 數量
+        PASSWORD_HASH_MAX_QUEUE: 最多允許的等待 + 執行中工作數，超過時拋出 PasswordHasherBusy
+        PASSWORD_HASH_TIMEOUT: 等待單一工作完成的秒數上限
+    """
+
+    def __init__(self, bcrypt=None, app=None):
+        self.bcrypt = bcrypt
+        self.rounds = 12
+        self.max_queue = 64
+        self.timeout = 30.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._stats = {
+            "completed": 0,
+            "rejected": 0,
+            "rehashed": 0,
+            "max_pending": 0,
+            "total_wait": 0.0,
+            "total_run": 0.0,
+        }
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("BCRYPT_LOG_ROUNDS", 12)
+        app.config.setdefault("PASSWORD_HASH_WORKERS", os.cpu_count() or 2)
+        app.config.setdefault("PASSWORD_HASH_MAX_QUEUE", 64)
+        app.config.setdefault("PASSWORD_HASH_TIMEOUT", 30)
+
+        self.rounds = int(app.config["BCRYPT_LOG_ROUNDS"])
+        self.max_queue = int(app.config["PASSWORD_HASH_MAX_QUEUE"])
+        self.timeout = float(app.config["PASSWORD_HASH_TIMEOUT"])
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=int(app.config["PASSWORD_HASH_WORKERS"]),
+                thread_name_prefix="password-hash",
+            )
+            self._slots = threading.BoundedSemaphore(self.max_queue)
+
+        app.extensions["password_hasher"] = self
+
+    def _run(self, func, *args):
+        """將工作送入執行緒池並等待結果"""
+        if self._executor is None:
+            # 未初始化（例如離線腳本）時直接同步執行
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            logger.warning("Password hash queue full (%s pending)", self._pending)
+            raise PasswordHasherBusy("password hashing queue is full")
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+            self._stats["max_pending"] = max(self._stats["max_pending"], self._pending)
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self._pending -= 1
+                self._running += 1
+                self._stats["total_wait"] += started - submitted
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._stats["completed"] += 1
+                    self._stats["total_run"] += time.perf_counter() - started
+                self._slots.release()
+
+        return self._executor.submit(task).result(timeout=self.timeout)
+
+    def hash(self, password: str, rounds: Optional[int] = None) -> str:
+        """產生密碼雜湊（utf-8 字串）"""
+        rounds = rounds or self.rounds
+        return self._run(self.bcrypt.generate_password_hash, password, rounds).decode("utf-8")
+
+    def check(self, pw_hash: str, password: str) -> bool:
+        """驗證密碼是否與雜湊相符"""
+        if not pw_hash or not password:
+            return False
+        return self._run(self.bcrypt.check_password_hash, pw_hash, password)
+
+    @staticmethod
+    def cost_of(pw_hash: str) -> Optional[int]:
+        """解析 bcrypt 雜湊中的成本，格式不符時回傳 None"""
+        match = _COST_RE.match(pw_hash or "")
+        return int(match.group(1)) if match else None
+
+    def needs_rehash(self, pw_hash: str) -> bool:
+        """雜湊成本與目前設定不同時需要重新雜湊"""
+        cost = self.cost_of(pw_hash)
+        return cost is not None and cost != self.rounds
+
+    def rehash_if_needed(self, user, password: str) -> bool:
+        """
+        登入驗證成功後呼叫，若使用者的雜湊成本已過時則以目前成本重新雜湊
+
+        Returns:
+            是否更新了 user.password_hash（呼叫端負責 commit）
+        """
+        if not self.needs_rehash(user.password_hash):
+            return False
+        user.password_hash = self.hash(password)
+        with self._lock:
+            self._stats["rehashed"] += 1
+        return True
+
+    def metrics(self) -> dict:
+        """
+        匯出佇列深度與耗時統計
+
+        Returns:
+            {"pending": ..., "running": ..., "completed": ..., "avg_wait": ..., ...}
+        """
+        with self._lock:
+            completed = self._stats["completed"]
+            return dict(
+                self._stats,
+                pending=self._pending,
+                running=self._running,
+                rounds=self.rounds,
+                avg_wait=self._stats["total_wait"] / completed if completed else 0.0,
+                avg_run=self._stats["total_run"] / completed if completed else 0.0,
+            )
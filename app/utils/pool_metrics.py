@@ -0,0 +1,231 @@
+"""
+SQLAlchemy 連線池統計
+以 pool 事件記錄取得 / 歸還、新建與重建連線，並以 QueuePool 子類別量測等待連線的時間，
+用於依實際資料調整 DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT
+"""
+
+import bisect
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import current_app
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# 等待連線時間的直方圖上界（秒），最後一格為 +Inf
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+class PoolStats:
+    """執行緒安全的連線池計數器"""
+
+    def __init__(self, buckets=WAIT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.connects = 0
+            self.reconnects = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.max_checked_out = 0
+            self.wait_count = 0
+            self.wait_sum = 0.0
+            self.wait_max = 0.0
+            self.wait_buckets = [0] * (len(self.buckets) + 1)
+
+    def observe_wait(self, seconds: float):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_buckets[bisect.bisect_left(self.buckets, seconds)] += 1
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def observe_checked_out(self, checked_out: int):
+        with self._lock:
+            self.checkouts += 1
+            self.max_checked_out = max(self.max_checked_out, checked_out)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, histogram = 0, {}
+            for bound, count in zip(self.buckets + (float("inf"),), self.wait_buckets):
+                cumulative += count
+                histogram["+Inf" if bound == float("inf") else str(bound)] = cumulative
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                # 同一連線紀錄重新連線 = 逾時回收（pool_recycle）或失效後重建
+                "recycles": max(self.reconnects - self.invalidations, 0),
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "max_checked_out": self.max_checked_out,
+                "wait_seconds": {
+                    "count": self.wait_count,
+                    "sum": self.wait_sum,
+                    "max": self.wait_max,
+                    "buckets": histogram,
+                },
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """記錄取得連線等待時間的 QueuePool（stats 由 PoolMetrics 指定）"""
+
+    stats: Optional[PoolStats] = None
+
+    def recreate(self):
+        # engine.dispose() 會建立新的 pool，沿用同一份統計
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        stats = self.stats
+        if stats is None:
+            return super()._do_get()
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            stats.incr("timeouts")
+            raise
+        finally:
+            stats.observe_wait(time.perf_counter() - start)
+
+
+class _AppState:
+    """各 app 的 engine 與統計，存於 app.extensions["pool_metrics"]"""
+
+    def __init__(self):
+        self.stats: Dict[str, PoolStats] = {}
+        self.engines = {}
+
+    def metrics(self) -> dict:
+        """
+        匯出各 engine 的連線池狀態與累計統計
+
+        Returns:
+            {"default": {"size", "checked_out", "overflow", "checkouts", ..., "wait_seconds": {...}}}
+        """
+        result = {}
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            current = {"pool_class": type(pool).__name__, "status": pool.status()}
+            if isinstance(pool, QueuePool):
+                current.update(
+                    size=pool.size(),
+                    checked_in=pool.checkedin(),
+                    checked_out=pool.checkedout(),
+                    overflow=max(pool.overflow(), 0),
+                    max_overflow=pool._max_overflow,
+                    timeout=pool.timeout(),
+                )
+            current.update(self.stats[name].snapshot())
+            result[name] = current
+        return result
+
+    def render(self) -> str:
+        """Prometheus 文字格式（以 engine 標籤區分主庫與副本）"""
+        from app.utils.request_metrics import render_metrics, _labels
+
+        lines = []
+        for name, current in self.metrics().items():
+            wait = current.pop("wait_seconds")
+            lines += render_metrics("db_pool", current, {"engine": name})
+            for le, count in wait["buckets"].items():
+                lines.append(f"db_pool_wait_seconds_bucket{_labels(engine=name, le=le)} {count}")
+            lines.append(f"db_pool_wait_seconds_sum{_labels(engine=name)} {wait['sum']}")
+            lines.append(f"db_pool_wait_seconds_count{_labels(engine=name)} {wait['count']}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+class PoolMetrics:
+    """
+    連線池統計擴充，需在 db.init_app 之後初始化
+
+    各 app 的 engine 與統計分開保存於 app.extensions["pool_metrics"]，
+    同一行程建立多個 app（測試、benchmark、CLI）時不會互相覆寫
+
+    設定:
+        DB_POOL_METRICS: 是否啟用
+    """
+
+    def __init__(self, db=None, app=None):
+        self.db = db
+        if app is not None:
+            self.init_app(app)
+
+    @staticmethod
+    def engine_options(app, options: dict) -> dict:
+        """
+        在建立 engine 之前呼叫，啟用時改用 TimedQueuePool
+
+        只替換原本就會使用 QueuePool 的資料庫（SQLite 記憶體資料庫等不適用）
+        """
+        if not app.config.get("DB_POOL_METRICS", True):
+            return options
+        uri = app.config.get("SQLALCHEMY_DATABASE_URI") or ""
+        if uri.startswith("sqlite") and (":memory:" in uri or uri.rstrip("/") in ("sqlite:", "sqlite")):
+            return options
+        return dict(options, poolclass=TimedQueuePool)
+
+    def init_app(self, app):
+        app.config.setdefault("DB_POOL_METRICS", True)
+        state = _AppState()
+        if app.config["DB_POOL_METRICS"]:
+            with app.app_context():
+                for name, engine in self.db.engines.items():
+                    self._instrument(state, name or "default", engine)
+        app.extensions["pool_metrics"] = state
+
+    def _instrument(self, state: _AppState, name: str, engine):
+        stats = state.stats.setdefault(name, PoolStats())
+        pool = engine.pool
+        if isinstance(pool, TimedQueuePool):
+            pool.stats = stats
+        state.engines[name] = engine
+
+        @event.listens_for(engine, "connect")
+        def on_connect(_dbapi_conn, record):
+            if record.record_info.get("pool_metrics_connected"):
+                stats.incr("reconnects")
+            else:
+                record.record_info["pool_metrics_connected"] = True
+            stats.incr("connects")
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(_dbapi_conn, _record, _proxy):
+            stats.observe_checked_out(engine.pool.checkedout())
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(_dbapi_conn, _record):
+            stats.incr("checkins")
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(_dbapi_conn, _record, _exception):
+            stats.incr("invalidations")
+
+        @event.listens_for(engine, "soft_invalidate")
+        def on_soft_invalidate(_dbapi_conn, _record, _exception):
+            stats.incr("invalidations")
+
+    def metrics(self) -> dict:
+        """目前 app 的連線池統計（見 _AppState.metrics）"""
+        return current_app.extensions["pool_metrics"].metrics()
+
+    def render(self) -> str:
+        return current_app.extensions["pool_metrics"].render()
@@ -0,0 +1,171 @@
+"""
+SQL 查詢檢查（開發 / 測試用）
+以 before_cursor_execute 記錄每個請求執行的 SQL，偵測相同語句以不同參數重複執行（N+1），
+並可設定查詢數上限，超過時記錄警告或直接拋出例外讓測試失敗
+"""
+
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from flask import g, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# 目前生效的記錄器（請求與 count_queries() 可巢狀）
+_recorders: ContextVar[tuple] = ContextVar("query_recorders", default=())
+
+
+def _before_cursor_execute(_conn, _cursor, statement, parameters, _context, _executemany):
+    for recorder in _recorders.get():
+        recorder.record(statement, parameters)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """查詢數超過上限（QUERY_BUDGET_STRICT 或 count_queries(max_queries=...)）"""
+
+
+class QueryRecorder:
+    """收集一段範圍內執行的 SQL 語句"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self._params: Dict[str, set] = defaultdict(set)
+
+    def record(self, statement: str, parameters):
+        self.statements.append(statement)
+        try:
+            self._params[statement].add(repr(parameters))
+        except Exception:
+            pass
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = 3) -> Dict[str, int]:
+        """
+        相同語句以不同參數執行達 threshold 次以上者（N+1 的典型特徵）
+
+        Returns:
+            {語句: 執行次數}
+        """
+        counts: Dict[str, int] = defaultdict(int)
+        for statement in self.statements:
+            counts[statement] += 1
+        return {
+            statement: count
+            for statement, count in counts.items()
+            if count >= threshold and len(self._params[statement]) > 1
+        }
+
+
+@contextmanager
+def count_queries(max_queries: Optional[int] = None):
+    """
+    計算範圍內的查詢數，供測試使用
+
+    僅在 QUERY_INSPECTOR_ENABLED 為 True 的 app 中會記錄（engine 需已由 QueryInspector 掛上監聽），
+    未啟用時 recorder 不會記錄任何語句，count 固定為 0、max_queries 也不會生效
+
+        with count_queries(max_queries=3) as recorder:
+            client.get("/api/user", headers=...)
+        assert not recorder.repeated()
+
+    Raises:
+        QueryBudgetExceeded: 查詢數超過 max_queries
+    """
+    recorder = QueryRecorder()
+    token = _recorders.set(_recorders.get() + (recorder,))
+    try:
+        yield recorder
+    finally:
+        _recorders.reset(token)
+    if max_queries is not None and recorder.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{recorder.count} queries executed, budget is {max_queries}:\n" + "\n".join(recorder.statements)
+        )
+
+
+class QueryInspector:
+    """
+    每個請求的查詢數與 N+1 偵測擴充，需在 db.init_app 之後初始化
+
+    設定:
+        QUERY_INSPECTOR_ENABLED: 是否啟用（development / testing 預設開啟）
+        QUERY_N_PLUS_ONE_THRESHOLD: 相同語句不同參數重複幾次視為 N+1
+        QUERY_BUDGET: 每個請求的查詢數上限，None 表示不限制
+        QUERY_BUDGETS: 各 endpoint 的上限，例如 {"auth.get_user": 4}，優先於 QUERY_BUDGET
+        QUERY_BUDGET_STRICT: 超過上限或偵測到 N+1 時拋出 QueryBudgetExceeded（測試用）
+    """
+
+    def __init__(self, db=None, app=None):
+        self.db = db
+        self.threshold = 3
+        self.budget: Optional[int] = None
+        self.budgets: Dict[str, int] = {}
+        self.strict = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("QUERY_INSPECTOR_ENABLED", False)
+        app.config.setdefault("QUERY_N_PLUS_ONE_THRESHOLD", 3)
+        app.config.setdefault("QUERY_BUDGET", None)
+        app.config.setdefault("QUERY_BUDGETS", {})
+        app.config.setdefault("QUERY_BUDGET_STRICT", False)
+
+        self.threshold = int(app.config["QUERY_N_PLUS_ONE_THRESHOLD"])
+        self.budget = app.config["QUERY_BUDGET"]
+        self.budgets = dict(app.config["QUERY_BUDGETS"])
+        self.strict = bool(app.config["QUERY_BUDGET_STRICT"])
+
+        if app.config["QUERY_INSPECTOR_ENABLED"]:
+            with app.app_context():
+                for engine in self.db.engines.values():
+                    self._instrument(engine)
+            app.before_request(self._before_request)
+            app.after_request(self._after_request)
+            app.teardown_request(self._teardown_request)
+
+        app.extensions["query_inspector"] = self
+
+    def _instrument(self, engine):
+        # 以 engine 本身判斷是否已掛上監聽；id() 在 engine 被回收後可能被新 engine 重用
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+    def _before_request(self):
+        recorder = QueryRecorder()
+        g._query_recorder = (recorder, _recorders.set(_recorders.get() + (recorder,)))
+
+    def _after_request(self, response):
+        state = g.pop("_query_recorder", None)
+        if state is None:
+            return response
+        recorder, token = state
+        _recorders.reset(token)
+
+        endpoint = request.endpoint or "unknown"
+        response.headers["X-Query-Count"] = str(recorder.count)
+
+        problems = []
+        for statement, count in recorder.repeated(self.threshold).items():
+            problems.append(f"possible N+1: {count}x {statement[:200]}")
+        budget = self.budgets.get(endpoint, self.budget)
+        if budget is not None and recorder.count > budget:
+            problems.append(f"{recorder.count} queries, budget is {budget}")
+
+        for problem in problems:
+            logger.warning("%s %s: %s", request.method, endpoint, problem)
+        if problems and self.strict:
+            raise QueryBudgetExceeded(f"{request.method} {endpoint}: " + "; ".join(problems))
+        return response
+
+    def _teardown_request(self, _exc):
+        state = g.pop("_query_recorder", None)
+        if state is not None:
+            _recorders.reset(state[1])
@@ -0,0 +1,207 @@
+"""
+請求統計
+以 before / after_request 記錄各路由的延遲直方圖、狀態碼、每個請求的 DB 查詢數與 DB 時間，
+並輸出為 Prometheus 文字格式（/internal/metrics）
+
+統計值依 OS 執行緒分片累加，請求路徑上不需要取得鎖；匯出時才合併各分片
+"""
+
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from flask import g, request
+from sqlalchemy import event
+
+# 請求延遲直方圖上界（秒），最後一格為 +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 目前請求的 DB 統計：[查詢數, DB 時間]；不在請求中時為 None
+_db_counter: ContextVar[Optional[list]] = ContextVar("request_db_counter", default=None)
+
+
+class _RouteStats:
+    __slots__ = ("requests", "statuses", "buckets", "duration_sum", "db_queries", "db_time")
+
+    def __init__(self, bucket_count: int):
+        self.requests = 0
+        self.statuses: Dict[int, int] = {}
+        self.buckets = [0] * bucket_count
+        self.duration_sum = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+
+
+class RequestMetrics:
+    """
+    請求統計擴充，需在 db.init_app 之後初始化
+
+    設定:
+        REQUEST_METRICS_ENABLED: 是否啟用
+    """
+
+    def __init__(self, db=None, app=None, buckets=LATENCY_BUCKETS):
+        self.db = db
+        self.buckets = tuple(buckets)
+        # OS 執行緒 id -> {(method, route): _RouteStats}
+        # 以 native id 分片：gevent 下同一 OS 執行緒的 greenlet 不會在累加途中切換
+        self._shards: Dict[int, Dict[Tuple[str, str], _RouteStats]] = {}
+        self._shards_lock = threading.Lock()
+        self.started_at = time.time()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("REQUEST_METRICS_ENABLED", True)
+        if app.config["REQUEST_METRICS_ENABLED"]:
+            app.before_request(self._before_request)
+            app.after_request(self._after_request)
+            app.teardown_request(self._teardown_request)
+            with app.app_context():
+                for engine in self.db.engines.values():
+                    self._instrument(engine)
+        app.extensions["request_metrics"] = self
+
+    def _instrument(self, engine):
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+            if _db_counter.get() is not None:
+                conn.info.setdefault("request_metrics_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+            counter = _db_counter.get()
+            starts = conn.info.get("request_metrics_start")
+            if counter is None or not starts:
+                return
+            counter[0] += 1
+            counter[1] += time.perf_counter() - starts.pop()
+
+    def _shard(self) -> Dict[Tuple[str, str], _RouteStats]:
+        ident = threading.get_native_id()
+        shard = self._shards.get(ident)
+        if shard is None:
+            with self._shards_lock:
+                shard = self._shards.setdefault(ident, {})
+        return shard
+
+    def _before_request(self):
+        g._request_metrics = (time.perf_counter(), _db_counter.set([0, 0.0]))
+
+    def _after_request(self, response):
+        state = g.pop("_request_metrics", None)
+        if state is None:
+            return response
+        started, token = state
+        duration = time.perf_counter() - started
+        queries, db_time = _db_counter.get() or (0, 0.0)
+        _db_counter.reset(token)
+
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        key = (request.method, rule)
+        shard = self._shard()
+        stats = shard.get(key)
+        if stats is None:
+            stats = shard[key] = _RouteStats(len(self.buckets) + 1)
+        stats.requests += 1
+        stats.statuses[response.status_code] = stats.statuses.get(response.status_code, 0) + 1
+        stats.buckets[bisect.bisect_left(self.buckets, duration)] += 1
+        stats.duration_sum += duration
+        stats.db_queries += queries
+        stats.db_time += db_time
+        return response
+
+    def _teardown_request(self, _exc):
+        # after_request 未執行時（例如回應產生前中斷）清除請求狀態
+        state = g.pop("_request_metrics", None)
+        if state is not None:
+            _db_counter.reset(state[1])
+
+    def snapshot(self) -> Dict[Tuple[str, str], dict]:
+        """合併各分片，回傳 {(method, route): {...}}"""
+        with self._shards_lock:
+            shards = list(self._shards.values())
+        merged: Dict[Tuple[str, str], dict] = {}
+        for shard in shards:
+            for key, stats in list(shard.items()):
+                item = merged.setdefault(key, {
+                    "requests": 0, "statuses": {}, "buckets": [0] * (len(self.buckets) + 1),
+                    "duration_sum": 0.0, "db_queries": 0, "db_time": 0.0,
+                })
+                item["requests"] += stats.requests
+                for status, count in list(stats.statuses.items()):
+                    item["statuses"][status] = item["statuses"].get(status, 0) + count
+                for i, count in enumerate(stats.buckets):
+                    item["buckets"][i] += count
+                item["duration_sum"] += stats.duration_sum
+                item["db_queries"] += stats.db_queries
+                item["db_time"] += stats.db_time
+        return merged
+
+    def render(self) -> str:
+        """Prometheus 文字格式"""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        lines += ["# HELP http_requests_total Requests by route and status.",
+                  "# TYPE http_requests_total counter"]
+        for (method, route), item in sorted(snapshot.items()):
+            for status, count in sorted(item["statuses"].items()):
+                lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+        lines += ["# HELP http_request_duration_seconds Request latency by route.",
+                  "# TYPE http_request_duration_seconds histogram"]
+        for (method, route), item in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), item["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f"http_request_duration_seconds_bucket{_labels(method=method, route=route, le=le)} {cumulative}"
+                )
+            labels = _labels(method=method, route=route)
+            lines.append(f"http_request_duration_seconds_sum{labels} {item['duration_sum']}")
+            lines.append(f"http_request_duration_seconds_count{labels} {item['requests']}")
+
+        lines += ["# HELP http_request_db_queries_total DB queries issued while serving the route.",
+                  "# TYPE http_request_db_queries_total counter"]
+        for (method, route), item in sorted(snapshot.items()):
+            lines.append(f"http_request_db_queries_total{_labels(method=method, route=route)} {item['db_queries']}")
+
+        lines += ["# HELP http_request_db_seconds_total Time spent in DB queries while serving the route.",
+                  "# TYPE http_request_db_seconds_total counter"]
+        for (method, route), item in sorted(snapshot.items()):
+            lines.append(f"http_request_db_seconds_total{_labels(method=method, route=route)} {item['db_time']}")
+
+        lines += ["# HELP process_start_time_seconds Start time of the metrics registry.",
+                  "# TYPE process_start_time_seconds gauge",
+                  f"process_start_time_seconds {self.started_at}"]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels) -> str:
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render_metrics(prefix: str, metrics: dict, labels: Optional[dict] = None) -> List[str]:
+    """
+    將 extension 的 metrics() 字典轉為 gauge 行（巢狀字典以底線串接名稱，非數值略過）
+
+    例如 render_metrics("mail_dispatcher", {"sent": 3}) -> ["mail_dispatcher_sent 3"]
+    """
+    lines = []
+    label_text = _labels(**labels) if labels else ""
+    for name, value in metrics.items():
+        if isinstance(value, dict):
+            lines += render_metrics(f"{prefix}_{name}", value, labels)
+        elif isinstance(value, bool):
+            lines.append(f"{prefix}_{name}{label_text} {int(value)}")
+        elif isinstance(value, (int, float)):
+            lines.append(f"{prefix}_{name}{label_text} {value}")
+    return lines
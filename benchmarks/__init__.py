@@ -0,0 +1 @@
+"""效能測試（見 benchmarks/run.py）"""
@@ -0,0 +1,275 @@
+"""
+API 效能測試
+
+以 Flask test client 對 auth_routes.py 的每個路由送出請求，輸出各路由的吞吐量與
+p50 / p95 / p99 延遲（JSON），可與前一次結果比較以追蹤效能退步
+
+    python -m benchmarks.run                               # 暫存 SQLite，預設資料量
+    python -m benchmarks.run --users 20 --diary 500 -n 100
+    python -m benchmarks.run --db sqlite:////tmp/bench.db --reuse
+    python -m benchmarks.run --output after.json --compare before.json
+
+使用正式環境設定（production profile）；郵件寫入暫存目錄，不會寄出
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.seed import PASSWORD, SeedConfig, user_email
+
+
+@dataclass
+class Scenario:
+    method: str
+    path: str
+    # (iteration) -> test client 參數（json / query string 等）
+    build: Callable[[int], dict] = field(default=lambda i: {})
+    # 使用哪個使用者的 token；None 表示不帶 Authorization
+    as_user: Optional[str] = "main"
+    # bcrypt 等高成本路由只跑少量請求
+    slow: bool = False
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def scenarios(run_id: str, users: int) -> List[Scenario]:
+    """auth_routes.py 的每個路由各一個情境（同一路由可有多種參數）"""
+    from app.services import invite_codes
+
+    other = user_email(1)
+    return [
+        Scenario("POST", "/api/register", lambda i: {"json": {"email": f"new-{run_id}-{i}@bench.local", "password": PASSWORD}}, None, slow=True),
+        Scenario("GET", "/api/register/check", lambda i: {"query_string": {"email": other}}, None),
+        Scenario("POST", "/api/auth", lambda i: {"json": {"email": user_email(0), "password": PASSWORD}}, None, slow=True),
+        Scenario("POST", "/api/verification/send", lambda i: {"json": {"email": other}}, None),
+        Scenario("POST", "/api/verification/check", lambda i: {"json": {"email": other, "code": "000000"}}, None),
+        Scenario("POST", "/api/password/forgot", lambda i: {"json": {"email": user_email(users - 1)}}, None, slow=True),
+        Scenario("POST", "/api/password/reset", lambda i: {"json": {"password": PASSWORD}}, "reset", slow=True),
+        Scenario("GET", "/api/user"),
+        Scenario("PATCH", "/api/user", lambda i: {"json": {"name": f"Bench User {i}"}}),
+        Scenario("PATCH", "/api/user/setting", lambda i: {"json": {"after_recording": i % 2}}),
+        Scenario("POST", "/api/user/weight", lambda i: {"json": {"weight": 60 + i % 20}}),
+        Scenario("GET", "/api/user/medical"),
+        Scenario("PATCH", "/api/user/medical", lambda i: {"json": {"diabetes_type": 2, "oad": 1}}),
+        Scenario("POST", "/api/user/a1c", lambda i: {"json": {"a1c": 6.5}}),
+        Scenario("GET", "/api/user/a1c"),
+        Scenario("POST", "/api/user/care", lambda i: {"json": {"care_data": "bench"}}),
+        Scenario("GET", "/api/user/care"),
+        Scenario("POST", "/api/share", lambda i: {"json": {"type": 1, "id": 1 + i, "relation_type": 1}}),
+        Scenario("GET", "/api/share/1"),
+        Scenario("GET", "/api/share/1?limit=20"),
+        Scenario("PATCH", "/api/share/1/read"),
+        Scenario("GET", "/api/news"),
+        Scenario("GET", "/api/news?limit=20"),
+        Scenario("GET", "/api/friend/list"),
+        Scenario("POST", "/api/friend", lambda i: {"json": {"name": f"friend {i}", "relation_type": 1}}),
+        Scenario("GET", "/api/user/diary"),
+        Scenario("GET", "/api/user/diary?limit=50"),
+        Scenario("PUT", "/api/user/badge", lambda i: {"json": {"badge": i % 5}}),
+        Scenario("POST", "/api/user/records", lambda i: {"json": {"diet": 0}}),
+        Scenario("POST", "/api/user/records/batch", lambda i: {"json": {"records": [
+            {"type": "blood_sugar", "sugar": 100 + n} for n in range(20)
+        ]}}),
+        Scenario("DELETE", "/api/user/records", lambda i: {"json": {"deleteObject": [10_000_000 + i]}}),
+        Scenario("POST", "/api/user/blood/sugar", lambda i: {"json": {"sugar": 110, "timeperiod": 1}}),
+        Scenario("GET", "/api/friend/code"),
+        Scenario("GET", "/api/friend/results"),
+        Scenario("GET", "/api/friend/requests"),
+        Scenario("GET", "/api/friend/counts"),
+        Scenario("POST", "/api/user/diet", lambda i: {"json": {"description": "bench", "meal": 1, "tag": ["rice"], "lat": 25.0, "lng": 121.5}}),
+        Scenario("POST", "/api/user/blood/pressure", lambda i: {"json": {"systolic": 120, "diastolic": 80, "pulse": 70}}),
+        Scenario("POST", "/api/friend/send", lambda i: {"json": {"invite_code": invite_codes.code_for(2), "type": 1}}),
+        Scenario("GET", "/api/friend/999999/accept"),
+        Scenario("GET", "/api/friend/999999/refuse"),
+        Scenario("PATCH", "/api/friend/result/999999/read"),
+        Scenario("DELETE", "/api/friend/remove", lambda i: {"json": {"ids[]": [999999]}}),
+        Scenario("GET", "/api/debug/friends"),
+        Scenario("POST", "/api/friends/default"),
+    ]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近序位法（nearest-rank）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def measure(client, scenario: Scenario, tokens: Dict[str, str], iterations: int, warmup: int) -> dict:
+    headers = {"Accept-Encoding": "gzip"}
+    if scenario.as_user:
+        headers["Authorization"] = f"Bearer {tokens[scenario.as_user]}"
+    call = getattr(client, scenario.method.lower())
+
+    for i in range(warmup):
+        call(scenario.path, headers=headers, **scenario.build(-1 - i))
+
+    latencies, statuses = [], {}
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        response = call(scenario.path, headers=headers, **scenario.build(i))
+        response.get_data()
+        latencies.append(time.perf_counter() - t0)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": iterations,
+        "throughput_rps": round(iterations / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "mean_ms": ms(statistics.fmean(latencies)) if latencies else 0.0,
+        "max_ms": ms(latencies[-1]) if latencies else 0.0,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "errors": sum(v for k, v in statuses.items() if k >= 500),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def compare(current: dict, baseline: dict) -> List[str]:
+    """與前一次結果比較 p95 與吞吐量，回傳文字列"""
+    lines = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before.get("p95_ms"):
+            continue
+        delta = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        lines.append(
+            f"{name:45s} p95 {before['p95_ms']:>9.2f} -> {result['p95_ms']:>9.2f} ms ({delta:+6.1f}%)  "
+            f"rps {before['throughput_rps']:>8.1f} -> {result['throughput_rps']:>8.1f}"
+        )
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every route in auth_routes.py")
+    parser.add_argument("--db", help="SQLAlchemy URI（預設為暫存 SQLite 檔）")
+    parser.add_argument("--reuse", action="store_true", help="不重新建立資料（--db 已有資料時）")
+    parser.add_argument("--users", type=int, default=SeedConfig.users)
+    parser.add_argument("--diary", type=int, default=SeedConfig.diary_per_user, help="每位使用者的日記筆數")
+    parser.add_argument("--friends", type=int, default=SeedConfig.friends_per_user)
+    parser.add_argument("--shares", type=int, default=SeedConfig.shares_per_user)
+    parser.add_argument("--news", type=int, default=SeedConfig.news)
+    parser.add_argument("--seed", type=int, default=SeedConfig.seed)
+    parser.add_argument("--share-feed-mode", choices=("pull", "fanout"), help="SHARE_FEED_MODE（預設依環境變數）")
+    parser.add_argument("-n", "--iterations", type=int, default=200, help="每個路由的請求數")
+    parser.add_argument("--slow-iterations", type=int, default=10, help="bcrypt 等高成本路由的請求數")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", help="只執行名稱包含此字串的路由，例如 'GET /api/user'")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="前一次的結果 JSON")
+    args = parser.parse_args(argv)
+
+    if args.users < 3:
+        parser.error("--users must be at least 3")
+
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    uri = args.db or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["SQLALCHEMY_DATABASE_URI"] = uri
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-not-for-production")
+    os.environ["MAIL_BACKEND"] = "file"
+    os.environ["MAIL_FILE_SINK_DIR"] = os.path.join(workdir, "mail")
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("APP_LOG_LEVEL", "ERROR")
+    os.environ.setdefault("LOG_FILE", "")
+    if args.share_feed_mode:
+        os.environ["SHARE_FEED_MODE"] = args.share_feed_mode
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.extensions import db
+    from app.models.user import User
+    from app.services.user_cache import user_claims
+    from benchmarks.seed import seed
+
+    app = create_app("production")
+    config = SeedConfig(
+        users=args.users, diary_per_user=args.diary, friends_per_user=args.friends,
+        shares_per_user=args.shares, news=args.news, seed=args.seed,
+    )
+
+    with app.app_context():
+        if args.reuse:
+            volumes = {"reused": True}
+        else:
+            t0 = time.perf_counter()
+            volumes = seed(config)
+            print(f"seeded in {time.perf_counter() - t0:.1f}s: {volumes['rows']}", file=sys.stderr)
+
+        def token_for(email):
+            user = db.session.execute(db.select(User).filter_by(email=email)).scalar_one()
+            return create_access_token(identity=email, additional_claims=user_claims(user))
+
+        tokens = {"main": token_for(user_email(0)), "reset": token_for(user_email(2))}
+
+    run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    client = app.test_client()
+    results = {}
+    for scenario in scenarios(run_id, args.users):
+        if args.only and args.only not in scenario.name:
+            continue
+        iterations = args.slow_iterations if scenario.slow else args.iterations
+        result = measure(client, scenario, tokens, iterations, 0 if scenario.slow else args.warmup)
+        results[scenario.name] = result
+        print(
+            f"{scenario.name:45s} {result['throughput_rps']:>9.1f} rps  "
+            f"p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  "
+            f"{result['statuses']}",
+            file=sys.stderr,
+        )
+
+    from importlib import metadata
+    import sqlalchemy
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "flask": metadata.version("flask"),
+            "sqlalchemy": sqlalchemy.__version__,
+            "database": uri.split("://", 1)[0],
+            "share_feed_mode": app.config["SHARE_FEED_MODE"],
+            "iterations": args.iterations,
+            "slow_iterations": args.slow_iterations,
+            "seed": volumes,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            for line in compare(report, json.load(f)):
+                print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
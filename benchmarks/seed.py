@@ -0,0 +1,196 @@
+"""
+效能測試資料
+以批次 INSERT 建立可重現的資料量：使用者、每人數千筆日記、好友關係（FriendResult）、
+分享記錄與最新消息；相同參數與 seed 產生相同資料
+"""
+
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.extensions import db, password_hasher
+from app.models.a1c import A1cRecord
+from app.models.diary import Diary
+from app.models.friend import Friend
+from app.models.friendresult import FriendResult
+from app.models.friend_unread_counter import FriendUnreadCounter
+from app.models.friendship import Friendship
+from app.models.news import News
+from app.models.share import ShareRecord
+from app.models.user import User
+from app.services import invite_codes, share_inbox
+
+PASSWORD = "benchpass"
+BATCH_SIZE = 5000
+EPOCH = datetime(2025, 1, 1, 8, 0, 0)
+
+
+@dataclass
+class SeedConfig:
+    users: int = 50
+    diary_per_user: int = 2000
+    friends_per_user: int = 10
+    shares_per_user: int = 200
+    a1c_per_user: int = 20
+    news: int = 500
+    seed: int = 42
+
+
+def user_email(index: int) -> str:
+    return f"user{index}@bench.local"
+
+
+def _bulk_insert(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+def _diary_row(rng: random.Random, user_id: int, recorded_at: datetime) -> dict:
+    record_type = rng.choice(("blood_sugar", "blood_pressure", "weight", "diet"))
+    row = {
+        "user_id": user_id, "type": record_type,
+        "systolic": None, "diastolic": None, "pulse": None,
+        "weight": 0.0, "body_fat": 0.0, "bmi": 0.0, "sugar": 0.0,
+        "exercise": 0, "drug": 0, "timeperiod": rng.randint(0, 7), "meal": 0,
+        "description": "", "reply": "", "tag": None, "image": None, "location": None,
+        "recorded_at": recorded_at, "created_at": recorded_at, "updated_at": recorded_at,
+    }
+    if record_type == "blood_sugar":
+        row["sugar"] = round(rng.uniform(70, 250), 1)
+    elif record_type == "blood_pressure":
+        row.update(systolic=rng.randint(100, 160), diastolic=rng.randint(60, 100), pulse=rng.randint(55, 110))
+    elif record_type == "weight":
+        weight = round(rng.uniform(45, 110), 1)
+        row.update(weight=weight, body_fat=round(rng.uniform(10, 40), 1), bmi=round(weight / 1.7 ** 2, 2))
+    else:
+        row.update(
+            meal=rng.randint(0, 3), description="bench meal",
+            tag=[{"name": ["rice", "vegetable"], "message": ""}], image=[],
+            location={"lat": "25.03", "lng": "121.56"},
+        )
+    return row
+
+
+def seed(config: SeedConfig) -> dict:
+    """
+    建立全部資料表並寫入測試資料（需在 app context 內呼叫）
+
+    Returns:
+        實際寫入的筆數
+    """
+    rng = random.Random(config.seed)
+    db.create_all()
+
+    # 所有使用者共用同一組密碼雜湊，只計算一次
+    password_hash = password_hasher.hash(PASSWORD)
+    users = [
+        {
+            "id": i + 1, "email": user_email(i), "account": f"bench{i}", "name": f"Bench User {i}",
+            "password_hash": password_hash, "group": str(i % 3 + 1), "height": 170.0, "weight": 65.0,
+            "invite_code": invite_codes.code_for(i + 1), "is_verified": True,
+            "must_change_password": 0, "created_at": EPOCH,
+        }
+        for i in range(config.users)
+    ]
+    _bulk_insert(User, users)
+
+    # 與註冊流程相同，每位使用者有三個預設群組（分享前會檢查）
+    groups = [
+        {"user_id": user["id"], "name": name, "relation_type": relation_type, "created_at": EPOCH, "updated_at": EPOCH}
+        for user in users
+        for relation_type, name in enumerate(("醫師團", "親友團", "控糖團"))
+    ]
+    _bulk_insert(Friend, groups)
+    _bulk_insert(FriendUnreadCounter, [
+        {"user_id": user["id"], "relation_type": relation_type,
+         "pending_requests": 0, "unread_results": 0, "unread_shares": 0}
+        for user in users
+        for relation_type in range(3)
+    ])
+
+    diary_rows = []
+    for user in users:
+        for n in range(config.diary_per_user):
+            diary_rows.append(_diary_row(rng, user["id"], EPOCH + timedelta(hours=n * 4, minutes=rng.randint(0, 59))))
+    _bulk_insert(Diary, diary_rows)
+
+    # 好友圖：每人與之後的 friends_per_user 位使用者為已接受的好友，關係類型輪替
+    friend_rows, friendships = [], set()
+    for i in range(config.users):
+        for k in range(1, config.friends_per_user + 1):
+            j = (i + k) % config.users
+            pair = (min(i, j), max(i, j))
+            if i == j or pair in friendships:
+                continue
+            friendships.add(pair)
+            created = EPOCH + timedelta(minutes=len(friend_rows))
+            friend_rows.append({
+                "user_id": users[i]["id"], "relation_id": users[j]["id"], "type": k % 3,
+                "status": 1, "read": 1, "created_at": created, "updated_at": created,
+            })
+    # 每人另有幾筆待處理邀請（好友邀請 / 結果清單）
+    for i in range(config.users):
+        j = (i + config.friends_per_user + 1) % config.users
+        if i != j:
+            friend_rows.append({
+                "user_id": users[j]["id"], "relation_id": users[i]["id"], "type": 1,
+                "status": 0, "read": 0, "created_at": EPOCH, "updated_at": EPOCH,
+            })
+    _bulk_insert(FriendResult, friend_rows)
+    friendship_rows = [
+        {
+            "low_id": min(row["user_id"], row["relation_id"]), "high_id": max(row["user_id"], row["relation_id"]),
+            "type": row["type"], "created_at": row["created_at"],
+        }
+        for row in friend_rows
+        if row["status"] == 1
+    ]
+    _bulk_insert(Friendship, friendship_rows)
+
+    # 分享記錄指向分享者自己的日記（日記 id 依使用者連續配置）
+    share_rows = []
+    for index, user in enumerate(users):
+        first_diary_id = index * config.diary_per_user + 1
+        for n in range(min(config.shares_per_user, config.diary_per_user)):
+            created = EPOCH + timedelta(hours=n * 4)
+            share_rows.append({
+                "user_id": user["id"], "record_type": rng.randint(0, 3),
+                "record_id": first_diary_id + rng.randrange(config.diary_per_user),
+                "relation_type": n % 3, "relation_id": 0,
+                "shared_at": created, "created_at": created, "updated_at": created,
+            })
+    _bulk_insert(ShareRecord, share_rows)
+    # SHARE_FEED_MODE=fanout 使用的收件匣
+    inbox_count = share_inbox.rebuild()
+
+    a1c_rows = [
+        {
+            "user_id": user["id"], "a1cs": round(rng.uniform(5.0, 9.0), 1),
+            "record_date": (EPOCH + timedelta(days=30 * n)).date(), "Message": "",
+            "created_at": EPOCH, "updated_at": EPOCH,
+        }
+        for user in users
+        for n in range(config.a1c_per_user)
+    ]
+    _bulk_insert(A1cRecord, a1c_rows)
+
+    news_rows = []
+    for n in range(config.news):
+        created = EPOCH + timedelta(hours=n)
+        news_rows.append({
+            "member_id": users[0]["id"], "group": n % 3 + 1, "title": f"News {n}",
+            "message": "Bench announcement " * 10, "pushed_at": created,
+            "created_at": created, "updated_at": created,
+        })
+    _bulk_insert(News, news_rows)
+
+    db.session.commit()
+    return dict(
+        asdict(config),
+        rows={
+            "users": len(users), "friends": len(groups), "diary": len(diary_rows), "friend_results": len(friend_rows), "friendships": len(friendship_rows),
+            "share_records": len(share_rows), "share_inbox": inbox_count, "a1c": len(a1c_rows), "news": len(news_rows),
+        },
+    )
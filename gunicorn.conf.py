@@ -0,0 +1,68 @@
+"""
+gunicorn 設定（正式環境）
+
+    gunicorn -c gunicorn.conf.py
+
+環境變數:
+    GUNICORN_BIND: 監聽位址（預設 0.0.0.0:8000）
+    WEB_CONCURRENCY: worker 行程數（預設 CPU 數 * 2 + 1）
+    GUNICORN_WORKER_CLASS: sync / gthread / gevent（預設 gthread）
+    GUNICORN_THREADS: gthread 每個 worker 的執行緒數（預設 4）
+    GUNICORN_WORKER_CONNECTIONS: gevent 每個 worker 的最大連線數（預設 100）
+    GUNICORN_TIMEOUT / GUNICORN_KEEPALIVE / GUNICORN_MAX_REQUESTS: 逾時與回收設定
+    DB_POOL_SIZE / DB_MAX_OVERFLOW: 未設定時依 worker 類型推算（見下方）
+
+app 於 master 預先載入（preload_app），worker fork 後共用已匯入的模組；
+資料表不會在啟動時建立：新資料庫請先執行 flask --app wsgi create-db（建表並標記為最新 migration），
+既有資料庫更新版本時執行 flask --app wsgi db upgrade
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = "wsgi:app"
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+preload_app = True
+
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", 4)) if worker_class == "gthread" else 1
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 100))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+# 定期回收 worker，避免長時間執行的記憶體成長；jitter 避免同時重啟
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = os.getenv("GUNICORN_ERROR_LOG", "-")
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+# 每個 worker 的連線池：同時處理的請求數即為需要的連線數
+#   sync: 1 個請求 / worker；gthread: threads 個；gevent: 上限為 worker_connections，
+#   但實際查詢併發有限，固定池大小並允許少量溢出，避免超過 MySQL max_connections
+if worker_class == "gevent":
+    _pool_size, _max_overflow = 10, 10
+else:
+    _pool_size, _max_overflow = max(threads, 1), 0
+os.environ.setdefault("DB_POOL_SIZE", str(_pool_size))
+os.environ.setdefault("DB_MAX_OVERFLOW", str(_max_overflow))
+
+
+def when_ready(server):
+    per_worker = int(os.environ["DB_POOL_SIZE"]) + int(os.environ["DB_MAX_OVERFLOW"])
+    server.log.info(
+        "workers=%s worker_class=%s threads=%s db_connections<=%s (%s per worker)",
+        workers, worker_class, threads, workers * per_worker, per_worker,
+    )
+
+
+def post_fork(server, worker):
+    # master 若已建立連線，子行程不可沿用（close=False 不影響 master 的連線）
+    from app.extensions import db
+
+    app = worker.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
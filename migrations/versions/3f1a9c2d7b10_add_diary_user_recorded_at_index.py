@@ -0,0 +1,26 @@
+"""add diary (user_id, recorded_at) index
+
+Revision ID: 3f1a9c2d7b10
+Revises: 
+Create Date: 2026-10-17 21:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a9c2d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('diary', schema=None) as batch_op:
+        batch_op.create_index('idx_diary_user_recorded_at', ['user_id', 'recorded_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('diary', schema=None) as batch_op:
+        batch_op.drop_index('idx_diary_user_recorded_at')
@@ -0,0 +1,59 @@
+"""add friendships table, back-filled from accepted FriendResult rows
+
+Revision ID: a5c2f8e0d913
+Revises: e7a3b9c1d204
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c2f8e0d913'
+down_revision = 'e7a3b9c1d204'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'friendships',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('low_id', sa.Integer(), nullable=False),
+        sa.Column('high_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['low_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['high_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    with op.batch_alter_table('friendships', schema=None) as batch_op:
+        batch_op.create_index('uq_friendships_pair_type', ['low_id', 'high_id', 'type'], unique=True)
+        batch_op.create_index('idx_friendships_high_low', ['high_id', 'low_id', 'type'], unique=False)
+
+    # 已接受的邀請（含 accept_friend_invite 過去寫入的反向資料列）合併為每對每類型一筆，
+    # 時間取最早的一筆；FriendResult 原資料保留不動
+    op.execute(
+        """
+        INSERT INTO friendships (low_id, high_id, type, created_at)
+        SELECT
+            CASE WHEN user_id < relation_id THEN user_id ELSE relation_id END,
+            CASE WHEN user_id < relation_id THEN relation_id ELSE user_id END,
+            type,
+            MIN(created_at)
+        FROM FriendResult
+        WHERE status = 1 AND user_id <> relation_id
+        GROUP BY
+            CASE WHEN user_id < relation_id THEN user_id ELSE relation_id END,
+            CASE WHEN user_id < relation_id THEN relation_id ELSE user_id END,
+            type
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('friendships', schema=None) as batch_op:
+        batch_op.drop_index('idx_friendships_high_low')
+        batch_op.drop_index('uq_friendships_pair_type')
+    op.drop_table('friendships')
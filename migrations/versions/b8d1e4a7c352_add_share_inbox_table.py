@@ -0,0 +1,43 @@
+"""add share_inbox table for fan-out share feeds
+
+Revision ID: b8d1e4a7c352
+Revises: a5c2f8e0d913
+Create Date: 2026-10-18 14:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d1e4a7c352'
+down_revision = 'a5c2f8e0d913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 資料於切換 SHARE_FEED_MODE=fanout 前以 `flask rebuild-share-inbox` 建立
+    op.create_table(
+        'share_inbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('viewer_id', sa.Integer(), nullable=False),
+        sa.Column('share_id', sa.Integer(), nullable=False),
+        sa.Column('sharer_id', sa.Integer(), nullable=False),
+        sa.Column('relation_type', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['viewer_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['share_id'], ['share_records.id'], ),
+        sa.ForeignKeyConstraint(['sharer_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    with op.batch_alter_table('share_inbox', schema=None) as batch_op:
+        batch_op.create_index('idx_share_inbox_feed', ['viewer_id', 'relation_type', 'created_at', 'share_id'], unique=False)
+        batch_op.create_index('uq_share_inbox_viewer_share', ['viewer_id', 'share_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('share_inbox', schema=None) as batch_op:
+        batch_op.drop_index('uq_share_inbox_viewer_share')
+        batch_op.drop_index('idx_share_inbox_feed')
+    op.drop_table('share_inbox')
@@ -0,0 +1,26 @@
+"""add share_records (relation_type, user_id, created_at) index
+
+Revision ID: c4d8e1f2a957
+Revises: 8b2e4d6f0a31
+Create Date: 2026-10-17 21:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d8e1f2a957'
+down_revision = '8b2e4d6f0a31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('share_records', schema=None) as batch_op:
+        batch_op.create_index('idx_share_relation_user_created', ['relation_type', 'user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('share_records', schema=None) as batch_op:
+        batch_op.drop_index('idx_share_relation_user_created')
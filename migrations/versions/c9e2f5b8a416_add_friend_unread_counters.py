@@ -0,0 +1,67 @@
+"""add friend_unread_counters, back-filled from pending FriendResult rows
+
+Revision ID: c9e2f5b8a416
+Revises: b8d1e4a7c352
+Create Date: 2026-10-18 16:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9e2f5b8a416'
+down_revision = 'b8d1e4a7c352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'friend_unread_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('relation_type', sa.Integer(), nullable=False),
+        sa.Column('pending_requests', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('unread_results', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('unread_shares', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'relation_type'),
+    )
+
+    # 每位使用者三種關係類型各一筆，計數條件與 get_friend_requests / get_friend_results 相同；
+    # 以 SQLAlchemy 組出語句，讓 "read" 等保留字依資料庫正確加上引號
+    users = sa.table('users', sa.column('id'))
+    results = sa.table(
+        'FriendResult',
+        sa.column('user_id'), sa.column('relation_id'), sa.column('type'), sa.column('status'), sa.column('read'),
+    )
+    counters = sa.table(
+        'friend_unread_counters',
+        sa.column('user_id'), sa.column('relation_type'),
+        sa.column('pending_requests'), sa.column('unread_results'), sa.column('unread_shares'),
+    )
+    relation_types = sa.union_all(*(sa.select(sa.literal(t).label('relation_type')) for t in (0, 1, 2))).subquery()
+
+    pending = (
+        sa.select(sa.func.count())
+        .where(results.c.relation_id == users.c.id, results.c.type == relation_types.c.relation_type,
+               results.c.status == 0)
+        .scalar_subquery()
+    )
+    unread = (
+        sa.select(sa.func.count())
+        .where(results.c.user_id == users.c.id, results.c.type == relation_types.c.relation_type,
+               sa.or_(results.c.status == 0, results.c.read == 0))
+        .scalar_subquery()
+    )
+    op.execute(
+        counters.insert().from_select(
+            ['user_id', 'relation_type', 'pending_requests', 'unread_results', 'unread_shares'],
+            sa.select(users.c.id, relation_types.c.relation_type, pending, unread, sa.literal(0))
+            .select_from(users.join(relation_types, sa.true())),
+        )
+    )
+
+
+def downgrade():
+    op.drop_table('friend_unread_counters')
@@ -0,0 +1,26 @@
+"""add news (group, created_at) index
+
+Revision ID: e7a3b9c1d204
+Revises: c4d8e1f2a957
+Create Date: 2026-10-17 22:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3b9c1d204'
+down_revision = 'c4d8e1f2a957'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('news', schema=None) as batch_op:
+        batch_op.create_index('idx_news_group_created_at', ['group', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('news', schema=None) as batch_op:
+        batch_op.drop_index('idx_news_group_created_at')
@@ -0,0 +1,84 @@
+"""
+測試共用設定
+匯入 app 前先設定環境變數，避免 load_dotenv() 讀到 .env 的 MySQL 連線
+"""
+
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="app-tests-")
+os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(_tmp, "default.db")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ["MAIL_BACKEND"] = "file"
+os.environ["MAIL_FILE_SINK_DIR"] = os.path.join(_tmp, "mail")
+os.environ["LOG_FILE"] = ""
+os.environ.setdefault("BCRYPT_LOG_ROUNDS", "4")
+os.environ.pop("SQLALCHEMY_REPLICA_URI", None)
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.services import friend_graph, invite_codes, news_feed, user_cache
+from app.utils import db_routing, logging_setup
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # 日誌 listener 綁定的是 pytest 擷取的 stdout，結束前先停止，避免 atexit 時寫入已關閉的串流
+    logging_setup._stop_listener()
+
+
+@pytest.fixture(autouse=True)
+def clear_process_caches():
+    """行程內快取以使用者 id 為鍵，每個測試的資料庫 id 都從 1 開始，需清空避免讀到前一個測試的資料"""
+    caches = (friend_graph._cache, invite_codes._cache, news_feed._cache, user_cache._cache, db_routing._recent_writers)
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """
+    建立使用暫存 SQLite 檔案的 app，並建立所有資料表
+
+    Args:
+        replica: 是否另外建立唯讀副本檔案（SQLALCHEMY_BINDS["replica"]）
+        database_uri: 改用其他資料庫（例如 TEST_MYSQL_URI），需為可清空的測試用資料庫
+        create_tables: 是否建立資料表（測試 create-db / migration 時不建立）
+    """
+    apps = []
+
+    def factory(replica: bool = False, database_uri: str = None, create_tables: bool = True, **config):
+        monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", database_uri or "sqlite:///" + str(tmp_path / "primary.db"))
+        if replica:
+            monkeypatch.setenv("SQLALCHEMY_REPLICA_URI", "sqlite:///" + str(tmp_path / "replica.db"))
+        else:
+            monkeypatch.delenv("SQLALCHEMY_REPLICA_URI", raising=False)
+        app = create_app("testing")
+        app.config.update(config)
+        with app.app_context():
+            for engine in db.engines.values() if create_tables else ():
+                if database_uri:
+                    db.metadata.drop_all(engine)
+                db.metadata.create_all(engine)
+        apps.append(app)
+        return app
+
+    yield factory
+
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+def login(client, email: str, password: str = "Passw0rd!") -> dict:
+    """註冊並登入，回傳帶 JWT 的 headers"""
+    client.post("/api/register", json={"email": email, "password": password})
+    response = client.post("/api/auth", json={"email": email, "password": password})
+    assert response.status_code == 200, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["token"]}
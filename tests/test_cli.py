@@ -0,0 +1,32 @@
+"""CLI：新資料庫以 create-db 建表後，flask db upgrade 不需再執行任何 migration"""
+
+from sqlalchemy import inspect, text
+
+from app.extensions import db
+
+
+def _revision(app):
+    with app.app_context():
+        return db.session.execute(text("SELECT version_num FROM alembic_version")).scalar_one()
+
+
+def test_create_db_then_upgrade(make_app):
+    app = make_app(create_tables=False)
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=["create-db"])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert "users" in inspect(db.engine).get_table_names()
+    head = _revision(app)
+
+    result = runner.invoke(args=["db", "upgrade"])
+    assert result.exit_code == 0, result.output
+    assert _revision(app) == head
+
+
+def test_create_db_refuses_existing_tables(make_app):
+    app = make_app()
+    result = app.test_cli_runner().invoke(args=["create-db"])
+    assert result.exit_code != 0
+    assert "flask db upgrade" in result.output
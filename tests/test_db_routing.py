@@ -0,0 +1,111 @@
+"""讀寫分離：@read_only 走副本、寫入走主庫、寫入後的讀取暫時留在主庫"""
+
+import time
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.controllers.auth_controller import AuthController
+from app.extensions import db
+from app.models.friendship import Friendship
+from app.models.user import User
+from app.services import friend_graph
+from app.utils import db_routing
+from app.utils.db_routing import REPLICA_BIND_KEY, read_only
+
+EMAIL = "reader@example.com"
+
+
+@read_only
+def load_name(email):
+    return db.session.execute(select(User.name).where(User.email == email)).scalar_one()
+
+
+@read_only
+def rename(email, name):
+    user = db.session.execute(select(User).where(User.email == email)).scalar_one()
+    user.name = name
+    db.session.flush()
+    # 同一 session 寫入後的讀取也要看得到剛寫入的資料
+    flushed_name = db.session.execute(select(User.name).where(User.email == email)).scalar_one()
+    db.session.commit()
+    return flushed_name
+
+
+def _name_in(engine, email=EMAIL):
+    with engine.connect() as conn:
+        return conn.execute(select(User.name).where(User.email == email)).scalar_one()
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(replica=True, REPLICA_STICKY_SECONDS=0.5)
+    with app.app_context():
+        # 直接以 engine 寫入，不經過 session，因此不會被記為近期寫入；兩個檔案內容不同以辨識讀取來源
+        for key, name in ((None, "primary"), (REPLICA_BIND_KEY, "replica")):
+            with db.engines[key].begin() as conn:
+                conn.execute(insert(User), {"id": 1, "email": EMAIL, "name": name})
+    return app
+
+
+def test_read_only_reads_from_replica(app):
+    with app.app_context():
+        assert load_name(EMAIL) == "replica"
+        assert db.session.get_bind() is db.engines[None]
+
+
+def test_read_only_controller_reads_from_replica(app):
+    with app.test_request_context():
+        body, status = AuthController.get_user(EMAIL)
+    assert status == 200
+    assert body["user"]["name"] == "replica"
+
+
+def test_reads_outside_read_only_use_primary(app):
+    with app.app_context():
+        assert db.session.execute(select(User.name).where(User.email == EMAIL)).scalar_one() == "primary"
+
+
+def test_without_replica_bind_read_only_uses_primary(make_app):
+    app = make_app()
+    with app.app_context():
+        db.session.add(User(email="solo@example.com", name="primary"))
+        db.session.commit()
+        db_routing._recent_writers.clear()
+        assert load_name("solo@example.com") == "primary"
+
+
+def test_flush_and_commit_go_to_primary(app):
+    with app.app_context():
+        assert rename(EMAIL, "renamed") == "renamed"
+        db.session.remove()
+        assert _name_in(db.engines[None]) == "renamed"
+        assert _name_in(db.engines[REPLICA_BIND_KEY]) == "replica"
+
+
+def test_read_after_write_stays_on_primary(app):
+    with app.app_context():
+        rename(EMAIL, "renamed")
+        db.session.remove()
+        assert db_routing.wrote_recently(EMAIL)
+        # 副本尚未同步，REPLICA_STICKY_SECONDS 內仍讀主庫
+        assert load_name(EMAIL) == "renamed"
+        # 其他使用者不受影響
+        assert not db_routing.wrote_recently("other@example.com")
+
+        time.sleep(0.6)
+        assert not db_routing.wrote_recently(EMAIL)
+        assert load_name(EMAIL) == "replica"
+
+
+def test_friend_graph_is_loaded_from_primary(app):
+    with app.app_context():
+        with db.engines[None].begin() as conn:
+            conn.execute(insert(User), {"id": 2, "email": "friend@example.com"})
+            conn.execute(insert(Friendship), {"low_id": 1, "high_id": 2, "type": 1})
+        # 副本尚未同步到這筆好友關係；快取的關係圖仍應以主庫為準
+        with db.engines[REPLICA_BIND_KEY].begin() as conn:
+            conn.execute(insert(User), {"id": 2, "email": "friend@example.com"})
+
+        assert read_only(friend_graph.friend_ids)(1, 1) == {2}
+        assert friend_graph.friend_ids(1, 1) == {2}
@@ -0,0 +1,19 @@
+"""好友列表：時間欄位與其他端點相同，由 JSON provider 轉為台灣時間字串"""
+
+import re
+
+from conftest import login
+
+
+def test_created_at_uses_api_datetime_format(make_app):
+    client = make_app().test_client()
+    alice = login(client, "alice@example.com")
+    bob = login(client, "bob@example.com")
+    code = client.get("/api/friend/code", headers=bob).get_json()["invite_code"]
+    client.post("/api/friend/send", headers=alice, json={"invite_code": code, "type": 1})
+    invite = client.get("/api/friend/requests", headers=bob).get_json()["requests"][0]
+    assert client.get(f"/api/friend/{invite['id']}/accept", headers=bob).status_code == 200
+
+    friends = client.get("/api/friend/list", headers=alice).get_json()["friends"]
+    assert [friend["email"] for friend in friends] == ["bob@example.com"]
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", friends[0]["created_at"])
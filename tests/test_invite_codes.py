@@ -0,0 +1,57 @@
+"""好友邀請碼：尚未補發的使用者取得邀請碼時寫入資料庫，之後可被解析"""
+
+from sqlalchemy import insert, select, update
+
+from app.controllers.auth_controller import AuthController
+from app.extensions import db
+from app.models.user import User
+from app.services import invite_codes
+from app.utils.db_routing import REPLICA_BIND_KEY
+
+from conftest import login
+
+
+def test_missing_code_is_persisted(make_app):
+    app = make_app()
+    client = app.test_client()
+    headers = login(client, "legacy@example.com")
+    with app.app_context():
+        db.session.execute(update(User).values(invite_code=None))
+        db.session.commit()
+
+    body = client.get("/api/friend/code", headers=headers).get_json()
+    code = body["invite_code"]
+    assert code
+
+    with app.app_context():
+        user_id = db.session.execute(select(User.id).where(User.email == "legacy@example.com")).scalar_one()
+        assert db.session.execute(select(User.invite_code).where(User.id == user_id)).scalar_one() == code
+        assert invite_codes.resolve(code) == user_id
+
+
+def test_ensure_keeps_existing_code(make_app):
+    app = make_app()
+    login(app.test_client(), "owner@example.com")
+    with app.app_context():
+        user_id = db.session.execute(select(User.id)).scalar_one()
+        db.session.execute(update(User).values(invite_code="CUSTOM01"))
+        db.session.commit()
+        assert invite_codes.ensure(user_id) == "CUSTOM01"
+
+
+def test_missing_code_is_written_to_primary_from_read_only(make_app):
+    app = make_app(replica=True)
+    with app.app_context():
+        for key in (None, REPLICA_BIND_KEY):
+            with db.engines[key].begin() as conn:
+                conn.execute(insert(User), {"id": 1, "email": "legacy@example.com"})
+
+    with app.test_request_context():
+        body, status = AuthController.get_friend_invite_code("legacy@example.com")
+    assert status == 200
+
+    with app.app_context():
+        with db.engines[None].connect() as conn:
+            assert conn.execute(select(User.invite_code)).scalar_one() == body["invite_code"]
+        with db.engines[REPLICA_BIND_KEY].connect() as conn:
+            assert conn.execute(select(User.invite_code)).scalar_one() is None
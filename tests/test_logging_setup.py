@@ -0,0 +1,43 @@
+"""非同步日誌：訊息在呼叫端合併，背景執行緒只負責格式化"""
+
+import logging
+import sys
+import queue
+
+from app.utils.logging_setup import DeferredQueueHandler
+
+
+def test_message_is_merged_on_calling_thread():
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("tests.deferred")
+    logger.propagate = False
+    handler = DeferredQueueHandler(log_queue)
+    logger.addHandler(handler)
+    try:
+        payload = {"status": "before"}
+        logger.warning("payload %s", payload)
+        payload["status"] = "after"
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+    record = log_queue.get_nowait()
+    assert record.args is None
+    assert record.getMessage() == "payload {'status': 'before'}"
+
+
+def test_exception_text_is_kept():
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        record = logging.getLogger("tests.deferred").makeRecord(
+            "tests.deferred", logging.ERROR, __file__, 0, "failed %s", ("job",), sys.exc_info(),
+        )
+    handler.handle(record)
+
+    queued = log_queue.get_nowait()
+    assert queued.exc_info is None
+    assert "RuntimeError: boom" in queued.exc_text
+    assert queued.getMessage() == "failed job"
@@ -0,0 +1,22 @@
+"""背景郵件佇列：寄送後端依放入郵件的 app 決定"""
+
+from app.extensions import mail_dispatcher
+
+
+def test_each_app_keeps_its_own_backend(make_app, tmp_path, monkeypatch):
+    monkeypatch.setenv("MAIL_FILE_SINK_DIR", str(tmp_path / "first"))
+    first = make_app()
+    monkeypatch.setenv("MAIL_FILE_SINK_DIR", str(tmp_path / "second"))
+    second = make_app()
+    assert first.extensions["mail_dispatcher"].backend is not second.extensions["mail_dispatcher"].backend
+
+    # 後建立的 app 不會取代先前 app 的後端
+    with first.app_context():
+        mail_dispatcher.enqueue("first", ["a@example.com"], "body", sender="noreply@example.com")
+    with second.app_context():
+        mail_dispatcher.enqueue("second", ["b@example.com"], "body", sender="noreply@example.com")
+    assert mail_dispatcher.flush(5)
+
+    assert len(list((tmp_path / "first").glob("*.eml"))) == 1
+    assert len(list((tmp_path / "second").glob("*.eml"))) == 1
+    assert b"Subject: first" in next((tmp_path / "first").glob("*.eml")).read_bytes()
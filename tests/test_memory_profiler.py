@@ -0,0 +1,68 @@
+"""記憶體取樣：設定與統計依 app 分開，計時器與 fork hook 只註冊一次"""
+
+import os
+import tracemalloc
+
+import pytest
+from flask import Flask
+
+from app.utils.memory_profiler import MemoryProfiler
+
+
+def _app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+
+    @app.get("/ping")
+    def ping():
+        return "pong"
+
+    return app
+
+
+@pytest.fixture
+def no_timer(monkeypatch):
+    """記錄計時器啟動與 fork hook 註冊次數，不實際啟動執行緒"""
+    calls = {"timer": 0, "fork": 0}
+
+    def start_timer(profiler):
+        calls["timer"] += 1
+        profiler._timer = object()
+
+    monkeypatch.setattr(MemoryProfiler, "_start_timer", start_timer)
+    monkeypatch.setattr(os, "register_at_fork", lambda **_kw: calls.__setitem__("fork", calls["fork"] + 1))
+    return calls
+
+
+@pytest.fixture
+def stop_tracemalloc():
+    was_tracing = tracemalloc.is_tracing()
+    yield
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def test_settings_and_stats_are_per_app(no_timer, stop_tracemalloc):
+    profiler = MemoryProfiler()
+    traced = _app(MEMORY_PROFILE_SAMPLE_RATE=1.0, MEMORY_PROFILE_TRACEMALLOC=True)
+    plain = _app(MEMORY_PROFILE_SAMPLE_RATE=1.0)
+    quiet = _app()
+    for app in (traced, plain, quiet):
+        profiler.init_app(app)
+
+    for app in (traced, plain, quiet):
+        assert app.test_client().get("/ping").status_code == 200
+
+    traced_stats = traced.extensions["memory_profiler"].export()["endpoints"]
+    plain_stats = plain.extensions["memory_profiler"].export()["endpoints"]
+    assert set(traced_stats["ping"]) == {"rss", "tracemalloc"}
+    assert set(plain_stats["ping"]) == {"rss"}
+    assert quiet.extensions["memory_profiler"].export()["endpoints"] == {}
+
+
+def test_timer_and_fork_hook_registered_once(no_timer):
+    profiler = MemoryProfiler()
+    for interval in (30, 60, 0):
+        profiler.init_app(_app(MEMORY_PROFILE_INTERVAL=interval))
+    assert no_timer == {"timer": 1, "fork": 1}
+    assert profiler.interval == 30
@@ -0,0 +1,27 @@
+"""連線池統計：同一行程的多個 app 各自回報自己的 engine"""
+
+from sqlalchemy import text
+
+from app.extensions import db
+
+
+def _pool_metrics(app):
+    response = app.test_client().get("/internal/metrics/pool")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_each_app_reports_its_own_pools(make_app):
+    first = make_app(replica=True)
+    second = make_app()
+
+    with first.app_context():
+        for _ in range(3):
+            db.session.execute(text("SELECT 1"))
+            db.session.remove()
+
+    first_metrics = _pool_metrics(first)
+    second_metrics = _pool_metrics(second)
+    assert set(first_metrics) == {"default", "replica"}
+    assert set(second_metrics) == {"default"}
+    assert first_metrics["default"]["checkouts"] > second_metrics["default"]["checkouts"]
@@ -0,0 +1,65 @@
+"""查詢數上限：以 count_queries 鎖定熱門端點的查詢數，避免 N+1 回歸"""
+
+import pytest
+from sqlalchemy import select
+
+from app.extensions import db, query_inspector
+from app.models.friendresult import FriendResult
+from app.models.user import User
+from app.utils.query_inspector import QueryBudgetExceeded, count_queries
+
+from conftest import login
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def test_get_user_budget(client):
+    headers = login(client, "owner@example.com")
+    with count_queries(max_queries=2) as recorder:
+        response = client.get("/api/user", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["X-Query-Count"] == str(recorder.count)
+    assert not recorder.repeated()
+
+
+def test_get_friend_results_budget_does_not_grow_with_results(app, client):
+    headers = login(client, "owner@example.com")
+    for i in range(4):
+        login(client, f"friend{i}@example.com")
+    with app.app_context():
+        owner_id = db.session.execute(select(User.id).where(User.email == "owner@example.com")).scalar_one()
+        friend_ids = db.session.execute(select(User.id).where(User.email.like("friend%"))).scalars().all()
+        db.session.add_all(FriendResult(user_id=owner_id, relation_id=friend_id, type=1) for friend_id in friend_ids)
+        db.session.commit()
+
+    # 被邀請者以 joinedload 一併載入，結果筆數增加也只有一次查詢
+    with count_queries(max_queries=1) as recorder:
+        response = client.get("/api/friend/results", headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()["results"]) == 4
+    assert not recorder.repeated()
+
+
+def test_count_queries_raises_over_budget(app):
+    with app.app_context():
+        with pytest.raises(QueryBudgetExceeded):
+            with count_queries(max_queries=1):
+                db.session.execute(select(User.id)).all()
+                db.session.execute(select(User.email)).all()
+
+
+def test_engine_instrumented_once(app):
+    with app.app_context():
+        engine = db.engines[None]
+        query_inspector._instrument(engine)
+        with count_queries() as recorder:
+            db.session.execute(select(User.id)).all()
+    assert recorder.count == 1
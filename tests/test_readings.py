@@ -0,0 +1,84 @@
+"""批次匯入：回傳的 id 與輸入順序一一對應，同一使用者同一秒的並行批次也不會互相取到對方的 id"""
+
+import os
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.extensions import db
+from app.models.diary import Diary
+from app.models.user import User
+from app.services import readings
+from app.services.readings import insert_readings, validate_reading
+
+DATABASES = [
+    "sqlite",
+    pytest.param("mysql", marks=pytest.mark.skipif(
+        not os.getenv("TEST_MYSQL_URI"), reason="TEST_MYSQL_URI 未設定（需可清空的測試用 MySQL 資料庫）",
+    )),
+]
+
+
+@pytest.fixture(params=DATABASES)
+def app(request, make_app):
+    app = make_app(database_uri=os.getenv("TEST_MYSQL_URI") if request.param == "mysql" else None)
+    with app.app_context():
+        db.session.execute(insert(User), {"id": 1, "email": "batch@example.com"})
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def same_second(monkeypatch):
+    """所有批次都在同一秒寫入"""
+    frozen = datetime.now(readings.TZ_TAIWAN).replace(microsecond=0)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen
+
+    monkeypatch.setattr(readings, "datetime", FrozenDatetime)
+
+
+def _rows(batch: int, count: int):
+    return [validate_reading({"type": "blood_sugar", "sugar": batch * 100 + i + 1}) for i in range(count)]
+
+
+def test_ids_follow_input_order(app, same_second):
+    rows = _rows(1, 5)
+    with app.app_context():
+        ids = insert_readings(1, rows)
+        db.session.commit()
+        sugars = dict(db.session.execute(select(Diary.id, Diary.sugar)).all())
+    assert [sugars[i] for i in ids] == [row["sugar"] for row in rows]
+
+
+def test_concurrent_same_second_batches(app, same_second):
+    batches = {batch: _rows(batch, 50) for batch in (1, 2)}
+    results, errors = {}, []
+    barrier = threading.Barrier(len(batches))
+
+    def run(batch):
+        try:
+            with app.app_context():
+                barrier.wait()
+                results[batch] = insert_readings(1, batches[batch])
+                db.session.commit()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(batch,)) for batch in batches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+    with app.app_context():
+        sugars = dict(db.session.execute(select(Diary.id, Diary.sugar)).all())
+    assert len(sugars) == 100
+    for batch, ids in results.items():
+        assert [sugars[i] for i in ids] == [row["sugar"] for row in batches[batch]]
@@ -0,0 +1,137 @@
+"""好友分享列表：pull 與 fanout 兩種模式在相同操作下回傳相同的內容與分頁"""
+
+import pytest
+
+from app.extensions import db
+from app.services import share_inbox
+
+from conftest import login
+
+FAMILY = 1
+
+
+@pytest.fixture(params=share_inbox.FEED_MODES)
+def app(request, make_app):
+    return make_app(SHARE_FEED_MODE=request.param)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def users(client):
+    """回傳 {名稱: (headers, 邀請碼)}"""
+    users = {}
+    for name in ("alice", "bob", "carol"):
+        headers = login(client, f"{name}@example.com")
+        code = client.get("/api/friend/code", headers=headers).get_json()["invite_code"]
+        users[name] = (headers, code)
+    return users
+
+
+def befriend(client, users, sender, receiver, relation_type=FAMILY):
+    client.post("/api/friend/send", headers=users[sender][0],
+                json={"invite_code": users[receiver][1], "type": relation_type})
+    for invite in client.get("/api/friend/requests", headers=users[receiver][0]).get_json()["requests"]:
+        response = client.get(f"/api/friend/{invite['id']}/accept", headers=users[receiver][0])
+        assert response.status_code == 200, response.get_json()
+
+
+def share(client, users, name, sugar, relation_type=FAMILY):
+    headers = users[name][0]
+    record_id = client.post("/api/user/blood/sugar", headers=headers,
+                            json={"sugar": sugar, "timeperiod": 1}).get_json()["new_record_id"]
+    response = client.post("/api/share", headers=headers,
+                           json={"type": 0, "id": record_id, "relation_type": relation_type})
+    assert response.status_code == 200, response.get_json()
+    return record_id
+
+
+def page(client, users, name, relation_type=FAMILY, **query):
+    response = client.get(f"/api/share/{relation_type}", headers=users[name][0], query_string=query)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def feed(client, users, name, relation_type=FAMILY, limit=2):
+    """以 next_cursor 翻完所有頁面"""
+    records, cursor = [], ""
+    while True:
+        query = {"limit": limit}
+        if cursor:
+            query["before"] = cursor
+        body = page(client, users, name, relation_type, **query)
+        records += body["records"]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return records
+
+
+def sugars(records):
+    return [record["sugar"] for record in records]
+
+
+def test_no_friends_returns_cursors(client, users):
+    body = page(client, users, "alice")
+    assert body["records"] == []
+    assert body["next_cursor"] == ""
+    assert body["prev_cursor"] == ""
+
+
+def test_new_share_reaches_friends_only(client, users):
+    befriend(client, users, "alice", "bob")
+    share(client, users, "bob", 101)
+    share(client, users, "bob", 102, relation_type=2)
+
+    assert sugars(feed(client, users, "alice")) == [101]
+    assert feed(client, users, "alice", relation_type=2) == []
+    assert feed(client, users, "carol") == []
+
+
+def test_accept_backfills_existing_shares(client, users):
+    share(client, users, "bob", 101)
+    share(client, users, "bob", 102)
+    share(client, users, "alice", 201)
+    assert feed(client, users, "alice") == []
+
+    befriend(client, users, "alice", "bob")
+    assert sugars(feed(client, users, "alice")) == [102, 101]
+    assert sugars(feed(client, users, "bob")) == [201]
+
+
+def test_cursor_paging(client, users):
+    befriend(client, users, "alice", "bob")
+    befriend(client, users, "carol", "alice")
+    for sugar in (101, 102, 103):
+        share(client, users, "bob", sugar)
+    for sugar in (301, 302):
+        share(client, users, "carol", sugar)
+
+    first = page(client, users, "alice", limit=2)
+    assert sugars(first["records"]) == [302, 301]
+    assert sugars(feed(client, users, "alice", limit=2)) == [302, 301, 103, 102, 101]
+
+    # prev_cursor 取得第一頁之後新增的分享
+    share(client, users, "bob", 104)
+    newer = page(client, users, "alice", after=first["prev_cursor"])
+    assert sugars(newer["records"]) == [104]
+
+
+def test_modes_return_identical_feeds(app, client, users):
+    befriend(client, users, "alice", "bob")
+    share(client, users, "bob", 101)
+    share(client, users, "carol", 301)
+    befriend(client, users, "carol", "alice")
+    share(client, users, "bob", 102)
+    before = {name: feed(client, users, name) for name in users}
+
+    # 切換到另一種模式前重建收件匣（pull -> fanout 的切換步驟；fanout 下重建結果也應相同）
+    with app.app_context():
+        share_inbox.rebuild()
+        db.session.commit()
+    other = next(mode for mode in share_inbox.FEED_MODES if mode != app.config["SHARE_FEED_MODE"])
+    app.config["SHARE_FEED_MODE"] = other
+
+    assert {name: feed(client, users, name) for name in users} == before
@@ -1,12 +1,16 @@
+"""
+WSGI 進入點
+
+正式環境: gunicorn -c gunicorn.conf.py
+開發環境: python wsgi.py
+建立資料表（新資料庫）: flask --app wsgi create-db
+更新既有資料庫: flask --app wsgi db upgrade
+"""
+
+import os
 from app import create_app
-from app.extensions import db
 
 app = create_app()
 
-# 建立所有表
-with app.app_context():
-    db.create_all()
-    print("All tables created successfully!")
-
 if __name__ == "__main__":
-    app.run(debug=True)
+    app.run(debug=os.getenv("FLASK_DEBUG", "True").lower() == "true")